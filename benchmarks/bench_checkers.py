@@ -0,0 +1,194 @@
+"""
+Benchmark: provider checkers against recorded responses
+
+Serves each provider's cassette from mock_providers/cassettes on a replay server
+in a child process, then checks the same accounts at every concurrency level and
+reports checks per second, p50/p99 check latency and checker CPU per check.
+
+    python benchmarks/bench_checkers.py [--accounts 200] [--concurrency 8,32,128]
+        [--providers aws,digitalocean,linode,azure] [--depth quick]
+        [--latency 0.05] [--jitter 0.02] [--error-rate 0] [--throttle-rate 0]
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import insert
+from database.database import DatabaseManager
+from models.account import Account
+from services.base_checker import DEPTHS, DEPTH_QUICK, RESULT_FAILED
+from services.checkers import CONFIG_KEYS, get_checker_class
+from services.concurrency import AdaptiveLimiter
+
+# Checker options pointing each provider at the replay server
+ENDPOINT_OPTIONS = {
+    "aws": ("endpoint_url",),
+    "digitalocean": ("api_url",),
+    "linode": ("api_url",),
+    "azure": ("api_url", "login_url"),
+}
+
+# Checks run before the first measured level, so imports and first connections are not counted
+WARMUP_CHECKS = 20
+
+def account_row(provider, i):
+    """Account columns with a credential of its own, so no two checks coalesce"""
+    row = {'provider': provider, 'email': f'user{i}@example.com'}
+    if provider == "AWS":
+        row.update(access_key=f'AKIA{i:016d}', secret_key=f'secret{i}', region='us-east-1')
+    elif provider == "Azure":
+        row['azure_password'] = f'password{i}'
+    else:
+        row['api_key'] = f'token{i}'
+    return row
+
+def create_database(directory, provider, accounts):
+    """Create a throwaway database seeded with accounts of one provider"""
+    config_path = os.path.join(directory, f'{CONFIG_KEYS[provider]}.yaml')
+    with open(config_path, 'w') as f:
+        f.write(f'database:\n  url: "sqlite:///{os.path.join(directory, CONFIG_KEYS[provider])}.db"\n'
+                f'  echo: false\n')
+    
+    db = DatabaseManager(config_path)
+    with db.engine.begin() as conn:
+        conn.execute(insert(Account), [account_row(provider, i) for i in range(accounts)])
+    return db
+
+def free_port():
+    """A port nothing listens on right now"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_replay_server(cassette, args):
+    """Replay server process and its URL, once it accepts connections"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "mock_providers.replay", "serve", cassette, "--port", str(port),
+         "--latency", str(args.latency), "--jitter", str(args.jitter),
+         "--error-rate", str(args.error_rate), "--throttle-rate", str(args.throttle_rate), "--seed", "1"],
+        cwd=ROOT, stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"Replay server for {cassette} did not start")
+
+def replay_stats(url):
+    """Request counters of a replay server"""
+    with urllib.request.urlopen(f"{url}/_replay/stats") as response:
+        return json.load(response)
+
+def timed(checker_class):
+    """Subclass of a checker that records the wall time of every check"""
+    class TimedChecker(checker_class):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.latencies = []
+        
+        def check_account(self, account):
+            started = time.perf_counter()
+            try:
+                return super().check_account(account)
+            finally:
+                self.latencies.append(time.perf_counter() - started)
+        
+        async def check_account_async(self, session, account):
+            started = time.perf_counter()
+            try:
+                return await super().check_account_async(session, account)
+            finally:
+                self.latencies.append(time.perf_counter() - started)
+    
+    return TimedChecker
+
+def percentile(values, share):
+    """Value below which share of the sorted values fall"""
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+def measure(checker_class, db, accounts, options, depth, workers):
+    """Check all accounts once with max_workers=workers, returns one report row"""
+    checker = checker_class(db, max_workers=workers, **options)
+    checker.depth = depth
+    # A limiter pinned at workers: checks queue before they start, so latency is the check alone
+    checker.concurrency = AdaptiveLimiter(checker.provider, {
+        'initial_limit': workers, 'min_limit': workers, 'max_limit': workers
+    })
+    
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    results = checker.check_accounts(accounts, force=True)
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    
+    latencies = sorted(checker.latencies)
+    return {
+        'workers': workers,
+        'rate': len(results) / wall,
+        'p50': percentile(latencies, 0.50) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'cpu': cpu / len(results) * 1000,
+        'failed': sum(1 for result in results if result.get('check_result') == RESULT_FAILED),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=200, help="Accounts per provider")
+    parser.add_argument('--concurrency', default="8,32,128", help="max_workers levels")
+    parser.add_argument('--providers', default=",".join(CONFIG_KEYS.values()))
+    parser.add_argument('--depth', choices=DEPTHS, default=DEPTH_QUICK)
+    parser.add_argument('--latency', type=float, default=0.05, help="Replay seconds per response")
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    
+    levels = [int(level) for level in args.concurrency.split(",")]
+    names = {key: provider for provider, key in CONFIG_KEYS.items()}
+    
+    print()
+    print(f"{'provider':<14}{'workers':>8}{'checks/s':>10}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'CPU ms/check':>14}{'failed':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        # The AWS region catalog and proxy settings live under ./config
+        os.chdir(directory)
+        for key in args.providers.split(","):
+            provider = names[key]
+            db = create_database(directory, provider, args.accounts)
+            accounts = db.get_all_accounts(provider)
+            checker_class = timed(get_checker_class(provider))
+            
+            process, url = start_replay_server(key, args)
+            try:
+                options = {option: url for option in ENDPOINT_OPTIONS[key]}
+                measure(checker_class, db, accounts[:WARMUP_CHECKS], options, args.depth, levels[0])
+                for workers in levels:
+                    row = measure(checker_class, db, accounts, options, args.depth, workers)
+                    print(f"{provider:<14}{row['workers']:>8}{row['rate']:>10.1f}{row['p50']:>9.1f}"
+                          f"{row['p99']:>9.1f}{row['cpu']:>14.2f}{row['failed']:>8}")
+                stats = replay_stats(url)
+                if stats['misses']:
+                    print(f"⚠️ {stats['misses']} requests had no recorded response")
+            finally:
+                process.terminate()
+                process.wait()
+                db.close()
+        os.chdir(ROOT)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: per-call overhead of tiny hot queries (by-id lookup, count)
+
+Compares the previous ORM Query path, rebuilt on every call, with the cached
+statements used by DatabaseManager.
+
+    python benchmarks/bench_hot_queries.py [--accounts 5000] [--calls 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from database.database import DatabaseManager
+from models.account import Account
+
+PROVIDERS = ["AWS", "DigitalOcean", "Linode", "Azure"]
+
+def create_database(directory, accounts):
+    """Create a throwaway database seeded with accounts"""
+    config_path = os.path.join(directory, 'config.yaml')
+    with open(config_path, 'w') as f:
+        f.write(f'database:\n  url: "sqlite:///{os.path.join(directory, "bench.db")}"\n  echo: false\n')
+    
+    db = DatabaseManager(config_path)
+    with db.engine.begin() as conn:
+        conn.execute(insert(Account), [
+            {'provider': PROVIDERS[i % len(PROVIDERS)], 'email': f'user{i}@example.com'}
+            for i in range(accounts)
+        ])
+    return db
+
+def legacy_get_account_by_id(db, account_id):
+    """By-id lookup as an ORM Query built per call"""
+    session = db.get_session()
+    try:
+        return session.query(Account).filter(
+            Account.id == account_id,
+            Account.deleted_at.is_(None)
+        ).first()
+    finally:
+        session.close()
+
+def legacy_count_accounts(db, provider):
+    """Count as an ORM Query built per call"""
+    session = db.get_session()
+    try:
+        return session.query(Account).filter(
+            Account.deleted_at.is_(None),
+            Account.provider == provider
+        ).count()
+    finally:
+        session.close()
+
+def measure(func, args_list):
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=5000)
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        db = create_database(directory, args.accounts)
+        ids = [(db, random.randint(1, args.accounts)) for _ in range(args.calls)]
+        providers = [(db, random.choice(PROVIDERS)) for _ in range(args.calls)]
+        
+        # Warm up both paths so only steady-state overhead is compared
+        measure(legacy_get_account_by_id, ids[:100])
+        measure(lambda db, account_id: db.get_account_by_id(account_id), ids[:100])
+        
+        results = [
+            ("by-id lookup", measure(legacy_get_account_by_id, ids),
+             measure(lambda db, account_id: db.get_account_by_id(account_id), ids)),
+            ("count by provider", measure(legacy_count_accounts, providers),
+             measure(lambda db, provider: db.count_accounts(provider), providers)),
+        ]
+        
+        print()
+        print(f"{'query':<20}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+        for name, before, after in results:
+            print(f"{name:<20}{before:>14.1f}{after:>14.1f}{before / after:>9.2f}x")
+        
+        print()
+        for key, value in db.get_statement_cache_stats().items():
+            print(f"{key}: {value}")
+        db.close()
+
+if __name__ == '__main__':
+    main()
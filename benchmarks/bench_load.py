@@ -0,0 +1,186 @@
+"""
+Load test: scheduler, rate limiter, checkers and result writes at 10k+ accounts
+
+Runs the AWS, DigitalOcean and Linode stand-ins from mock_providers in this
+process, seeds a throwaway database and lets CheckScheduler check every account
+once. The stand-ins answer requests over their per-key and overall rates with
+429s, which the rate limiter and the adaptive concurrency limits have to absorb.
+Reports checks/s, 429s, limiter state and how many results reached the database.
+
+    python benchmarks/bench_load.py [--accounts 12000] [--providers aws,digitalocean,linode]
+        [--engine thread|process] [--client-rate 300] [--server-rate 250] [--key-rate 5]
+        [--full-share 0.02] [--timeout 900]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import yaml
+from sqlalchemy import insert
+from database.database import DatabaseManager
+from mock_providers import aws, digitalocean, linode
+from mock_providers.server import BackgroundServer
+from models.account import Account
+from services.checkers import CONFIG_KEYS
+from services.concurrency import get_concurrency_stats
+from services.scheduler import CheckScheduler
+from utils.batching import chunked
+
+# config key -> (stand-in module, checker option pointing at it)
+STAND_INS = {
+    "aws": (aws, "endpoint_url"),
+    "digitalocean": (digitalocean, "api_url"),
+    "linode": (linode, "api_url"),
+}
+
+# Seconds between two progress lines
+REPORT_INTERVAL = 2.0
+
+def account_row(provider, i, last_full_check):
+    """Account columns with a credential of its own, so no two checks coalesce; every
+    row has the same keys so the insert runs as one executemany"""
+    aws_row = provider == "AWS"
+    return {
+        'provider': provider, 'email': f'user{i}@example.com', 'last_full_check': last_full_check,
+        'access_key': f'AKIA{i:016d}' if aws_row else None,
+        'secret_key': f'secret{i}' if aws_row else None,
+        'region': 'us-east-1' if aws_row else None,
+        'api_key': None if aws_row else f'token{i}',
+    }
+
+def write_config(directory, args, urls):
+    """config.yaml pointing the checkers at the stand-ins, other providers disabled"""
+    names = {key: provider for provider, key in CONFIG_KEYS.items()}
+    config = {
+        'database': {'url': f"sqlite:///{os.path.join(directory, 'load.db')}", 'echo': False},
+        'cloud_providers': {key: {'enabled': False} for key in CONFIG_KEYS.values()},
+        'rate_limits': {
+            'proxy': {'rate': args.client_rate * len(urls), 'burst': args.client_rate * len(urls)},
+            'providers': {names[key]: {'rate': args.client_rate, 'burst': args.client_rate} for key in urls},
+        },
+        'check_engine': {'mode': args.engine, 'processes': args.processes},
+    }
+    for key, url in urls.items():
+        config['cloud_providers'][key] = {'enabled': True, STAND_INS[key][1]: url}
+    if 'aws' in urls:
+        # Regions of the throwaway keys stay out of the real catalog
+        config['cloud_providers']['aws']['region_catalog_file'] = os.path.join(directory, 'aws_regions.json')
+    
+    path = os.path.join(directory, 'config.yaml')
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return path
+
+def seed_accounts(db, providers, accounts, full_share):
+    """Insert accounts split evenly over providers; all but full_share had a full check
+    recently, so their first scheduled check is a liveness check"""
+    now = datetime.utcnow()
+    every = round(1 / full_share) if full_share else 0
+    rows = [
+        account_row(providers[i % len(providers)], i,
+                    None if every and i % every == 0 else now)
+        for i in range(accounts)
+    ]
+    with db.engine.begin() as conn:
+        for chunk in chunked(rows, 5000):
+            conn.execute(insert(Account), chunk)
+
+def written(db):
+    """Accounts whose check result is in the database"""
+    return sum(count for results in db.get_check_stats().values()
+               for result, count in results.items() if result is not None)
+
+def run_load(directory, urls, args, report=None):
+    """Seed args.accounts accounts in a database under directory and let CheckScheduler
+    check them against the stand-ins at urls {config key: URL}; report(elapsed, written)
+    is called every REPORT_INTERVAL. Returns (db, scheduler stats, seconds, written)"""
+    names = {key: provider for provider, key in CONFIG_KEYS.items()}
+    db = DatabaseManager(write_config(directory, args, urls))
+    seed_accounts(db, [names[key] for key in urls], args.accounts, args.full_share)
+    
+    engine = None
+    if args.engine == "process":
+        from services.process_engine import ProcessCheckEngine
+        engine = ProcessCheckEngine(db, os.path.join(directory, 'config.yaml'))
+        engine.start()
+    
+    # Every account is due at once and not again during the run
+    scheduler = CheckScheduler(db, settings={
+        'enabled': True, 'batch_size': args.batch_size, 'jitter': 0.0, 'idle_seconds': 1,
+        'intervals': {names[key]: 86400 for key in urls},
+        'full_intervals': {names[key]: 86400 * 7 for key in urls},
+    }, engine=engine)
+    
+    started = time.monotonic()
+    scheduler.start()
+    done = 0
+    try:
+        while done < args.accounts and time.monotonic() - started < args.timeout:
+            time.sleep(REPORT_INTERVAL)
+            done = written(db)
+            if report:
+                report(time.monotonic() - started, done)
+    finally:
+        scheduler.stop()
+        if engine is not None:
+            engine.stop()
+    return db, scheduler.stats, time.monotonic() - started, written(db)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=12000)
+    parser.add_argument('--providers', default="aws,digitalocean,linode")
+    parser.add_argument('--engine', choices=("thread", "process"), default="thread")
+    parser.add_argument('--processes', type=int, default=0, help="Worker processes, 0 is one per core")
+    parser.add_argument('--batch-size', type=int, default=200, help="Due accounts per dispatch")
+    parser.add_argument('--client-rate', type=float, default=300, help="Rate limiter requests/s per provider")
+    parser.add_argument('--server-rate', type=float, default=250, help="Stand-in requests/s before 429")
+    parser.add_argument('--key-rate', type=float, default=5, help="Stand-in requests/s per credential")
+    parser.add_argument('--full-share', type=float, default=0.02, help="Accounts due a full check")
+    parser.add_argument('--timeout', type=float, default=900, help="Seconds before giving up")
+    args = parser.parse_args()
+    
+    keys = args.providers.split(",")
+    names = {key: provider for provider, key in CONFIG_KEYS.items()}
+    servers = {key: BackgroundServer(STAND_INS[key][0].create_app(args.key_rate, args.key_rate * 2,
+                                                                  args.server_rate))
+               for key in keys}
+    
+    def report(elapsed, done):
+        throttled = ", ".join(f"{key} {server.app['stats']['throttled']}" for key, server in servers.items())
+        limits = ", ".join(f"{provider} {stats['limit']}"
+                           for provider, stats in get_concurrency_stats().items())
+        print(f"⏱️ {elapsed:6.1f}s {done}/{args.accounts} written, {done / elapsed:.1f}/s | "
+              f"429s: {throttled} | limits: {limits or '-'}")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        urls = {key: server.start() for key, server in servers.items()}
+        try:
+            db, stats, elapsed, done = run_load(directory, urls, args, report)
+            print()
+            print(f"{'provider':<14}{'requests':>10}{'429s':>8}{'304s':>8}  results")
+            for key, server in servers.items():
+                results = db.get_check_stats().get(names[key], {})
+                counts = ", ".join(f"{result or 'unchecked'} {count}"
+                                   for result, count in sorted(results.items(), key=lambda item: -item[1]))
+                print(f"{names[key]:<14}{server.app['stats']['requests']:>10}"
+                      f"{server.app['stats']['throttled']:>8}{server.app['stats'].get('not_modified', 0):>8}  {counts}")
+            print()
+            print(f"{done}/{args.accounts} results written in {elapsed:.1f}s ({done / elapsed:.1f} checks/s)")
+            print(f"scheduler: {stats}")
+            db.close()
+        finally:
+            for server in servers.values():
+                server.stop()
+    # Non-zero when any account's result never reached the database
+    return 0 if done >= args.accounts else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
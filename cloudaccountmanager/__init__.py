@@ -0,0 +1,11 @@
+"""
+Headless command line for Cloud Account Manager
+Uses the database and checker layers only and never imports PyQt6, so it
+starts fast and runs under cron or on servers without a display:
+
+    python -m cloudaccountmanager import accounts.csv
+    python -m cloudaccountmanager check --provider AWS --depth liveness
+    python -m cloudaccountmanager export - --format json
+    python -m cloudaccountmanager stats
+    python -m cloudaccountmanager purge
+"""
@@ -0,0 +1,9 @@
+"""
+Entry point of python -m cloudaccountmanager
+"""
+
+import sys
+from cloudaccountmanager.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Command line for Cloud Account Manager
+Subcommands import, export, check, stats and purge; log lines go to stderr so
+exports and stats can be piped
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import signal
+import sys
+from database.database import DatabaseManager
+from services.base_checker import DEPTHS, DEPTH_QUICK, RESULT_FAILED
+from services.checkers import CONFIG_KEYS
+from utils.batching import chunked
+
+FORMATS = ("json", "csv")
+
+# Account.to_dict writes each provider's 2FA column, Account.from_dict reads '2fa_secret'
+TWO_FA_KEYS = ('do_2fa_secret', 'linode_2fa_secret', 'azure_2fa_secret')
+
+def file_format(path, fmt):
+    """Explicit --format, else guessed from the file extension"""
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "json"
+
+def open_file(path, mode, stdio):
+    """Open path, '-' is stdin or stdout"""
+    if path == "-":
+        return contextlib.nullcontext(stdio)
+    return open(path, mode, newline='', encoding='utf-8')
+
+def read_accounts(path, fmt):
+    """Account dicts from a JSON list or a CSV file with a header row"""
+    with open_file(path, 'r', sys.stdin) as f:
+        if fmt == "csv":
+            return list(csv.DictReader(f))
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+def import_row(row, provider=None):
+    """Account dict ready for Account.from_dict, None when it cannot be imported"""
+    data = {key: value for key, value in row.items() if key and value not in (None, '')}
+    if provider:
+        data.setdefault('provider', provider)
+    if data.get('provider') not in CONFIG_KEYS or not data.get('email'):
+        return None
+    for key in TWO_FA_KEYS:
+        if key in data:
+            data.setdefault('2fa_secret', data[key])
+    return data
+
+def cmd_import(db, args, out):
+    """Add accounts from a JSON or CSV file"""
+    rows = read_accounts(args.file, file_format(args.file, args.format))
+    accounts = []
+    for number, row in enumerate(rows, 1):
+        data = import_row(row, args.provider)
+        if data is None:
+            print(f"⚠️ Row {number} skipped: needs a known provider and an email")
+            continue
+        accounts.append(data)
+    
+    imported = 0
+    for batch in chunked(accounts, args.batch_size):
+        imported += len(db.save_accounts(batch))
+    print(f"📥 Imported {imported} of {len(rows)} accounts")
+    return 0
+
+def cmd_export(db, args, out):
+    """Write live accounts to a JSON or CSV file"""
+    accounts = [account.to_dict() for account in db.get_all_accounts(args.provider)]
+    with open_file(args.file, 'w', out) as f:
+        if file_format(args.file, args.format) == "csv":
+            # Providers have different columns, the header is their union in first-seen order
+            fields = list(dict.fromkeys(key for account in accounts for key in account))
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(accounts)
+        else:
+            json.dump(accounts, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+    print(f"📤 Exported {len(accounts)} accounts")
+    return 0
+
+def cmd_check(db, args, out):
+    """Check accounts and write the results to the database"""
+    from services.check_run import CheckRun
+    from services.proxy_settings import get_checker_proxy_url
+    
+    if args.id:
+        account_ids = args.id
+    else:
+        account_ids = [account.id for account in db.get_all_accounts(args.provider)]
+    if not account_ids:
+        print("⚠️ No accounts to check")
+        return 0
+    
+    # Worker processes need it too, or they would reach providers without the proxy
+    proxy_url = args.proxy or get_checker_proxy_url()
+    engine = None
+    if (db.config.get('check_engine') or {}).get('mode') == 'process':
+        from services.process_engine import ProcessCheckEngine
+        engine = ProcessCheckEngine(db, args.config, proxy_url)
+        engine.start()
+    
+    # Redraw one line on a terminal, stay quiet in cron mails and logs
+    report = None
+    if sys.stderr.isatty():
+        def report(progress):
+            sys.stderr.write(
+                f"\r🔍 {progress['done']}/{progress['total']} checked, {progress['failed']} failed, "
+                f"{progress['deferred']} deferred | {progress['rate']}/s "
+            )
+            sys.stderr.flush()
+    
+    run = CheckRun(db, account_ids, proxy_url, args.force, args.depth, engine, on_progress=report)
+    
+    def interrupt(signum, frame):
+        """First Ctrl+C cancels the run, a second one exits at once"""
+        print("\n🛑 Cancelling, waiting for running checks (Ctrl+C again to quit)")
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        # Runs on the thread that may be inside run.flush(), so only set the flags
+        run.request_cancel()
+    
+    signal.signal(signal.SIGINT, interrupt)
+    try:
+        results = run.run()
+    finally:
+        if engine is not None:
+            engine.stop()
+    if report:
+        sys.stderr.write("\n")
+    
+    progress = run.get_progress()
+    print(
+        f"✅ Checked {progress['checked']} of {progress['total']} accounts in {progress['elapsed']}s: "
+        f"{progress['failed']} failed, {progress['deferred']} deferred, {progress['cached']} cached"
+        + (f", {progress['remaining'] + progress['cancelled']} cancelled" if run.cancelled else "")
+    )
+    if args.verbose:
+        for result in results:
+            if result.get('check_result') == RESULT_FAILED:
+                print(f"❌ #{result['id']}: {result.get('error') or result.get('limits') or ''}")
+    return 130 if run.cancelled else 0
+
+def cmd_stats(db, args, out):
+    """Account counts per provider and check result, plus the job queue"""
+    stats = {
+        'accounts': db.get_check_stats(),
+        'jobs': db.jobs.get_stats(),
+    }
+    if args.json:
+        json.dump(stats, out, indent=2, default=str)
+        out.write("\n")
+        return 0
+    
+    for provider, results in sorted(stats['accounts'].items()):
+        counts = ', '.join(f"{result or 'never checked'} {count}"
+                           for result, count in sorted(results.items(), key=lambda item: -item[1]))
+        out.write(f"{provider:>12}: {sum(results.values())} accounts ({counts})\n")
+    out.write(f"{'jobs':>12}: " + ', '.join(f"{status} {count}" for status, count in stats['jobs'].items()) + "\n")
+    return 0
+
+def cmd_purge(db, args, out):
+    """Hard-delete accounts deleted longer ago than the undo window"""
+    purged = db.purge_deleted_accounts()
+    print(f"🧹 Purged {purged} deleted accounts")
+    return 0
+
+def build_parser():
+    """Argument parser of every subcommand"""
+    parser = argparse.ArgumentParser(prog="cloudaccountmanager",
+                                     description="Cloud Account Manager without the GUI")
+    parser.add_argument("--config", default="config.yaml", help="Path to config.yaml")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    import_parser = commands.add_parser("import", help="Add accounts from a JSON or CSV file")
+    import_parser.add_argument("file", help="File to read, - for stdin")
+    import_parser.add_argument("--format", choices=FORMATS, help="Default: from the file extension")
+    import_parser.add_argument("--provider", choices=list(CONFIG_KEYS),
+                               help="Provider of rows that do not name one")
+    import_parser.add_argument("--batch-size", type=int, default=1000,
+                               help="Accounts saved per transaction")
+    import_parser.set_defaults(handler=cmd_import)
+    
+    export_parser = commands.add_parser("export", help="Write live accounts to a JSON or CSV file")
+    export_parser.add_argument("file", help="File to write, - for stdout")
+    export_parser.add_argument("--format", choices=FORMATS, help="Default: from the file extension")
+    export_parser.add_argument("--provider", choices=list(CONFIG_KEYS))
+    export_parser.set_defaults(handler=cmd_export)
+    
+    check_parser = commands.add_parser("check", help="Check accounts and save the results")
+    check_parser.add_argument("--provider", choices=list(CONFIG_KEYS))
+    check_parser.add_argument("--id", type=int, action="append", help="Account ID (repeatable)")
+    check_parser.add_argument("--depth", choices=DEPTHS, default=DEPTH_QUICK)
+    check_parser.add_argument("--force", action="store_true", help="Skip cached results")
+    check_parser.add_argument("--proxy", help="Proxy URL, default: config/proxy_settings.json")
+    check_parser.add_argument("-v", "--verbose", action="store_true", help="List failed accounts")
+    check_parser.set_defaults(handler=cmd_check)
+    
+    stats_parser = commands.add_parser("stats", help="Account and job counts")
+    stats_parser.add_argument("--json", action="store_true", help="Machine readable output")
+    stats_parser.set_defaults(handler=cmd_stats)
+    
+    purge_parser = commands.add_parser("purge", help="Hard-delete expired deleted accounts")
+    purge_parser.set_defaults(handler=cmd_purge)
+    return parser
+
+def main(argv=None):
+    """Command line entry point, returns the exit code"""
+    args = build_parser().parse_args(argv)
+    out = sys.stdout
+    # Database and checker messages are logs, stdout only carries command output
+    with contextlib.redirect_stdout(sys.stderr):
+        db = DatabaseManager(args.config)
+        try:
+            return args.handler(db, args, out)
+        finally:
+            db.close()
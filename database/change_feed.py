@@ -0,0 +1,48 @@
+"""
+Change feed: lets caches and views react to account writes
+"""
+
+import threading
+
+# Kinds of changes published by DatabaseManager
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+RESTORED = 'restored'
+PURGED = 'purged'
+TAGGED = 'tagged'
+
+class ChangeFeed:
+    """Publish/subscribe hub for account changes"""
+    
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+    
+    def subscribe(self, callback):
+        """Register callback(kind, account_ids); account_ids is None when any row may have changed"""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback):
+        """Remove a previously registered callback"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def emit(self, kind, account_ids=None):
+        """Notify subscribers in registration order, in the caller's thread"""
+        if account_ids is not None:
+            account_ids = list(account_ids)
+            if not account_ids:
+                return
+        
+        with self._lock:
+            subscribers = list(self._subscribers)
+        
+        for callback in subscribers:
+            try:
+                callback(kind, account_ids)
+            except Exception as e:
+                print(f"❌ Error in change feed subscriber: {e}")
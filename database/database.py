@@ -1,130 +1,614 @@
-"""
-Database manager for the application
-"""
-
-import os
-import sys
-import yaml
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.pool import StaticPool
-from models.account import Base, Account
-
-class DatabaseManager:
-    """Manager for database operations"""
-    
-    def __init__(self, config_path='config.yaml'):
-        self.config = self._load_config(config_path)
-        self.engine = None
-        self.Session = None
-        self.db_path = self._get_db_path()
-        print(f"📁 Database path: {self.db_path}")
-        self._init_database()
-    
-    def _get_db_path(self):
-        """Get the absolute path to the database file"""
-        db_url = self.config.get('database', {}).get('url', 'sqlite:///cloud_accounts.db')
-        
-        if 'sqlite:///' in db_url:
-            db_path = db_url.replace('sqlite:///', '')
-            
-            if not os.path.isabs(db_path):
-                project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                db_path = os.path.join(project_root, db_path)
-            
-            os.makedirs(os.path.dirname(db_path), exist_ok=True)
-            return db_path
-        
-        return None
-    
-    def _load_config(self, config_path):
-        """Load configuration from YAML file"""
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                return yaml.safe_load(f)
-        
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        config_in_root = os.path.join(project_root, 'config.yaml')
-        
-        if os.path.exists(config_in_root):
-            with open(config_in_root, 'r') as f:
-                return yaml.safe_load(f)
-        
-        print("⚠️ Config file not found, using defaults")
-        return {'database': {'url': 'sqlite:///cloud_accounts.db'}}
-    
-    def _init_database(self):
-        """Initialize database connection and create tables"""
-        db_url = f'sqlite:///{self.db_path}'
-        print(f"🔗 Database URL: {db_url}")
-        
-        self.engine = create_engine(
-            db_url,
-            connect_args={'check_same_thread': False},
-            poolclass=StaticPool,
-            echo=True
-        )
-        
-        print("🗄️ Creating tables...")
-        Base.metadata.create_all(self.engine)
-        
-        self.Session = scoped_session(sessionmaker(bind=self.engine))
-        
-        if os.path.exists(self.db_path):
-            file_size = os.path.getsize(self.db_path)
-            print(f"✅ Database created: {self.db_path} ({file_size} bytes)")
-        else:
-            print(f"❌ Database file not found at: {self.db_path}")
-    
-    def get_session(self):
-        """Get a new database session"""
-        return self.Session()
-    
-    def save_account(self, account_data):
-        """Save account to database"""
-        session = self.get_session()
-        try:
-            account = Account.from_dict(account_data)
-            session.add(account)
-            session.commit()
-            session.refresh(account)
-            return account.id
-        except Exception as e:
-            session.rollback()
-            print(f"❌ Error saving account: {e}")
-            raise e
-        finally:
-            session.close()
-    
-    def get_all_accounts(self, provider=None):
-        """Get all accounts, optionally filtered by provider"""
-        session = self.get_session()
-        try:
-            query = session.query(Account)
-            if provider:
-                query = query.filter(Account.provider == provider)
-            return query.order_by(Account.created_at.desc()).all()
-        finally:
-            session.close()
-    
-    def delete_account(self, account_id):
-        """Delete account by ID"""
-        session = self.get_session()
-        try:
-            account = session.query(Account).filter(Account.id == account_id).first()
-            if account:
-                session.delete(account)
-                session.commit()
-                return True
-            return False
-        except Exception as e:
-            session.rollback()
-            print(f"❌ Error deleting account: {e}")
-            return False
-        finally:
-            session.close()
-    
-    def close(self):
-        """Close database connection"""
-        if self.engine:
+"""
+Database manager for the application
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+import yaml
+from sqlalchemy import create_engine, inspect, select, update, delete, func, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import StaticPool
+from models.account import Base, Account
+from models.tag import Tag, account_tags
+from models.region_quota import AccountRegionQuota
+from models.check_job import CheckJob
+from database.filters import compile_filters, country_column
+from database.change_feed import ChangeFeed, CREATED, UPDATED, DELETED, RESTORED, PURGED, TAGGED
+from database.job_queue import JobQueue
+from database.saved_views import SavedViewCache
+from database.statements import StatementCache
+from utils.batching import chunked
+from utils.validators import validate_bulk_fields
+
+# Soft delete / purge cycle defaults, overridable under database.purge in config.yaml
+DEFAULT_PURGE_SETTINGS = {
+    'undo_window_seconds': 300,   # Deleted accounts can be restored for this long
+    'interval_seconds': 600,      # How often the background purge job runs
+    'batch_size': 500,            # Rows hard-deleted per transaction
+    'vacuum_pages': 2000,         # Free pages returned per incremental_vacuum step
+}
+
+# Columns a provider checker may write back
+CHECK_RESULT_FIELDS = ('check_result', 'last_check', 'last_full_check', 'quota_used',
+                       'quota_limit', 'limits', 'subscription')
+
+class DatabaseManager:
+    """Manager for database operations"""
+    
+    def __init__(self, config_path='config.yaml'):
+        self.config = self._load_config(config_path)
+        self.engine = None
+        self.Session = None
+        self.purge_settings = dict(DEFAULT_PURGE_SETTINGS)
+        self.purge_settings.update(self.config.get('database', {}).get('purge') or {})
+        self._purge_thread = None
+        self._purge_stop = threading.Event()
+        # The engine shares one connection, so concurrent check batches take turns writing
+        self._write_lock = threading.Lock()
+        self.changes = ChangeFeed()
+        self.db_path = self._get_db_path()
+        print(f"📁 Database path: {self.db_path}")
+        self._init_database()
+    
+    def _get_db_path(self):
+        """Get the absolute path to the database file"""
+        db_url = self.config.get('database', {}).get('url', 'sqlite:///cloud_accounts.db')
+        
+        if 'sqlite:///' in db_url:
+            db_path = db_url.replace('sqlite:///', '')
+            # In-memory database, e.g. for tests; the shared connection keeps it alive
+            if db_path == ':memory:':
+                return db_path
+            
+            if not os.path.isabs(db_path):
+                project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                db_path = os.path.join(project_root, db_path)
+            
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            return db_path
+        
+        return None
+    
+    def _load_config(self, config_path):
+        """Load configuration from YAML file"""
+        if os.path.exists(config_path):
+            with open(config_path, 'r') as f:
+                return yaml.safe_load(f)
+        
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        config_in_root = os.path.join(project_root, 'config.yaml')
+        
+        if os.path.exists(config_in_root):
+            with open(config_in_root, 'r') as f:
+                return yaml.safe_load(f)
+        
+        print("⚠️ Config file not found, using defaults")
+        return {'database': {'url': 'sqlite:///cloud_accounts.db'}}
+    
+    def _init_database(self):
+        """Initialize database connection and create tables"""
+        db_url = f'sqlite:///{self.db_path}'
+        print(f"🔗 Database URL: {db_url}")
+        
+        self.engine = create_engine(
+            db_url,
+            connect_args={'check_same_thread': False},
+            poolclass=StaticPool,
+            echo=self.config.get('database', {}).get('echo', True)
+        )
+        self.statements = StatementCache(self.engine)
+        
+        self._enable_incremental_vacuum()
+        
+        print("🗄️ Creating tables...")
+        Base.metadata.create_all(self.engine)
+        self._migrate_schema()
+        
+        self.Session = scoped_session(sessionmaker(bind=self.engine))
+        
+        if self.db_path == ':memory:':
+            print("✅ In-memory database created")
+        elif os.path.exists(self.db_path):
+            file_size = os.path.getsize(self.db_path)
+            print(f"✅ Database created: {self.db_path} ({file_size} bytes)")
+        else:
+            print(f"❌ Database file not found at: {self.db_path}")
+        
+        self.views = SavedViewCache(self)
+        self.jobs = JobQueue(self)
+    
+    def _enable_incremental_vacuum(self):
+        """Switch the file to auto_vacuum=INCREMENTAL so purges can give space back"""
+        with self.engine.connect() as conn:
+            if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+                return
+            conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            
+            # An existing file only picks up the new mode after one full VACUUM
+            if conn.exec_driver_sql("SELECT count(*) FROM sqlite_master").scalar():
+                print("🧹 Converting database to incremental auto-vacuum...")
+                conn.exec_driver_sql("VACUUM")
+    
+    def _migrate_schema(self):
+        """Add columns and indexes introduced after the database file was created"""
+        columns = {column['name'] for column in inspect(self.engine).get_columns('accounts')}
+        
+        with self.engine.begin() as conn:
+            if 'deleted_at' not in columns:
+                print("🔧 Adding accounts.deleted_at column...")
+                conn.exec_driver_sql("ALTER TABLE accounts ADD COLUMN deleted_at DATETIME")
+            if 'last_full_check' not in columns:
+                print("🔧 Adding accounts.last_full_check column...")
+                conn.exec_driver_sql("ALTER TABLE accounts ADD COLUMN last_full_check DATETIME")
+            
+            for index in Account.__table__.indexes:
+                index.create(conn, checkfirst=True)
+    
+    def get_session(self):
+        """Get a new database session"""
+        return self.Session()
+    
+    def save_account(self, account_data):
+        """Save account to database"""
+        session = self.get_session()
+        try:
+            account = Account.from_dict(account_data)
+            session.add(account)
+            session.commit()
+            session.refresh(account)
+            self.changes.emit(CREATED, [account.id])
+            return account.id
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error saving account: {e}")
+            raise e
+        finally:
+            session.close()
+    
+    def save_accounts(self, accounts_data):
+        """Save many accounts in one transaction, returns their IDs"""
+        session = self.get_session()
+        try:
+            accounts = [Account.from_dict(data) for data in accounts_data]
+            session.add_all(accounts)
+            session.flush()
+            account_ids = [account.id for account in accounts]
+            session.commit()
+            if account_ids:
+                self.changes.emit(CREATED, account_ids)
+            return account_ids
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error saving accounts: {e}")
+            raise e
+        finally:
+            session.close()
+    
+    def update_accounts(self, account_ids, fields):
+        """Set the same field values on many accounts, returns the number of rows updated"""
+        is_valid, error_msg = validate_bulk_fields(fields)
+        if not is_valid:
+            raise ValueError(error_msg)
+        if not account_ids:
+            return 0
+        
+        values = {getattr(Account, field): value for field, value in fields.items()}
+        session = self.get_session()
+        try:
+            updated = 0
+            # One UPDATE per chunk of IDs, all in a single transaction
+            for chunk in chunked(account_ids):
+                updated += session.query(Account).filter(
+                    Account.id.in_(chunk),
+                    Account.deleted_at.is_(None)
+                ).update(values, synchronize_session=False)
+            session.commit()
+            self.changes.emit(UPDATED, account_ids)
+            return updated
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error updating accounts: {e}")
+            raise e
+        finally:
+            session.close()
+    
+    def save_check_results(self, results):
+        """Write checker results (dicts with 'id' and result columns) in one transaction"""
+        if not results:
+            return 0
+        
+        # Results carrying the same columns share one executemany UPDATE
+        groups = {}
+        for result in results:
+            fields = tuple(field for field in CHECK_RESULT_FIELDS if field in result)
+            row = {f'_{field}': result[field] for field in fields}
+            row['_id'] = result['id']
+            groups.setdefault(fields, []).append(row)
+        
+        # Full AWS checks also carry per-region rows, which replace the old ones
+        swept = [result for result in results if 'regions' in result]
+        
+        try:
+            with self._write_lock, self.engine.begin() as conn:
+                for fields, rows in groups.items():
+                    statement = update(Account).where(Account.id == bindparam('_id')).values(
+                        {field: bindparam(f'_{field}') for field in fields}
+                    )
+                    conn.execute(statement, rows)
+                if swept:
+                    self._save_region_quotas(conn, swept)
+            self.changes.emit(UPDATED, [result['id'] for result in results])
+            return len(results)
+        except Exception as e:
+            print(f"❌ Error saving check results: {e}")
+            return 0
+    
+    def _save_region_quotas(self, conn, results):
+        """Replace the per-region quota rows of swept accounts"""
+        for chunk in chunked([result['id'] for result in results]):
+            conn.execute(delete(AccountRegionQuota).where(AccountRegionQuota.account_id.in_(chunk)))
+        rows = [
+            dict(region, account_id=result['id'], checked_at=result.get('last_check'))
+            for result in results for region in result['regions']
+        ]
+        if rows:
+            conn.execute(AccountRegionQuota.__table__.insert(), rows)
+    
+    def get_region_quotas(self, account_id):
+        """Per-region quota rows of an account from its last full check"""
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(AccountRegionQuota)
+                .where(AccountRegionQuota.account_id == account_id)
+                .order_by(AccountRegionQuota.region)
+            ).mappings().all()
+    
+    def get_all_accounts(self, provider=None):
+        """Get all accounts, optionally filtered by provider"""
+        session = self.get_session()
+        try:
+            if provider:
+                statement = self.statements.get('list_by_provider')
+                return session.execute(statement, {'provider': provider}).scalars().all()
+            return session.execute(self.statements.get('list_all')).scalars().all()
+        finally:
+            session.close()
+    
+    def count_accounts(self, provider=None):
+        """Count live accounts, optionally filtered by provider"""
+        with self.engine.connect() as conn:
+            if provider:
+                statement = self.statements.get('count_by_provider')
+                return conn.execute(statement, {'provider': provider}).scalar()
+            return conn.execute(self.statements.get('count_all')).scalar()
+    
+    def get_check_stats(self):
+        """Live account counts as {provider: {check_result: count}}, None for never checked"""
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(Account.provider, Account.check_result, func.count())
+                .where(Account.deleted_at.is_(None))
+                .group_by(Account.provider, Account.check_result)
+            ).all()
+        stats = {}
+        for provider, check_result, count in rows:
+            stats.setdefault(provider, {})[check_result] = count
+        return stats
+    
+    def get_statement_cache_stats(self):
+        """Hit/miss counters of the hot query statement cache"""
+        return self.statements.get_stats()
+    
+    def get_accounts_by_filter(self, filters):
+        """Get accounts matching a filter dict (see database.filters.compile_filters)"""
+        session = self.get_session()
+        try:
+            return (
+                session.query(Account)
+                .filter(*compile_filters(filters))
+                .order_by(Account.created_at.desc())
+                .all()
+            )
+        finally:
+            session.close()
+    
+    def get_accounts_by_ids(self, account_ids):
+        """Get live accounts by primary key, newest first"""
+        session = self.get_session()
+        try:
+            accounts = []
+            statement = self.statements.get('by_ids')
+            for chunk in chunked(account_ids):
+                accounts.extend(session.execute(statement, {'account_ids': chunk}).scalars())
+            accounts.sort(key=lambda account: account.created_at or datetime.min, reverse=True)
+            return accounts
+        finally:
+            session.close()
+    
+    def save_view(self, name, filters):
+        """Save a named filter view, returns the number of matching accounts"""
+        return self.views.save(name, filters)
+    
+    def delete_view(self, name):
+        """Delete a saved view"""
+        return self.views.delete(name)
+    
+    def get_views(self):
+        """Get (name, count) of saved views without touching the accounts table"""
+        return self.views.get_views()
+    
+    def get_view_filters(self, name):
+        """Get the filter dict of a saved view"""
+        return self.views.get_filters(name)
+    
+    def open_view(self, name):
+        """Get accounts of a saved view from its cached ID list"""
+        return self.get_accounts_by_ids(self.views.get_ids(name))
+    
+    def get_account_by_id(self, account_id):
+        """Get a single live account by ID"""
+        session = self.get_session()
+        try:
+            statement = self.statements.get('by_id')
+            return session.execute(statement, {'account_id': account_id}).scalars().first()
+        finally:
+            session.close()
+    
+    def _get_unique_values(self, column, provider=None):
+        """Distinct non-empty values of a column among live accounts"""
+        statement = self.statements.unique_values(column, bool(provider))
+        with self.engine.connect() as conn:
+            return list(conn.execute(statement, {'provider': provider} if provider else {}).scalars())
+    
+    def get_unique_regions(self, provider=None):
+        """Distinct regions used by accounts"""
+        return self._get_unique_values(Account.region, provider)
+    
+    def get_unique_countries(self, provider=None):
+        """Distinct registration countries used by accounts"""
+        return self._get_unique_values(country_column(provider), provider)
+    
+    def get_unique_payment_methods(self, provider=None):
+        """Distinct payment methods used by accounts"""
+        return self._get_unique_values(Account.payment_method, provider)
+    
+    def get_unique_subscriptions(self):
+        """Distinct Azure subscription types"""
+        return self._get_unique_values(Account.subscription, 'Azure')
+    
+    def get_tags(self):
+        """Get all tag names with the number of live accounts carrying each"""
+        session = self.get_session()
+        try:
+            rows = (
+                session.query(Tag.name, func.count(Account.id))
+                .outerjoin(account_tags, account_tags.c.tag_id == Tag.id)
+                .outerjoin(Account, (Account.id == account_tags.c.account_id) & Account.deleted_at.is_(None))
+                .group_by(Tag.id)
+                .order_by(Tag.name)
+                .all()
+            )
+            return [(name, count) for name, count in rows]
+        finally:
+            session.close()
+    
+    def get_account_tags(self, account_id):
+        """Get tag names attached to an account"""
+        session = self.get_session()
+        try:
+            rows = (
+                session.query(Tag.name)
+                .join(account_tags, account_tags.c.tag_id == Tag.id)
+                .filter(account_tags.c.account_id == account_id)
+                .order_by(Tag.name)
+                .all()
+            )
+            return [name for (name,) in rows]
+        finally:
+            session.close()
+    
+    def _ensure_tags(self, session, tag_names):
+        """Create missing tags, returns {name: id}"""
+        session.execute(
+            sqlite_insert(Tag).on_conflict_do_nothing(index_elements=['name']),
+            [{'name': name, 'created_at': datetime.utcnow()} for name in tag_names]
+        )
+        rows = session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(tag_names))).all()
+        return dict(rows)
+    
+    def tag_accounts(self, account_ids, tag_names):
+        """Attach tags to many accounts at once, creating tags as needed"""
+        tag_names = sorted({name.strip() for name in tag_names if name and name.strip()})
+        if not account_ids or not tag_names:
+            return 0
+        
+        session = self.get_session()
+        try:
+            tag_ids = self._ensure_tags(session, tag_names).values()
+            linked = 0
+            for chunk in chunked(account_ids):
+                result = session.execute(
+                    sqlite_insert(account_tags).on_conflict_do_nothing(),
+                    [{'account_id': account_id, 'tag_id': tag_id}
+                     for account_id in chunk for tag_id in tag_ids]
+                )
+                linked += max(result.rowcount, 0)
+            session.commit()
+            self.changes.emit(TAGGED, account_ids)
+            return linked
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error tagging accounts: {e}")
+            raise e
+        finally:
+            session.close()
+    
+    def untag_accounts(self, account_ids, tag_names):
+        """Detach tags from many accounts at once"""
+        if not account_ids or not tag_names:
+            return 0
+        
+        session = self.get_session()
+        try:
+            tag_ids = select(Tag.id).where(Tag.name.in_(list(tag_names)))
+            removed = 0
+            for chunk in chunked(account_ids):
+                result = session.execute(
+                    delete(account_tags).where(
+                        account_tags.c.tag_id.in_(tag_ids),
+                        account_tags.c.account_id.in_(chunk)
+                    )
+                )
+                removed += result.rowcount
+            session.commit()
+            self.changes.emit(TAGGED, account_ids)
+            return removed
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error untagging accounts: {e}")
+            raise e
+        finally:
+            session.close()
+    
+    def delete_tag(self, tag_name):
+        """Delete a tag and detach it from all accounts"""
+        session = self.get_session()
+        try:
+            tag = session.query(Tag).filter(Tag.name == tag_name).first()
+            if not tag:
+                return False
+            session.execute(delete(account_tags).where(account_tags.c.tag_id == tag.id))
+            session.delete(tag)
+            session.commit()
+            self.changes.emit(TAGGED)
+            return True
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error deleting tag: {e}")
+            return False
+        finally:
+            session.close()
+    
+    def delete_account(self, account_id):
+        """Delete account by ID (soft delete, restorable during the undo window)"""
+        return self.delete_accounts([account_id]) > 0
+    
+    def delete_accounts(self, account_ids):
+        """Soft-delete accounts by ID, returns the number of rows tombstoned"""
+        if not account_ids:
+            return 0
+        
+        session = self.get_session()
+        try:
+            count = session.query(Account).filter(
+                Account.id.in_(list(account_ids)),
+                Account.deleted_at.is_(None)
+            ).update({Account.deleted_at: datetime.utcnow()}, synchronize_session=False)
+            session.commit()
+            self.changes.emit(DELETED, account_ids)
+            return count
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error deleting accounts: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def restore_accounts(self, account_ids):
+        """Undo soft delete for accounts still inside the undo window"""
+        if not account_ids:
+            return 0
+        
+        session = self.get_session()
+        try:
+            count = session.query(Account).filter(
+                Account.id.in_(list(account_ids)),
+                Account.deleted_at >= self._purge_cutoff()
+            ).update({Account.deleted_at: None}, synchronize_session=False)
+            session.commit()
+            self.changes.emit(RESTORED, account_ids)
+            return count
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error restoring accounts: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def _purge_cutoff(self):
+        """Tombstones older than this are past the undo window"""
+        return datetime.utcnow() - timedelta(seconds=self.purge_settings['undo_window_seconds'])
+    
+    def purge_deleted_accounts(self, batch_size=None):
+        """Hard-delete expired tombstones in small batches, then reclaim free pages"""
+        batch_size = batch_size or self.purge_settings['batch_size']
+        cutoff = self._purge_cutoff()
+        purged_ids = []
+        
+        while True:
+            # One short transaction per batch so readers are never blocked for long
+            with self.engine.begin() as conn:
+                ids = conn.execute(
+                    select(Account.id)
+                    .where(Account.deleted_at.isnot(None), Account.deleted_at < cutoff)
+                    .limit(batch_size)
+                ).scalars().all()
+                if ids:
+                    # Foreign keys are not enforced by SQLite, drop links explicitly
+                    conn.execute(delete(account_tags).where(account_tags.c.account_id.in_(ids)))
+                    conn.execute(delete(AccountRegionQuota).where(AccountRegionQuota.account_id.in_(ids)))
+                    conn.execute(delete(CheckJob).where(CheckJob.account_id.in_(ids)))
+                    conn.execute(delete(Account).where(Account.id.in_(ids)))
+            
+            purged_ids.extend(ids)
+            if len(ids) < batch_size:
+                break
+        
+        if purged_ids:
+            self.changes.emit(PURGED, purged_ids)
+            self.incremental_vacuum()
+        return len(purged_ids)
+    
+    def incremental_vacuum(self, pages=None):
+        """Return free pages to the OS without the long exclusive lock of a full VACUUM"""
+        pages = int(pages or self.purge_settings['vacuum_pages'])
+        with self.engine.connect() as conn:
+            # The pragma frees one page per step; executescript steps it to completion
+            conn.connection.driver_connection.executescript(
+                f"PRAGMA incremental_vacuum({pages});"
+            )
+    
+    def start_purge_job(self):
+        """Start the background thread that purges expired tombstones"""
+        if self._purge_thread and self._purge_thread.is_alive():
+            return
+        
+        self._purge_stop.clear()
+        self._purge_thread = threading.Thread(target=self._purge_loop, name="purge-job", daemon=True)
+        self._purge_thread.start()
+    
+    def stop_purge_job(self):
+        """Stop the background purge thread"""
+        self._purge_stop.set()
+        if self._purge_thread:
+            self._purge_thread.join(timeout=5)
+            self._purge_thread = None
+    
+    def _purge_loop(self):
+        """Purge job body, runs every purge interval until stopped"""
+        while not self._purge_stop.wait(self.purge_settings['interval_seconds']):
+            try:
+                purged = self.purge_deleted_accounts()
+                if purged:
+                    print(f"🧹 Purged {purged} deleted accounts")
+            except Exception as e:
+                print(f"❌ Error purging deleted accounts: {e}")
+    
+    def close(self):
+        """Close database connection"""
+        self.stop_purge_job()
+        if self.engine:
             self.engine.dispose()
\ No newline at end of file
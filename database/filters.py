@@ -0,0 +1,96 @@
+"""
+Filter compiler: turns the filter dicts built by the UI into SQL criteria
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, or_, and_
+from models.account import Account
+from models.tag import Tag, account_tags
+
+# "Added" combo values -> age of the account
+TIME_FILTERS = {
+    'day': timedelta(days=1),
+    'days2': timedelta(days=2),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=30),
+}
+
+# AWS quota combo values -> usage percentage range (matches the combo labels)
+QUOTA_RANGES = {
+    'low': lambda percentage: percentage < 30,
+    'medium': lambda percentage: percentage.between(30, 70),
+    'high': lambda percentage: percentage > 70,
+}
+
+def country_column(provider):
+    """Registration country column used by the provider"""
+    if provider == 'Linode':
+        return Account.linode_country
+    if provider == 'Azure':
+        return Account.azure_country
+    return Account.country
+
+def tagged_account_ids(tag_names, match_all=False):
+    """Subquery of account IDs carrying the given tags (served by ix_account_tags_tag_account)"""
+    query = (
+        select(account_tags.c.account_id)
+        .join(Tag, Tag.id == account_tags.c.tag_id)
+        .where(Tag.name.in_(tag_names))
+    )
+    if match_all:
+        query = query.group_by(account_tags.c.account_id).having(
+            func.count(account_tags.c.tag_id) == len(set(tag_names))
+        )
+    return query
+
+def compile_filters(filters):
+    """Compile a filter dict into a list of WHERE criteria for Account"""
+    filters = filters or {}
+    provider = filters.get('provider')
+    criteria = [Account.deleted_at.is_(None)]
+
+    if provider:
+        criteria.append(Account.provider == provider)
+
+    if filters.get('region'):
+        criteria.append(Account.region == filters['region'])
+
+    if filters.get('country'):
+        if provider:
+            criteria.append(country_column(provider) == filters['country'])
+        else:
+            criteria.append(or_(
+                Account.country == filters['country'],
+                Account.linode_country == filters['country'],
+                Account.azure_country == filters['country']
+            ))
+
+    if filters.get('payment_method'):
+        criteria.append(func.lower(Account.payment_method) == filters['payment_method'].lower())
+
+    if filters.get('subscription'):
+        criteria.append(Account.subscription == filters['subscription'])
+
+    quota = filters.get('quota')
+    if quota in QUOTA_RANGES:
+        percentage = Account.quota_used * 100.0 / Account.quota_limit
+        criteria.append(Account.quota_limit > 0)
+        criteria.append(QUOTA_RANGES[quota](percentage))
+    elif quota == 'no_data':
+        criteria.append(or_(
+            Account.quota_limit.is_(None), Account.quota_limit == 0,
+            Account.quota_used.is_(None), Account.quota_used == 0
+        ))
+    elif quota == 'with_limits':
+        criteria.append(and_(Account.limits.isnot(None), Account.limits != ''))
+    elif quota == 'no_limits':
+        criteria.append(or_(Account.limits.is_(None), Account.limits == ''))
+
+    if filters.get('time_filter') in TIME_FILTERS:
+        criteria.append(Account.created_at >= datetime.utcnow() - TIME_FILTERS[filters['time_filter']])
+
+    if filters.get('tags'):
+        match_all = filters.get('tag_mode') == 'all'
+        criteria.append(Account.id.in_(tagged_account_ids(filters['tags'], match_all)))
+
+    return criteria
@@ -0,0 +1,190 @@
+"""
+Durable check job queue in the check_jobs table
+Workers on any machine sharing the database claim jobs atomically under a lease;
+jobs of a crashed worker become claimable again once its lease runs out
+"""
+
+import os
+import socket
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, delete, func, and_, or_, exists, literal, bindparam
+from models.account import Account
+from models.check_job import CheckJob, JOB_PENDING, JOB_LEASED, JOB_DONE, JOB_DEAD
+from utils.batching import chunked
+
+# Defaults, overridable under job_queue in config.yaml
+DEFAULT_JOB_QUEUE_SETTINGS = {
+    'lease_seconds': 300,       # A claimed job is re-leased if not finished or renewed by then
+    'max_attempts': 3,          # Claims before a job is dead-lettered
+    'retry_seconds': 60,        # Backoff after a failed attempt, doubled per attempt
+    'keep_done_seconds': 86400, # Finished jobs are pruned after this
+}
+
+def default_owner():
+    """Lease owner name of this process"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class JobQueue:
+    """Enqueue, claim, complete and retry check jobs"""
+    
+    # Only Core connections are used: claims must be single statements so two
+    # workers can never lease the same job
+    
+    def __init__(self, db_manager, settings=None):
+        self.db = db_manager
+        if settings is None:
+            settings = db_manager.config.get('job_queue') or {}
+        self.settings = dict(DEFAULT_JOB_QUEUE_SETTINGS, **settings)
+    
+    def enqueue(self, depth, provider=None, account_ids=None):
+        """Queue one job per live account, skipping accounts with an open job of that depth"""
+        open_job = exists().where(
+            CheckJob.account_id == Account.id,
+            CheckJob.depth == depth,
+            CheckJob.status.in_((JOB_PENDING, JOB_LEASED))
+        )
+        now = datetime.utcnow()
+        source = select(
+            Account.id, Account.provider, literal(depth), literal(JOB_PENDING), literal(0),
+            literal(self.settings['max_attempts']), literal(now), literal(now)
+        ).where(Account.deleted_at.is_(None), ~open_job)
+        if provider:
+            source = source.where(Account.provider == provider)
+        
+        columns = ['account_id', 'provider', 'depth', 'status', 'attempts', 'max_attempts',
+                   'available_at', 'created_at']
+        queued = 0
+        with self.db.engine.begin() as conn:
+            if account_ids is None:
+                queued = conn.execute(CheckJob.__table__.insert().from_select(columns, source)).rowcount
+            else:
+                for chunk in chunked(account_ids):
+                    queued += conn.execute(CheckJob.__table__.insert().from_select(
+                        columns, source.where(Account.id.in_(chunk))
+                    )).rowcount
+        return queued
+    
+    def claim(self, owner, limit, providers=None):
+        """Lease up to limit due jobs, returns rows of (id, account_id, provider, depth, attempts)"""
+        now = datetime.utcnow()
+        expired = and_(CheckJob.status == JOB_LEASED, CheckJob.lease_expires < now)
+        
+        with self.db.engine.begin() as conn:
+            # Jobs whose worker died on their last allowed attempt
+            conn.execute(
+                update(CheckJob)
+                .where(expired, CheckJob.attempts >= CheckJob.max_attempts)
+                .values(status=JOB_DEAD, finished_at=now,
+                        last_error=func.coalesce(CheckJob.last_error, "Lease expired"))
+            )
+            
+            # Providers take turns, oldest first within each, so an AWS backlog
+            # cannot fill every batch while DigitalOcean and Linode jobs wait
+            turn = func.row_number().over(partition_by=CheckJob.provider, order_by=CheckJob.available_at)
+            due = select(CheckJob.id, CheckJob.available_at, turn.label('turn')).where(or_(
+                and_(CheckJob.status == JOB_PENDING, CheckJob.available_at <= now), expired
+            ))
+            if providers:
+                due = due.where(CheckJob.provider.in_(providers))
+            due = due.subquery()
+            due = select(due.c.id).order_by(due.c.turn, due.c.available_at).limit(limit)
+            
+            # One statement: the subquery and the lease are atomic under SQLite's write lock
+            return conn.execute(
+                update(CheckJob)
+                .where(CheckJob.id.in_(due.scalar_subquery()))
+                .values(status=JOB_LEASED, lease_owner=owner, attempts=CheckJob.attempts + 1,
+                        lease_expires=now + timedelta(seconds=self.settings['lease_seconds']))
+                .returning(CheckJob.id, CheckJob.account_id, CheckJob.provider, CheckJob.depth,
+                           CheckJob.attempts)
+            ).all()
+    
+    def _leased_by(self, owner, job_ids):
+        """Criteria for jobs still leased by owner, a re-leased job belongs to its new owner"""
+        return and_(CheckJob.id.in_(job_ids), CheckJob.status == JOB_LEASED,
+                    CheckJob.lease_owner == owner)
+    
+    def extend(self, owner, job_ids):
+        """Renew the lease of jobs still held by owner, returns how many it still holds"""
+        lease_expires = datetime.utcnow() + timedelta(seconds=self.settings['lease_seconds'])
+        extended = 0
+        with self.db.engine.begin() as conn:
+            for chunk in chunked(job_ids):
+                extended += conn.execute(
+                    update(CheckJob).where(self._leased_by(owner, chunk))
+                    .values(lease_expires=lease_expires)
+                ).rowcount
+        return extended
+    
+    def complete(self, owner, job_ids):
+        """Mark jobs done, returns how many were still leased by owner"""
+        done = 0
+        with self.db.engine.begin() as conn:
+            for chunk in chunked(job_ids):
+                done += conn.execute(
+                    update(CheckJob).where(self._leased_by(owner, chunk))
+                    .values(status=JOB_DONE, finished_at=datetime.utcnow(), lease_expires=None)
+                ).rowcount
+        return done
+    
+    def release(self, owner, retry_at):
+        """Hand jobs back without using up an attempt, retry_at: {job_id: datetime}"""
+        if not retry_at:
+            return
+        rows = [{'_id': job_id, '_available_at': when} for job_id, when in retry_at.items()]
+        with self.db.engine.begin() as conn:
+            conn.execute(
+                update(CheckJob)
+                .where(CheckJob.id == bindparam('_id'), CheckJob.status == JOB_LEASED,
+                       CheckJob.lease_owner == owner)
+                .values(status=JOB_PENDING, attempts=CheckJob.attempts - 1,
+                        available_at=bindparam('_available_at'), lease_expires=None),
+                rows
+            )
+    
+    def fail(self, owner, job_ids, error):
+        """Retry jobs after a backoff, or dead-letter them once out of attempts"""
+        now = datetime.utcnow()
+        with self.db.engine.begin() as conn:
+            jobs = []
+            for chunk in chunked(job_ids):
+                jobs.extend(conn.execute(
+                    select(CheckJob.id, CheckJob.attempts, CheckJob.max_attempts)
+                    .where(self._leased_by(owner, chunk))
+                ).all())
+            
+            rows = []
+            for job_id, attempts, max_attempts in jobs:
+                backoff = self.settings['retry_seconds'] * 2 ** max(0, attempts - 1)
+                rows.append({
+                    '_id': job_id,
+                    '_status': JOB_DEAD if attempts >= max_attempts else JOB_PENDING,
+                    '_available_at': now + timedelta(seconds=backoff),
+                    '_finished_at': now if attempts >= max_attempts else None,
+                })
+            if rows:
+                conn.execute(
+                    update(CheckJob).where(CheckJob.id == bindparam('_id')).values(
+                        status=bindparam('_status'), available_at=bindparam('_available_at'),
+                        finished_at=bindparam('_finished_at'), lease_expires=None,
+                        last_error=str(error)[:1000]
+                    ),
+                    rows
+                )
+        return len(jobs)
+    
+    def prune(self):
+        """Delete finished jobs older than keep_done_seconds, dead jobs are kept"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.settings['keep_done_seconds'])
+        with self.db.engine.begin() as conn:
+            return conn.execute(
+                delete(CheckJob).where(CheckJob.status == JOB_DONE, CheckJob.finished_at < cutoff)
+            ).rowcount
+    
+    def get_stats(self):
+        """Job counts by status"""
+        with self.db.engine.connect() as conn:
+            rows = conn.execute(select(CheckJob.status, func.count()).group_by(CheckJob.status)).all()
+        stats = {status: 0 for status in (JOB_PENDING, JOB_LEASED, JOB_DONE, JOB_DEAD)}
+        stats.update(dict(rows))
+        return stats
@@ -0,0 +1,168 @@
+"""
+Saved filter views with cached result sets kept current by the change feed
+"""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.account import Account
+from models.saved_view import SavedView
+from database.filters import compile_filters
+from database.change_feed import DELETED, PURGED
+from utils.batching import chunked
+
+# Views with a relative "Added" filter drift as time passes, so they are re-run
+# on open once their cache is older than this
+TIME_FILTER_MAX_AGE = timedelta(minutes=1)
+
+class SavedViewCache:
+    """In-memory ID sets of saved views, persisted to the saved_views table"""
+    
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self._lock = threading.RLock()
+        self._views = {}  # name -> {'filters': dict, 'ids': set, 'refreshed_at': datetime}
+        self._load()
+        db_manager.changes.subscribe(self.on_change)
+    
+    # Only Core connections are used here: this class runs inside change feed
+    # callbacks, where the writer's scoped session must not be touched
+    
+    def _load(self):
+        """Load saved views and their cached IDs from the database"""
+        with self.db.engine.connect() as conn:
+            rows = conn.execute(
+                select(SavedView.name, SavedView.filters, SavedView.cached_ids, SavedView.refreshed_at)
+            ).all()
+        
+        for row in rows:
+            self._views[row.name] = {
+                'filters': json.loads(row.filters) if row.filters else {},
+                'ids': set(json.loads(row.cached_ids)) if row.cached_ids is not None else None,
+                'refreshed_at': row.refreshed_at
+            }
+    
+    def _query_ids(self, filters, account_ids=None):
+        """Run the view query, optionally restricted to the given account IDs"""
+        criteria = compile_filters(filters)
+        with self.db.engine.connect() as conn:
+            if account_ids is None:
+                return set(conn.execute(select(Account.id).where(*criteria)).scalars())
+            
+            matched = set()
+            for chunk in chunked(account_ids):
+                matched.update(conn.execute(
+                    select(Account.id).where(Account.id.in_(chunk), *criteria)
+                ).scalars())
+            return matched
+    
+    def _persist(self, name):
+        """Write filters, cached ID list and count of a view"""
+        with self._lock:
+            view = self._views.get(name)
+            if view is None:
+                return
+            ids = sorted(view['ids']) if view['ids'] is not None else None
+            values = {
+                'filters': json.dumps(view['filters']),
+                'cached_ids': json.dumps(ids) if ids is not None else None,
+                'cached_count': len(ids) if ids is not None else 0,
+                'refreshed_at': view['refreshed_at']
+            }
+        
+        try:
+            with self.db.engine.begin() as conn:
+                conn.execute(
+                    sqlite_insert(SavedView)
+                    .values(name=name, created_at=datetime.utcnow(), **values)
+                    .on_conflict_do_update(index_elements=['name'], set_=values)
+                )
+        except Exception as e:
+            print(f"❌ Error saving view '{name}': {e}")
+    
+    def _refresh(self, name):
+        """Re-run the full view query"""
+        with self._lock:
+            filters = self._views[name]['filters']
+        ids = self._query_ids(filters)
+        with self._lock:
+            if name in self._views:
+                self._views[name]['ids'] = ids
+                self._views[name]['refreshed_at'] = datetime.utcnow()
+        self._persist(name)
+        return ids
+    
+    def save(self, name, filters):
+        """Create or replace a view and compute its result set"""
+        with self._lock:
+            self._views[name] = {'filters': dict(filters), 'ids': None, 'refreshed_at': None}
+        return len(self._refresh(name))
+    
+    def delete(self, name):
+        """Delete a view"""
+        with self._lock:
+            self._views.pop(name, None)
+        with self.db.engine.begin() as conn:
+            result = conn.execute(delete(SavedView).where(SavedView.name == name))
+        return result.rowcount > 0
+    
+    def get_views(self):
+        """List of (name, count) for all views, served from memory"""
+        with self._lock:
+            return [
+                (name, len(view['ids']) if view['ids'] is not None else 0)
+                for name, view in sorted(self._views.items())
+            ]
+    
+    def get_filters(self, name):
+        """Filter dict of a view"""
+        with self._lock:
+            view = self._views.get(name)
+            return dict(view['filters']) if view else None
+    
+    def get_ids(self, name):
+        """Cached account IDs of a view, re-running the query only when needed"""
+        with self._lock:
+            view = self._views.get(name)
+            if view is None:
+                return []
+            ids = view['ids']
+            stale = ids is None or (
+                view['filters'].get('time_filter')
+                and datetime.utcnow() - (view['refreshed_at'] or datetime.min) > TIME_FILTER_MAX_AGE
+            )
+        if stale:
+            ids = self._refresh(name)
+        return list(ids)
+    
+    def on_change(self, kind, account_ids):
+        """Change feed subscriber: patch cached ID sets using only the changed rows"""
+        with self._lock:
+            names = [name for name, view in self._views.items() if view['ids'] is not None]
+        
+        for name in names:
+            if account_ids is None:
+                # Extent of the change is unknown (e.g. a tag was dropped)
+                self._refresh(name)
+                continue
+            
+            with self._lock:
+                view = self._views.get(name)
+                if view is None or view['ids'] is None:
+                    continue
+                filters = view['filters']
+            
+            if kind in (DELETED, PURGED):
+                matched = set()  # Tombstoned rows never match a view
+            else:
+                matched = self._query_ids(filters, account_ids)
+            
+            with self._lock:
+                old_ids = view['ids']
+                new_ids = (old_ids - set(account_ids)) | matched
+                if new_ids == old_ids:
+                    continue
+                view['ids'] = new_ids
+            self._persist(name)
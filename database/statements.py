@@ -0,0 +1,112 @@
+"""
+Prebuilt statements for hot queries, with compile cache statistics
+"""
+
+import threading
+from sqlalchemy import select, func, bindparam, event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from models.account import Account
+
+def _live():
+    """Criteria shared by all listing queries (served by the partial indexes)"""
+    return Account.deleted_at.is_(None)
+
+# Statement builders, every variable part is a bound parameter so one
+# compiled form per shape is reused for all calls
+HOT_QUERIES = {
+    'list_all': lambda: (
+        select(Account).where(_live()).order_by(Account.created_at.desc())
+    ),
+    'list_by_provider': lambda: (
+        select(Account)
+        .where(_live(), Account.provider == bindparam('provider'))
+        .order_by(Account.created_at.desc())
+    ),
+    'count_all': lambda: (
+        select(func.count(Account.id)).where(_live())
+    ),
+    'count_by_provider': lambda: (
+        select(func.count(Account.id)).where(_live(), Account.provider == bindparam('provider'))
+    ),
+    'by_id': lambda: (
+        select(Account).where(Account.id == bindparam('account_id'), _live())
+    ),
+    'by_ids': lambda: (
+        select(Account).where(Account.id.in_(bindparam('account_ids', expanding=True)), _live())
+    ),
+}
+
+def _unique_values(column, by_provider):
+    """Facet query: distinct non-empty values of a column"""
+    query = select(column).where(_live(), column.isnot(None), column != '')
+    if by_provider:
+        query = query.where(Account.provider == bindparam('provider'))
+    return query.distinct().order_by(column)
+
+class StatementCache:
+    """Builds each hot statement once and tracks compiled cache hits of HOT_QUERIES"""
+    
+    def __init__(self, engine):
+        self._statements = {}
+        self._hot = set()          # id() of the built HOT_QUERIES statements
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'statements_built': 0,
+            'statements_reused': 0,
+            'compiled_cache_hits': 0,
+            'compiled_cache_misses': 0,
+        }
+        event.listen(engine, 'after_cursor_execute', self._on_execute)
+    
+    def get(self, name):
+        """Get a statement from HOT_QUERIES"""
+        return self._get(name, HOT_QUERIES[name])
+    
+    def unique_values(self, column, by_provider):
+        """Get the facet statement for a column"""
+        return self._get(
+            ('unique', column.key, by_provider),
+            lambda: _unique_values(column, by_provider)
+        )
+    
+    def _count(self, key):
+        """Add one to a counter, event handlers run on many threads"""
+        with self._stats_lock:
+            self.stats[key] += 1
+    
+    def _get(self, key, builder):
+        """Return the cached statement for key, building it on first use"""
+        statement = self._statements.get(key)
+        if statement is not None:
+            self._count('statements_reused')
+            return statement
+        
+        with self._lock:
+            statement = self._statements.get(key)
+            if statement is None:
+                statement = builder()
+                self._statements[key] = statement
+                if key in HOT_QUERIES:
+                    self._hot.add(id(statement))
+                self._count('statements_built')
+        return statement
+    
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        """Count hits and misses of SQLAlchemy's compiled statement cache for HOT_QUERIES"""
+        # Built statements are never dropped, so their ids are not reused
+        if id(getattr(context, 'invoked_statement', None)) not in self._hot:
+            return
+        cache_hit = getattr(context, 'cache_hit', None)
+        if cache_hit is CACHE_HIT:
+            self._count('compiled_cache_hits')
+        elif cache_hit is CACHE_MISS:
+            self._count('compiled_cache_misses')
+    
+    def get_stats(self):
+        """Snapshot of the counters, including the compiled cache hit ratio"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats['compiled_cache_hits'] + stats['compiled_cache_misses']
+        stats['compiled_cache_hit_ratio'] = stats['compiled_cache_hits'] / lookups if lookups else 0.0
+        return stats
@@ -39,8 +39,26 @@ try:
     print(f'Database URL: {db_url}')
     
     db_manager = DatabaseManager('config.yaml')
+    db_manager.start_purge_job()
     print('Database initialized')
     
+    # Run checks in worker processes so the GUI keeps the GIL to itself
+    check_engine = None
+    if (config.get('check_engine') or {}).get('mode') == 'process':
+        from services.process_engine import ProcessCheckEngine
+        from services.proxy_service import ProxyService
+        check_engine = ProcessCheckEngine(db_manager, 'config.yaml',
+                                          ProxyService().get_checker_proxy_url())
+        check_engine.start()
+    
+    # Keep account checks fresh in the background
+    if (config.get('scheduler') or {}).get('enabled'):
+        from services.proxy_service import ProxyService
+        from services.scheduler import CheckScheduler
+        check_scheduler = CheckScheduler(db_manager, ProxyService().get_checker_proxy_url(),
+                                         engine=check_engine)
+        check_scheduler.start()
+    
     # Add refresh_table method to MainWindow
     original_main_window = MainWindow
     
@@ -49,18 +67,29 @@ try:
             super().__init__()
             self.db_manager = db_manager
             
+        def check_columns(self, check_result, is_active, quota_used, quota_limit, last_check):
+            """Status, Quota and Last check texts of a row"""
+            status = 'Error' if check_result == 'Failed' or not is_active else 'Active'
+            quota = f'{quota_used or 0}/{quota_limit}' if quota_limit else 'N/A'
+            last = last_check.strftime('%Y-%m-%d %H:%M') if last_check else 'Never'
+            return status, quota, last
+        
         def refresh_table(self):
             try:
                 # Clear table
                 self.model.removeRows(0, self.model.rowCount())
+                self.rows_by_id = {}
                 
-                # Load from database
-                session = self.db_manager.get_session()
-                accounts = session.query(Account).all()
-                session.close()
+                # Load from database (soft-deleted accounts are excluded)
+                accounts = self.db_manager.get_all_accounts()
                 
                 # Add to table
                 for account in accounts:
+                    status_text, quota_text, last_check = self.check_columns(
+                        account.check_result, getattr(account, 'is_active', True),
+                        account.quota_used, account.quota_limit, account.last_check
+                    )
+                    
                     items = []
                     
                     # Checkbox
@@ -88,16 +117,14 @@ try:
                     items.append(region_item)
                     
                     # Status
-                    status_text = 'Active' if (account.is_active if hasattr(account, 'is_active') else True) else 'Error'
                     status_item = QStandardItem(status_text)
                     items.append(status_item)
                     
                     # Quota
-                    quota_item = QStandardItem('N/A')
+                    quota_item = QStandardItem(quota_text)
                     items.append(quota_item)
                     
                     # Last check
-                    last_check = account.last_check.strftime('%Y-%m-%d %H:%M') if account.last_check else 'Never'
                     items.append(QStandardItem(last_check))
                     
                     # Actions
@@ -110,6 +137,7 @@ try:
                         if idx != 0:
                             item.setEditable(False)
                     
+                    self.rows_by_id[account.id] = self.model.rowCount()
                     self.model.appendRow(items)
                 
                 print(f'Table refreshed with {len(accounts)} accounts')
@@ -146,7 +174,7 @@ try:
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                deleted_count = 0
+                account_ids = []
                 for row in selected_rows:
                     source_index = self.proxy_model.mapToSource(self.proxy_model.index(row, 0))
                     source_row = source_index.row()
@@ -154,17 +182,135 @@ try:
                     # Get account ID from table
                     id_item = self.model.item(source_row, 1)
                     if id_item:
-                        account_id = int(id_item.text())
-                        if self.db_manager.delete_account(account_id):
-                            deleted_count += 1
+                        account_ids.append(int(id_item.text()))
+                
+                deleted_count = self.db_manager.delete_accounts(account_ids)
+                self.last_deleted_ids = account_ids
                 
                 # Refresh table
                 self.refresh_table()
-                QMessageBox.information(self, 'Success', f'Deleted {deleted_count} accounts')
+                undo_minutes = max(1, self.db_manager.purge_settings['undo_window_seconds'] // 60)
+                QMessageBox.information(
+                    self, 'Success',
+                    f'Deleted {deleted_count} accounts\n'
+                    f'Use File > Undo Delete (Ctrl+Z) within {undo_minutes} min to restore them'
+                )
+        
+        def undo_delete(self):
+            """Restore accounts removed by the last delete"""
+            account_ids = getattr(self, 'last_deleted_ids', [])
+            if not account_ids:
+                QMessageBox.information(self, 'Undo', 'Nothing to undo')
+                return
+            
+            restored_count = self.db_manager.restore_accounts(account_ids)
+            self.last_deleted_ids = []
+            self.refresh_table()
+            
+            if restored_count:
+                QMessageBox.information(self, 'Undo', f'Restored {restored_count} accounts')
+            else:
+                QMessageBox.warning(self, 'Undo', 'Undo window has expired, accounts were purged')
+        
+        def check_selected(self, force=False):
+            """Check selected accounts in the background
+            
+            A normal check is a quick one; force skips cached results and runs a full check.
+            """
+            selected_rows = self.get_selected_rows()
+            
+            if not selected_rows:
+                QMessageBox.warning(self, 'Warning', 'Please select accounts to check')
+                return
+            
+            if getattr(self, 'check_worker', None) and self.check_worker.isRunning():
+                QMessageBox.information(self, 'Check', 'A check is already running')
+                return
+            
+            account_ids = []
+            for row in selected_rows:
+                source_index = self.proxy_model.mapToSource(self.proxy_model.index(row, 0))
+                id_item = self.model.item(source_index.row(), 1)
+                if id_item:
+                    account_ids.append(int(id_item.text()))
+            
+            from services.base_checker import DEPTH_QUICK, DEPTH_FULL
+            from services.proxy_service import ProxyService
+            from ui.check_worker import CheckWorker
+            
+            proxy_url = ProxyService().get_checker_proxy_url()
+            depth = DEPTH_FULL if force else DEPTH_QUICK
+            self.check_worker = CheckWorker(self.db_manager, account_ids, proxy_url, force, depth,
+                                            check_engine)
+            self.check_worker.progress.connect(self.on_check_progress)
+            self.check_worker.results_ready.connect(self.on_check_results)
+            self.check_worker.check_finished.connect(self.on_check_finished)
+            self.check_worker.start()
+            self.statusBar().showMessage(f'Checking {len(account_ids)} accounts...')
+        
+        def pause_check(self):
+            """Pause the running check, or resume it when paused"""
+            worker = getattr(self, 'check_worker', None)
+            if not worker or not worker.isRunning():
+                return
+            if worker.check_run.paused:
+                worker.resume()
+            else:
+                worker.pause()
+        
+        def cancel_check(self):
+            """Cancel the running check, checks already started still finish"""
+            worker = getattr(self, 'check_worker', None)
+            if worker and worker.isRunning():
+                worker.cancel()
+        
+        def on_check_progress(self, progress):
+            """Show run totals, arrives at most 10 times a second"""
+            state = '' if progress['state'] == 'running' else f" ({progress['state']})"
+            self.statusBar().showMessage(
+                f"Checking{state}: {progress['done']}/{progress['total']} accounts, "
+                f"{progress['failed']} failed, {progress['deferred']} deferred | {progress['rate']}/s"
+            )
+        
+        def on_check_results(self, results):
+            """Update the rows of a batch of results in place"""
+            for result in results:
+                row = self.rows_by_id.get(result['id'])
+                if row is None or result.get('deferred') or result.get('cancelled'):
+                    continue
+                texts = self.check_columns(result.get('check_result'), True, result.get('quota_used'),
+                                           result.get('quota_limit'), result.get('last_check'))
+                # Status, Quota and Last check columns
+                for column, text in zip((5, 6, 7), texts):
+                    self.model.item(row, column).setText(text)
+        
+        def on_check_finished(self, results):
+            """Report totals, rows were already updated as results arrived"""
+            from services.concurrency import get_concurrency_stats
+            
+            cancelled = self.check_worker.check_run.cancelled
+            skipped = sum(1 for result in results if result.get('cancelled'))
+            deferred = sum(1 for result in results if result.get('deferred'))
+            cached = sum(1 for result in results if result.get('cached'))
+            failed = sum(1 for result in results if result.get('check_result') == 'Failed')
+            checked = len(results) - deferred - skipped
+            limits = ', '.join(
+                f"{provider} {stats['limit']}" for provider, stats in get_concurrency_stats().items()
+            )
+            self.statusBar().showMessage(
+                f"{'Check cancelled | ' if cancelled else ''}"
+                f'Checked {checked} accounts: {checked - failed} ok, '
+                f'{failed} failed, {deferred} deferred (provider unreachable)'
+                f' | cache: {cached} hits, {checked - cached} misses'
+                f' | concurrency: {limits}'
+            )
     
     # Start application
     app = QApplication(sys.argv)
     app.setApplicationName('Cloud Account Manager')
+    if check_engine:
+        # Let worker processes finish their chunks before the interpreter exits
+        app.aboutToQuit.connect(check_engine.stop)
     
     print('')
     print('Creating main window...')
@@ -0,0 +1,3 @@
+"""
+Local stand-ins of cloud provider APIs, for running checkers without real accounts
+"""
@@ -0,0 +1,202 @@
+"""
+AWS STS, EC2 and Service Quotas stand-in
+One endpoint serves all three services, told apart by the SigV4 credential scope
+(signatures are not verified). Each access key gets a made-up account derived from
+it, keys starting with AKIAINVALID are rejected. Requests over --rate per access
+key (or --server-rate overall) get each service's own throttling error.
+
+Usage: python -m mock_providers.aws [--port 8783] [--rate 10] [--burst 20]
+Then set endpoint_url under cloud_providers.aws in config.yaml
+to http://127.0.0.1:8783
+"""
+
+import argparse
+import json
+import random
+import re
+import uuid
+from urllib.parse import parse_qsl
+from aiohttp import web
+from mock_providers.server import RequestLimit
+
+# SigV4 credential scope: Credential=<key>/<date>/<region>/<service>/aws4_request
+SCOPE_RE = re.compile(r"Credential=([^/,]+)/\d+/([\w-]+)/([\w-]+)/")
+
+EC2_NS = "http://ec2.amazonaws.com/doc/2016-11-15/"
+STS_NS = "https://sts.amazonaws.com/doc/2011-06-15/"
+
+REGIONS = [
+    "us-east-1", "us-east-2", "us-west-1", "us-west-2", "ap-south-1", "ap-northeast-1",
+    "ap-northeast-2", "ap-northeast-3", "ap-southeast-1", "ap-southeast-2", "ca-central-1",
+    "eu-central-1", "eu-west-1", "eu-west-2", "eu-west-3", "eu-north-1", "sa-east-1",
+]
+
+# Service -> (status, code) of its throttling and bad key errors
+THROTTLED = {"ec2": (503, "RequestLimitExceeded"), "sts": (400, "Throttling"),
+             "servicequotas": (400, "TooManyRequestsException")}
+INVALID_KEY = {"ec2": (401, "AuthFailure"), "sts": (403, "InvalidClientTokenId"),
+               "servicequotas": (400, "UnrecognizedClientException")}
+
+INSTANCE_TYPES = {"t3.micro": (1, 2), "m5.large": (1, 2), "m5.xlarge": (2, 2), "c5.4xlarge": (8, 2)}
+
+def aws_scope(headers):
+    """(region, signing service) of a SigV4 signed request, (None, None) otherwise"""
+    match = SCOPE_RE.search(headers.get("Authorization", ""))
+    return match.groups()[1:] if match else (None, None)
+
+def access_key_of(headers):
+    """Access key of a SigV4 signed request"""
+    match = SCOPE_RE.search(headers.get("Authorization", ""))
+    return match.group(1) if match else ""
+
+def error_response(service, target, code, message, status):
+    """An AWS error in the protocol of the service: EC2 XML, JSON or query XML"""
+    if service == "ec2":
+        body = (f"<Response><Errors><Error><Code>{code}</Code><Message>{message}</Message></Error>"
+                f"</Errors><RequestID>{uuid.uuid4()}</RequestID></Response>")
+        return web.Response(status=status, text=body, content_type="text/xml")
+    if target:
+        # JSON protocol, X-Amz-Target is Service.Operation
+        return web.Response(status=status, text=json.dumps({"__type": code, "message": message}),
+                            content_type="application/x-amz-json-1.1")
+    body = (f'<ErrorResponse xmlns="{STS_NS}"><Error><Type>{"Sender" if status < 500 else "Receiver"}'
+            f"</Type><Code>{code}</Code><Message>{message}</Message></Error>"
+            f"<RequestId>{uuid.uuid4()}</RequestId></ErrorResponse>")
+    return web.Response(status=status, text=body, content_type="text/xml")
+
+def synthetic_account(access_key, region):
+    """Made-up account of an access key in a region, always the same for the same pair"""
+    rng = random.Random(f"{access_key}/{region}")
+    instances = []
+    for _ in range(rng.choice([0, 0, 1, 2, 3, 6])):
+        instance_type = rng.choice(list(INSTANCE_TYPES))
+        instances.append({"type": instance_type, "state": rng.choice(["running", "running", "stopped", "pending"])})
+    return {
+        "account_id": f"{random.Random(access_key).randrange(10 ** 11, 10 ** 12)}",
+        "vcpu_limit": rng.choice([5, 32, 64, 256, 1152]),
+        # Accounts never granted the quota only have the AWS default
+        "quota_applied": rng.random() < 0.9,
+        "instances": instances,
+    }
+
+def filter_values(params, name):
+    """Values of the Filter.N.Name == name request filter, None when not filtered"""
+    for key, value in params.items():
+        match = re.fullmatch(r"Filter\.(\d+)\.Name", key)
+        if match and value == name:
+            prefix = f"Filter.{match.group(1)}.Value."
+            return {v for k, v in params.items() if k.startswith(prefix)}
+    return None
+
+def describe_instances(params, account):
+    """EC2 DescribeInstances XML, one reservation per instance, paged by MaxResults"""
+    states = filter_values(params, "instance-state-name")
+    matching = [instance for instance in account["instances"] if states is None or instance["state"] in states]
+    start = int(params.get("NextToken", 0))
+    end = start + int(params.get("MaxResults", 1000))
+    
+    reservations = []
+    for number, instance in enumerate(matching[start:end], start):
+        cores, threads = INSTANCE_TYPES[instance["type"]]
+        reservations.append(
+            f"<item><reservationId>r-{number:017x}</reservationId><ownerId>{account['account_id']}</ownerId>"
+            f"<groupSet/><instancesSet><item><instanceId>i-{number:017x}</instanceId>"
+            f"<instanceState><code>16</code><name>{instance['state']}</name></instanceState>"
+            f"<instanceType>{instance['type']}</instanceType><cpuOptions><coreCount>{cores}</coreCount>"
+            f"<threadsPerCore>{threads}</threadsPerCore></cpuOptions></item></instancesSet></item>"
+        )
+    next_token = f"<nextToken>{end}</nextToken>" if end < len(matching) else ""
+    return (f'<DescribeInstancesResponse xmlns="{EC2_NS}"><requestId>{uuid.uuid4()}</requestId>'
+            f"<reservationSet>{''.join(reservations)}</reservationSet>{next_token}</DescribeInstancesResponse>")
+
+def describe_regions():
+    """EC2 DescribeRegions XML of every region"""
+    items = "".join(
+        f"<item><regionName>{region}</regionName><regionEndpoint>ec2.{region}.amazonaws.com</regionEndpoint>"
+        f"<optInStatus>opt-in-not-required</optInStatus></item>" for region in REGIONS
+    )
+    return (f'<DescribeRegionsResponse xmlns="{EC2_NS}"><requestId>{uuid.uuid4()}</requestId>'
+            f"<regionInfo>{items}</regionInfo></DescribeRegionsResponse>")
+
+def get_caller_identity(account):
+    """STS GetCallerIdentity XML"""
+    return (f'<GetCallerIdentityResponse xmlns="{STS_NS}"><GetCallerIdentityResult>'
+            f"<Arn>arn:aws:iam::{account['account_id']}:user/checker</Arn>"
+            f"<UserId>AIDA{account['account_id']}</UserId><Account>{account['account_id']}</Account>"
+            f"</GetCallerIdentityResult><ResponseMetadata><RequestId>{uuid.uuid4()}</RequestId>"
+            f"</ResponseMetadata></GetCallerIdentityResponse>")
+
+def service_quota(params, region, account, default):
+    """Service Quotas GetServiceQuota / GetAWSDefaultServiceQuota JSON"""
+    value = 32.0 if default else float(account["vcpu_limit"])
+    return {"Quota": {
+        "ServiceCode": params.get("ServiceCode"), "QuotaCode": params.get("QuotaCode"),
+        "QuotaArn": f"arn:aws:servicequotas:{region}:{account['account_id']}:ec2/{params.get('QuotaCode')}",
+        "QuotaName": "Running On-Demand Standard (A, C, D, H, I, M, R, T, Z) instances",
+        "Value": value, "Unit": "None", "Adjustable": True, "GlobalQuota": False,
+    }}
+
+def create_app(rate=0.0, burst=None, server_rate=0.0):
+    """Build the stand-in app; rate and burst are per access key, server_rate over all keys"""
+    key_limit = RequestLimit(rate, burst)
+    server_limit = RequestLimit(server_rate)
+    stats = {"requests": 0, "throttled": 0}
+    
+    async def handle(request):
+        stats["requests"] += 1
+        region, service = aws_scope(request.headers)
+        target = request.headers.get("X-Amz-Target", "")
+        body = await request.text()
+        if target:
+            params = json.loads(body or "{}")
+            action = target.split(".")[-1]
+        else:
+            params = dict(parse_qsl(body))
+            action = params.get("Action", "")
+        
+        access_key = access_key_of(request.headers)
+        if not access_key or access_key.startswith("AKIAINVALID"):
+            status, code = INVALID_KEY.get(service, (403, "InvalidClientTokenId"))
+            return error_response(service, target, code, "The security token included in the request is invalid.",
+                                  status)
+        if key_limit.check(access_key) or server_limit.check():
+            stats["throttled"] += 1
+            status, code = THROTTLED.get(service, (400, "Throttling"))
+            return error_response(service, target, code, "Rate exceeded", status)
+        
+        account = synthetic_account(access_key, region)
+        if service == "sts" and action == "GetCallerIdentity":
+            return web.Response(text=get_caller_identity(account), content_type="text/xml")
+        if service == "ec2" and action == "DescribeInstances":
+            return web.Response(text=describe_instances(params, account), content_type="text/xml")
+        if service == "ec2" and action == "DescribeRegions":
+            return web.Response(text=describe_regions(), content_type="text/xml")
+        if service == "servicequotas" and action in ("GetServiceQuota", "GetAWSDefaultServiceQuota"):
+            default = action == "GetAWSDefaultServiceQuota"
+            if not default and not account["quota_applied"]:
+                return error_response(service, target, "NoSuchResourceException",
+                                      "The request failed because the specified resource does not exist.", 400)
+            return web.Response(text=json.dumps(service_quota(params, region, account, default)),
+                                content_type="application/x-amz-json-1.1")
+        return error_response(service, target, "InvalidAction", f"{service} {action} is not mocked", 400)
+    
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_post("/", handle)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="AWS STS, EC2 and Service Quotas stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8783)
+    parser.add_argument("--rate", type=float, default=0.0, help="Requests/s per access key, 0 is unlimited")
+    parser.add_argument("--burst", type=float, help="Requests per access key before the rate applies")
+    parser.add_argument("--server-rate", type=float, default=0.0, help="Requests/s over all access keys")
+    args = parser.parse_args()
+    
+    print(f"🧪 AWS stand-in on http://{args.host}:{args.port}")
+    web.run_app(create_app(args.rate, args.burst, args.server_rate),
+                host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Azure sign-in and subscriptions stand-in
+Serves the password grant token endpoint and GET /subscriptions
+
+Usage: python -m mock_providers.azure [--port 8780]
+Then set login_url and api_url under cloud_providers.azure in config.yaml
+to http://127.0.0.1:8780
+"""
+
+import argparse
+import uuid
+from aiohttp import web
+
+# Demo users: email -> password, sign-in error code, subscriptions
+DEMO_USERS = {
+    "payg@example.com": {
+        "password": "Passw0rd!",
+        "subscriptions": [{"state": "Enabled", "quotaId": "PayAsYouGo_2014-09-01"}],
+    },
+    "trial@example.com": {
+        "password": "Passw0rd!",
+        "subscriptions": [
+            {"state": "Disabled", "quotaId": "PayAsYouGo_2014-09-01"},
+            {"state": "Enabled", "quotaId": "FreeTrial_2014-09-01"},
+        ],
+    },
+    "pastdue@example.com": {
+        "password": "Passw0rd!",
+        "subscriptions": [{"state": "PastDue", "quotaId": "PayAsYouGo_2014-09-01"}],
+    },
+    "empty@example.com": {"password": "Passw0rd!", "subscriptions": []},
+    "mfa@example.com": {"password": "Passw0rd!", "signin_error": 50076},
+    "locked@example.com": {"password": "Passw0rd!", "signin_error": 50053},
+}
+
+def signin_error(code, status=400):
+    """AAD style error response"""
+    return web.json_response({
+        "error": "invalid_grant",
+        "error_description": f"AADSTS{code}: Mock sign-in error.\r\nTrace ID: {uuid.uuid4()}",
+        "error_codes": [code],
+    }, status=status)
+
+def create_app(users=None):
+    """Build the stand-in app for a users dict shaped like DEMO_USERS"""
+    users = DEMO_USERS if users is None else users
+    tokens = {}
+    
+    async def token(request):
+        form = await request.post()
+        if form.get("grant_type") != "password":
+            return web.json_response({"error": "unsupported_grant_type"}, status=400)
+        
+        user = users.get(form.get("username", "").lower())
+        if user is None:
+            return signin_error(50034)
+        if user["password"] != form.get("password"):
+            return signin_error(50126)
+        if user.get("signin_error"):
+            return signin_error(user["signin_error"])
+        
+        access_token = uuid.uuid4().hex
+        tokens[access_token] = user
+        return web.json_response({"token_type": "Bearer", "expires_in": 3599,
+                                  "access_token": access_token})
+    
+    async def subscriptions(request):
+        user = tokens.get(request.headers.get("Authorization", "").replace("Bearer ", ""))
+        if user is None:
+            return web.json_response({"error": {"code": "InvalidAuthenticationToken"}}, status=401)
+        
+        value = []
+        for subscription in user.get("subscriptions", []):
+            subscription_id = str(uuid.uuid5(uuid.NAMESPACE_OID, f"{id(user)}{subscription['quotaId']}"))
+            value.append({
+                "id": f"/subscriptions/{subscription_id}",
+                "subscriptionId": subscription_id,
+                "displayName": subscription["quotaId"].split("_")[0],
+                "state": subscription["state"],
+                "subscriptionPolicies": {"quotaId": subscription["quotaId"], "spendingLimit": "Off"},
+            })
+        return web.json_response({"value": value, "count": {"type": "Total", "value": len(value)}})
+    
+    app = web.Application()
+    app.router.add_post("/{tenant}/oauth2/v2.0/token", token)
+    app.router.add_get("/subscriptions", subscriptions)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Azure API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780)
+    args = parser.parse_args()
+    
+    print(f"🧪 Azure stand-in on http://{args.host}:{args.port}")
+    for email in DEMO_USERS:
+        print(f"   {email}")
+    web.run_app(create_app(), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+DigitalOcean API v2 stand-in
+Serves GET /v2/account and /v2/droplets for any bearer token; each token gets a
+made-up account derived from it, tokens starting with "invalid" are rejected.
+Requests over --rate per token (or --server-rate overall) get DigitalOcean's 429.
+Responses carry an ETag; a request with a still matching If-None-Match gets 304.
+
+Usage: python -m mock_providers.digitalocean [--port 8781] [--rate 5] [--burst 20]
+Then set api_url under cloud_providers.digitalocean in config.yaml
+to http://127.0.0.1:8781
+"""
+
+import argparse
+import math
+import random
+import time
+import uuid
+from aiohttp import web
+from mock_providers.server import RequestLimit, etag_middleware
+
+# Share of synthetic accounts per status
+STATUS_WEIGHTS = {"active": 90, "warning": 7, "locked": 3}
+STATUS_MESSAGES = {"warning": "Payment method needs attention", "locked": "Account locked"}
+
+def synthetic_account(token):
+    """Made-up account of a token, the same token always gets the same account"""
+    rng = random.Random(token)
+    status = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+    droplet_limit = rng.choice([3, 10, 25, 50])
+    return {
+        "droplet_limit": droplet_limit,
+        "floating_ip_limit": 3,
+        "volume_limit": 100,
+        "email": f"{uuid.UUID(int=rng.getrandbits(128)).hex[:12]}@example.com",
+        "uuid": str(uuid.UUID(int=rng.getrandbits(128))),
+        "email_verified": True,
+        "status": status,
+        "status_message": STATUS_MESSAGES.get(status, ""),
+        "droplets": rng.randint(0, droplet_limit),
+    }
+
+def rate_limited(wait):
+    """DigitalOcean's 429: no Retry-After, the reset time comes as an epoch"""
+    return web.json_response(
+        {"id": "too_many_requests", "message": "API Rate limit exceeded."}, status=429,
+        headers={"RateLimit-Remaining": "0", "RateLimit-Reset": str(math.ceil(time.time() + wait))}
+    )
+
+def create_app(rate=0.0, burst=None, server_rate=0.0):
+    """Build the stand-in app; rate and burst are per token, server_rate over all tokens"""
+    token_limit = RequestLimit(rate, burst)
+    server_limit = RequestLimit(server_rate)
+    stats = {"requests": 0, "throttled": 0}
+    
+    @web.middleware
+    async def authenticate(request, handler):
+        stats["requests"] += 1
+        token = request.headers.get("Authorization", "").replace("Bearer ", "")
+        if not token or token.startswith("invalid"):
+            return web.json_response(
+                {"id": "unauthorized", "message": "Unable to authenticate you"}, status=401
+            )
+        wait = token_limit.check(token) or server_limit.check()
+        if wait:
+            stats["throttled"] += 1
+            return rate_limited(wait)
+        request["account"] = synthetic_account(token)
+        return await handler(request)
+    
+    async def account(request):
+        info = {key: value for key, value in request["account"].items() if key != "droplets"}
+        return web.json_response({"account": info})
+    
+    async def droplets(request):
+        total = request["account"]["droplets"]
+        per_page = int(request.query.get("per_page", 20))
+        page = [{"id": 3000000 + number, "name": f"droplet-{number}", "status": "active", "vcpus": 1}
+                for number in range(min(total, per_page))]
+        return web.json_response({"droplets": page, "links": {}, "meta": {"total": total}})
+    
+    app = web.Application(middlewares=[authenticate, etag_middleware(stats)])
+    app["stats"] = stats
+    app.router.add_get("/v2/account", account)
+    app.router.add_get("/v2/droplets", droplets)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="DigitalOcean API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8781)
+    parser.add_argument("--rate", type=float, default=0.0, help="Requests/s per token, 0 is unlimited")
+    parser.add_argument("--burst", type=float, help="Requests per token before the rate applies")
+    parser.add_argument("--server-rate", type=float, default=0.0, help="Requests/s over all tokens")
+    args = parser.parse_args()
+    
+    print(f"🧪 DigitalOcean stand-in on http://{args.host}:{args.port}")
+    web.run_app(create_app(args.rate, args.burst, args.server_rate),
+                host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
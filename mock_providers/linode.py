@@ -0,0 +1,118 @@
+"""
+Linode API v4 stand-in
+Serves GET /v4/profile, /v4/account and /v4/linode/instances (with X-Filter on
+status and paging) for any bearer token; each token gets a made-up account derived
+from it, tokens starting with "invalid" are rejected. Requests over --rate per
+token (or --server-rate overall) get Linode's 429 with Retry-After.
+Responses carry an ETag; a request with a still matching If-None-Match gets 304.
+
+Usage: python -m mock_providers.linode [--port 8782] [--rate 10] [--burst 20]
+Then set api_url under cloud_providers.linode in config.yaml
+to http://127.0.0.1:8782
+"""
+
+import argparse
+import json
+import math
+import random
+from aiohttp import web
+from mock_providers.server import RequestLimit, etag_middleware
+
+INSTANCE_VCPUS = [1, 1, 2, 2, 4, 8]
+
+def synthetic_account(token):
+    """Made-up account of a token, the same token always gets the same account"""
+    rng = random.Random(token)
+    # One account in a hundred runs more instances than fit on one page
+    count = rng.randint(520, 700) if rng.random() < 0.01 else rng.randint(0, 8)
+    return {
+        "username": f"user{rng.getrandbits(32):08x}",
+        "restricted": rng.random() < 0.05,
+        "balance": round(rng.uniform(5, 50), 2) if rng.random() < 0.05 else 0.0,
+        "instances": [
+            {"status": "running" if rng.random() < 0.8 else "offline", "vcpus": rng.choice(INSTANCE_VCPUS)}
+            for _ in range(count)
+        ],
+    }
+
+def errors(reason, status, headers=None):
+    """Linode style error response"""
+    return web.json_response({"errors": [{"reason": reason}]}, status=status, headers=headers)
+
+def create_app(rate=0.0, burst=None, server_rate=0.0):
+    """Build the stand-in app; rate and burst are per token, server_rate over all tokens"""
+    token_limit = RequestLimit(rate, burst)
+    server_limit = RequestLimit(server_rate)
+    stats = {"requests": 0, "throttled": 0}
+    
+    @web.middleware
+    async def authenticate(request, handler):
+        stats["requests"] += 1
+        token = request.headers.get("Authorization", "").replace("Bearer ", "")
+        if not token or token.startswith("invalid"):
+            return errors("Invalid Token", 401)
+        wait = token_limit.check(token) or server_limit.check()
+        if wait:
+            stats["throttled"] += 1
+            return errors("Too Many Requests", 429, {"Retry-After": str(math.ceil(wait)),
+                                                    "X-RateLimit-Remaining": "0"})
+        request["account"] = synthetic_account(token)
+        return await handler(request)
+    
+    async def profile(request):
+        info = request["account"]
+        return web.json_response({
+            "username": info["username"], "email": f"{info['username']}@example.com",
+            "restricted": info["restricted"], "two_factor_auth": True, "timezone": "UTC",
+        })
+    
+    async def account(request):
+        info = request["account"]
+        return web.json_response({
+            "email": f"{info['username']}@example.com", "balance": info["balance"],
+            "balance_uninvoiced": 0.0, "active_since": "2021-03-01T00:00:00",
+            "capabilities": ["Linodes", "NodeBalancers", "Block Storage"],
+        })
+    
+    async def instances(request):
+        try:
+            wanted = json.loads(request.headers.get("X-Filter", "{}"))
+        except ValueError:
+            return errors("Invalid X-Filter", 400)
+        matching = [
+            {"id": 40000000 + number, "label": f"linode{number}", "status": instance["status"],
+             "specs": {"vcpus": instance["vcpus"], "memory": 2048 * instance["vcpus"], "disk": 51200}}
+            for number, instance in enumerate(request["account"]["instances"])
+            if wanted.get("status") in (None, instance["status"])
+        ]
+        page = int(request.query.get("page", 1))
+        page_size = min(int(request.query.get("page_size", 100)), 500)
+        return web.json_response({
+            "data": matching[(page - 1) * page_size:page * page_size],
+            "page": page,
+            "pages": max(1, math.ceil(len(matching) / page_size)),
+            "results": len(matching),
+        })
+    
+    app = web.Application(middlewares=[authenticate, etag_middleware(stats)])
+    app["stats"] = stats
+    app.router.add_get("/v4/profile", profile)
+    app.router.add_get("/v4/account", account)
+    app.router.add_get("/v4/linode/instances", instances)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Linode API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8782)
+    parser.add_argument("--rate", type=float, default=0.0, help="Requests/s per token, 0 is unlimited")
+    parser.add_argument("--burst", type=float, help="Requests per token before the rate applies")
+    parser.add_argument("--server-rate", type=float, default=0.0, help="Requests/s over all tokens")
+    args = parser.parse_args()
+    
+    print(f"🧪 Linode stand-in on http://{args.host}:{args.port}")
+    web.run_app(create_app(args.rate, args.burst, args.server_rate),
+                host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
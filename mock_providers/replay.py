@@ -0,0 +1,356 @@
+"""
+Record and replay of provider API responses
+Records sanitized responses once through a forwarding server, then serves them
+offline with configurable latency, jitter and injected errors
+
+Record: point the checker at the recorder (api_url, login_url for Azure,
+endpoint_url for AWS) and check a few real accounts
+    python -m mock_providers.replay record digitalocean --upstream https://api.digitalocean.com
+    python -m mock_providers.replay record aws --upstream aws
+AWS requests are signed for the recorder's host, so the recorder signs them again
+for the regional AWS host with AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY from
+its own environment.
+
+Replay:
+    python -m mock_providers.replay serve digitalocean [--port 8790] [--latency 0.05]
+        [--jitter 0.02] [--error-rate 0.01] [--throttle-rate 0.01]
+
+A cassette is a name in mock_providers/cassettes or a path. Responses recorded for
+the same request are served in turn, so a cassette made from a few accounts in
+different states replays as a mixed population.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+from urllib.parse import parse_qsl
+from aiohttp import ClientSession, web
+from mock_providers.aws import aws_scope, error_response
+
+CASSETTE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes")
+
+# Request parameters carrying credentials, never written to a cassette nor matched on
+SECRET_PARAMS = {"username", "password", "client_secret", "refresh_token", "code"}
+
+# Request headers that select a different response
+KEY_HEADERS = ("X-Filter",)
+
+# Request headers not forwarded upstream
+HOP_HEADERS = {"host", "content-length", "connection", "keep-alive", "transfer-encoding"}
+
+# Response headers kept in the cassette
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+# JSON keys and XML elements (lowercased) whose values identify an account or a person
+SECRET_KEYS = {
+    "id", "uid", "uuid", "username", "name", "displayname", "label", "company",
+    "first_name", "last_name", "address_1", "address_2", "city", "zip", "phone", "tax_id",
+    "account", "accountid", "userid", "ownerid", "requesterid", "subscriptionid", "tenantid",
+    "reservationid", "instanceid", "imageid", "subnetid", "vpcid", "keyname",
+    "ipv4", "ipv6", "ipaddress", "privateipaddress", "publicipaddress",
+    "privatednsname", "publicdnsname",
+}
+SECRET_SUFFIXES = ("arn", "email", "token")
+
+# XML elements dropped whole: user-chosen tag keys and values
+DROPPED_ELEMENTS = ("tagSet",)
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+XML_LEAF_RE = re.compile(r"<(\w+)>([^<]+)</\1>")
+
+class Sanitizer:
+    """Replaces identifying values with placeholders, the same value always gets
+    the same placeholder"""
+    
+    def __init__(self):
+        self.placeholders = {}
+    
+    def placeholder(self, value):
+        """Stable stand-in of a value: an example.com email, a number or redacted-N"""
+        if value not in self.placeholders:
+            number = len(self.placeholders) + 1
+            if isinstance(value, int):
+                self.placeholders[value] = number
+            elif "@" in value:
+                self.placeholders[value] = f"user{number}@example.com"
+            else:
+                self.placeholders[value] = f"redacted-{number}"
+        return self.placeholders[value]
+    
+    def is_secret(self, key):
+        """Key or element name whose value identifies someone"""
+        key = key.lower()
+        return key in SECRET_KEYS or key.endswith(SECRET_SUFFIXES)
+    
+    def json(self, data, secret=False):
+        """Sanitized copy of a decoded JSON document"""
+        if isinstance(data, dict):
+            return {key: self.json(value, secret or self.is_secret(key)) for key, value in data.items()}
+        if isinstance(data, list):
+            return [self.json(value, secret) for value in data]
+        if isinstance(data, str):
+            if secret:
+                return self.placeholder(data)
+            return EMAIL_RE.sub(lambda match: self.placeholder(match.group(0)), data)
+        if secret and isinstance(data, int) and not isinstance(data, bool):
+            return self.placeholder(data)
+        return data
+    
+    def text(self, text):
+        """Sanitized copy of an XML or plain text body"""
+        for element in DROPPED_ELEMENTS:
+            text = re.sub(rf"<{element}>.*?</{element}>", f"<{element}/>", text, flags=re.S)
+        text = XML_LEAF_RE.sub(
+            lambda match: (f"<{match[1]}>{self.placeholder(match[2])}</{match[1]}>"
+                           if self.is_secret(match[1]) else match[0]),
+            text
+        )
+        return EMAIL_RE.sub(lambda match: self.placeholder(match.group(0)), text)
+
+def cassette_path(name):
+    """Path of a cassette given as a path or as a name in CASSETTE_DIR"""
+    if os.path.exists(name) or os.sep in name or name.endswith(".json"):
+        return name
+    return os.path.join(CASSETTE_DIR, f"{name}.json")
+
+def load_cassette(name):
+    """Recorded interactions of a cassette, empty when it does not exist yet"""
+    path = cassette_path(name)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)["interactions"]
+
+def save_cassette(name, interactions):
+    """Write interactions to a cassette"""
+    path = cassette_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"interactions": interactions}, f, indent=2)
+        f.write("\n")
+
+def request_params(request, body):
+    """Query, form and JSON body parameters of a request, minus credentials"""
+    params = dict(request.query)
+    if body and request.content_type == "application/x-www-form-urlencoded":
+        params.update(parse_qsl(body.decode()))
+    elif body and "json" in request.content_type:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            params.update(data)
+    return {key: value for key, value in params.items() if key.lower() not in SECRET_PARAMS}
+
+def describe_request(request, body):
+    """Cassette form of a request: what selects its response, without credentials"""
+    params = request_params(request, body)
+    return {
+        "service": aws_scope(request.headers)[1] or "",
+        "method": request.method,
+        "path": request.path,
+        # Query protocol AWS APIs name the call in Action, JSON ones in X-Amz-Target
+        "action": params.get("Action") or request.headers.get("X-Amz-Target", ""),
+        "headers": {name: request.headers[name] for name in KEY_HEADERS if name in request.headers},
+        "params": params,
+    }
+
+def loose_key(described):
+    """Match on the API call only, used for hand-written and foreign requests"""
+    return (described.get("service", ""), described["method"], described["path"],
+            described.get("action", ""))
+
+def exact_key(described):
+    """Match on the API call and every parameter"""
+    return loose_key(described) + (json.dumps(described.get("headers", {}), sort_keys=True),
+                                   json.dumps(described.get("params", {}), sort_keys=True))
+
+def recorded_response(interaction):
+    """Response of a recorded interaction"""
+    response = interaction["response"]
+    if "json" in response:
+        body = json.dumps(response["json"])
+    else:
+        body = response.get("body", "")
+    return web.Response(status=response["status"], body=body.encode(),
+                        headers=response.get("headers", {}))
+
+def injected_error(interaction, status):
+    """Throttling (429) or outage (503) shaped like the provider's own errors, so
+    checkers classify it as they would a real one"""
+    request = interaction["request"]
+    throttled = status == 429
+    service = request.get("service")
+    if service:
+        # JSON protocol APIs name the call Service.Operation in X-Amz-Target
+        target = request["action"] if "." in request.get("action", "") else ""
+        if service == "ec2":
+            code = "RequestLimitExceeded" if throttled else "Unavailable"
+        elif target:
+            code = "ThrottlingException" if throttled else "ServiceUnavailableException"
+        else:
+            code = "Throttling" if throttled else "ServiceUnavailable"
+        response = error_response(service, target, code, "Injected error", status)
+    else:
+        code = "too_many_requests" if throttled else "service_unavailable"
+        response = web.json_response({"id": code, "message": "Injected error",
+                                      "errors": [{"reason": "Injected error"}]}, status=status)
+    if throttled:
+        response.headers["Retry-After"] = "1"
+    return response
+
+def create_app(interactions, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, seed=None):
+    """Build the replay app for a list of recorded interactions
+    
+    Every response waits latency +/- jitter seconds; error_rate and throttle_rate are
+    the shares of requests answered with an injected 503 or 429 instead.
+    """
+    rng = random.Random(seed)
+    recorded = {}
+    for interaction in interactions:
+        recorded.setdefault(exact_key(interaction["request"]), []).append(interaction)
+        recorded.setdefault(loose_key(interaction["request"]), []).append(interaction)
+    # Requests with several recorded responses get them in turn
+    turns = {key: itertools.cycle(items) for key, items in recorded.items()}
+    stats = {"requests": 0, "errors": 0, "throttled": 0, "misses": 0}
+    
+    async def replay(request):
+        described = describe_request(request, await request.read())
+        stats["requests"] += 1
+        delay = max(0.0, latency + rng.uniform(-jitter, jitter))
+        if delay:
+            await asyncio.sleep(delay)
+        
+        turn = turns.get(exact_key(described)) or turns.get(loose_key(described))
+        if turn is None:
+            stats["misses"] += 1
+            return web.json_response({"error": "not_recorded", "request": described}, status=404)
+        interaction = next(turn)
+        
+        roll = rng.random()
+        if roll < throttle_rate:
+            stats["throttled"] += 1
+            return injected_error(interaction, 429)
+        if roll < throttle_rate + error_rate:
+            stats["errors"] += 1
+            return injected_error(interaction, 503)
+        return recorded_response(interaction)
+    
+    async def get_stats(request):
+        return web.json_response(stats)
+    
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_get("/_replay/stats", get_stats)
+    app.router.add_route("*", "/{path:.*}", replay)
+    return app
+
+def sign_aws(method, url, headers, body, region, service):
+    """Headers of a request signed again for the real AWS host with this process's keys"""
+    from botocore.auth import SigV4Auth
+    from botocore.awsrequest import AWSRequest
+    from botocore.credentials import Credentials
+    
+    credentials = Credentials(os.environ["AWS_ACCESS_KEY_ID"], os.environ["AWS_SECRET_ACCESS_KEY"],
+                              os.environ.get("AWS_SESSION_TOKEN"))
+    unsigned = {name: value for name, value in headers.items()
+                if name.lower() not in ("authorization", "x-amz-date", "x-amz-security-token")}
+    aws_request = AWSRequest(method=method, url=url, data=body, headers=unsigned)
+    SigV4Auth(credentials, service, region).add_auth(aws_request)
+    return dict(aws_request.headers.items())
+
+def upstream_request(request, body, upstream):
+    """URL and headers of a request forwarded to upstream ('aws': the regional host)"""
+    headers = {name: value for name, value in request.headers.items()
+               if name.lower() not in HOP_HEADERS}
+    if upstream != "aws":
+        return upstream.rstrip("/") + request.path_qs, headers
+    region, service = aws_scope(request.headers)
+    url = f"https://{service}.{region}.amazonaws.com{request.path_qs}"
+    return url, sign_aws(request.method, url, headers, body, region, service)
+
+def sanitized_response(sanitizer, status, headers, payload):
+    """Cassette form of a response, identifying values replaced"""
+    text = payload.decode("utf-8", errors="replace")
+    response = {"status": status, "headers": headers}
+    try:
+        response["json"] = sanitizer.json(json.loads(text))
+    except ValueError:
+        response["body"] = sanitizer.text(text)
+    return response
+
+def create_recorder_app(cassette, upstream):
+    """Build a forwarding app that appends sanitized interactions to a cassette
+    
+    The caller gets the real response; only the cassette is sanitized.
+    """
+    interactions = load_cassette(cassette)
+    sanitizer = Sanitizer()
+    
+    async def record(request):
+        body = await request.read()
+        url, headers = upstream_request(request, body, upstream)
+        async with request.app["session"].request(request.method, url, headers=headers,
+                                                  data=body or None) as response:
+            payload = await response.read()
+            status = response.status
+            kept = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        
+        interactions.append({
+            "request": describe_request(request, body),
+            "response": sanitized_response(sanitizer, status, kept, payload),
+        })
+        save_cassette(cassette, interactions)
+        print(f"📼 {request.method} {request.path} -> {status}")
+        return web.Response(status=status, body=payload, headers=kept)
+    
+    async def open_session(app):
+        app["session"] = ClientSession(auto_decompress=True)
+    
+    async def close_session(app):
+        await app["session"].close()
+    
+    app = web.Application()
+    app.on_startup.append(open_session)
+    app.on_cleanup.append(close_session)
+    app.router.add_route("*", "/{path:.*}", record)
+    return app
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--host", default="127.0.0.1")
+    common.add_argument("--port", type=int, default=8790)
+    common.add_argument("cassette", help="Cassette name in mock_providers/cassettes, or a path")
+    
+    parser = argparse.ArgumentParser(description="Provider API record and replay")
+    modes = parser.add_subparsers(dest="mode", required=True)
+    record_parser = modes.add_parser("record", parents=[common],
+                                     help="Forward to a provider and record sanitized responses")
+    record_parser.add_argument("--upstream", required=True,
+                               help="Provider API URL, or aws for the regional AWS hosts")
+    serve_parser = modes.add_parser("serve", parents=[common], help="Serve recorded responses")
+    serve_parser.add_argument("--latency", type=float, default=0.0, help="Seconds per response")
+    serve_parser.add_argument("--jitter", type=float, default=0.0, help="Latency spread, +/- seconds")
+    serve_parser.add_argument("--error-rate", type=float, default=0.0, help="Share answered with 503")
+    serve_parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share answered with 429")
+    serve_parser.add_argument("--seed", type=int, help="Seed of latency and error rolls")
+    args = parser.parse_args()
+    
+    if args.mode == "record":
+        print(f"📼 Recording {args.upstream} into {cassette_path(args.cassette)}")
+        app = create_recorder_app(args.cassette, args.upstream)
+    else:
+        interactions = load_cassette(args.cassette)
+        print(f"🧪 Replaying {len(interactions)} responses from {cassette_path(args.cassette)}")
+        app = create_app(interactions, args.latency, args.jitter, args.error_rate,
+                         args.throttle_rate, args.seed)
+    print(f"   on http://{args.host}:{args.port}")
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Helpers shared by the provider stand-ins
+Runs a stand-in app on a thread of the calling process, rejects requests
+over a per-key rate the way providers answer with 429 and answers
+conditional requests for unchanged responses with 304
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from aiohttp import web
+
+class RequestLimit:
+    """Token bucket per key; a request over the limit is rejected, not queued
+    
+    Only used from the app's event loop, so it needs no lock.
+    """
+    
+    def __init__(self, rate=0.0, burst=None):
+        self.rate = float(rate or 0.0)
+        self.burst = float(burst or max(1.0, self.rate))
+        self._buckets = {}   # key -> (tokens, updated)
+    
+    def check(self, key=None):
+        """None when a request of key may go now, else seconds until it may"""
+        if not self.rate:
+            return None
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+        self._buckets[key] = (tokens - 1, now)
+        return None
+
+def etag_middleware(stats):
+    """Middleware tagging 200 responses with an ETag of their body; a request whose
+    If-None-Match still matches gets an empty 304, counted in stats["not_modified"]"""
+    stats.setdefault("not_modified", 0)
+    
+    @web.middleware
+    async def conditional(request, handler):
+        response = await handler(request)
+        if response.status != 200 or not isinstance(response, web.Response) or response.body is None:
+            return response
+        etag = f'"{hashlib.sha1(response.body).hexdigest()[:20]}"'
+        if request.headers.get("If-None-Match") == etag:
+            stats["not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return response
+    
+    return conditional
+
+class BackgroundServer:
+    """Runs an aiohttp app on an event loop thread of its own
+    
+    port=0 picks a free port; url is set once start() returns.
+    """
+    
+    def __init__(self, app, host="127.0.0.1", port=0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.url = None
+        self._loop = None
+        self._thread = None
+        self._error = None
+    
+    def start(self):
+        """Start serving, returns the base URL"""
+        started = threading.Event()
+        
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            runner = web.AppRunner(self.app, access_log=None)
+            try:
+                self._loop.run_until_complete(runner.setup())
+                site = web.TCPSite(runner, self.host, self.port, backlog=1024)
+                self._loop.run_until_complete(site.start())
+                self.port = runner.addresses[0][1]
+                self.url = f"http://{self.host}:{self.port}"
+            except Exception as e:
+                self._error = e
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(runner.cleanup())
+            self._loop.close()
+        
+        self._thread = threading.Thread(target=run, name="mock-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        if self._error:
+            raise self._error
+        return self.url
+    
+    def stop(self):
+        """Stop serving and wait for the thread"""
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -3,7 +3,7 @@ Account model for storing cloud provider accounts
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 
 # Создаем Base  определения класса
@@ -56,6 +56,19 @@ class Account(Base):
     is_active = Column(Boolean, default=True)
     last_check = Column(DateTime)
     check_result = Column(String(50))  # Success, Failed, Warning
+    last_full_check = Column(DateTime)  # Last check that included the region sweep
+    
+    # Soft delete tombstone, purged later by DatabaseManager.purge_deleted_accounts
+    deleted_at = Column(DateTime)
+    
+    __table_args__ = (
+        # Listing queries only ever touch live rows
+        Index('ix_accounts_live_provider_created', provider, created_at,
+              sqlite_where=deleted_at.is_(None)),
+        # Purge job scans tombstones only
+        Index('ix_accounts_deleted_at', deleted_at,
+              sqlite_where=deleted_at.isnot(None)),
+    )
     
     def __repr__(self):
         return f"<Account(provider='{self.provider}', email='{self.email}')>"
@@ -90,6 +103,7 @@ class Account(Base):
                 'email_password': self.email_password,
                 'do_password': self.do_password,
                 'do_2fa_secret': self.do_2fa_secret,
+                'api_key': self.api_key,
                 'limits': self.limits,
                 'country': self.country  # Override common country
             })
@@ -132,6 +146,7 @@ class Account(Base):
             account.email_password = data.get('email_password', '')
             account.do_password = data.get('do_password', '')
             account.do_2fa_secret = data.get('2fa_secret', '')
+            account.api_key = data.get('api_key', '')
             account.limits = data.get('limits', '')
             account.country = data.get('country', '')
             account.payment_method = data.get('payment_method', '')
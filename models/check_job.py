@@ -0,0 +1,41 @@
+"""
+Check job model: one queued check of one account, claimed by workers under a lease
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from models.account import Base
+
+# Job states
+JOB_PENDING = "pending"   # Waiting for available_at
+JOB_LEASED = "leased"     # Claimed by lease_owner until lease_expires
+JOB_DONE = "done"
+JOB_DEAD = "dead"         # Gave up after max_attempts, kept for inspection
+
+class CheckJob(Base):
+    """Queued account check"""
+    
+    __tablename__ = 'check_jobs'
+    
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey('accounts.id', ondelete='CASCADE'), nullable=False)
+    provider = Column(String(50), nullable=False)
+    depth = Column(String(20), nullable=False)  # liveness, quick, full
+    status = Column(String(20), nullable=False, default=JOB_PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    lease_owner = Column(String(100))  # host:pid of the worker holding the lease
+    lease_expires = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        # Claims scan claimable jobs oldest first
+        Index('ix_check_jobs_status_available', status, available_at),
+        Index('ix_check_jobs_account', account_id),
+    )
+    
+    def __repr__(self):
+        return f"<CheckJob(id={self.id}, account_id={self.account_id}, status='{self.status}')>"
@@ -0,0 +1,20 @@
+"""
+Per-region AWS quota model, filled by full-depth checks
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from models.account import Base
+
+class AccountRegionQuota(Base):
+    """vCPU usage and limit of one account in one region"""
+    
+    __tablename__ = 'account_region_quotas'
+    
+    account_id = Column(Integer, ForeignKey('accounts.id', ondelete='CASCADE'), primary_key=True)
+    region = Column(String(50), primary_key=True)  # Region code, e.g. us-east-1
+    quota_used = Column(Integer, default=0)
+    quota_limit = Column(Integer, default=0)
+    checked_at = Column(DateTime)
+    
+    def __repr__(self):
+        return f"<AccountRegionQuota(account_id={self.account_id}, region='{self.region}')>"
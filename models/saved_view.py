@@ -0,0 +1,24 @@
+"""
+Saved view model: a named filter combination with its cached result set
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from models.account import Base
+
+class SavedView(Base):
+    """Named filter with cached account IDs"""
+    
+    __tablename__ = 'saved_views'
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, unique=True)
+    filters = Column(Text, nullable=False)  # JSON filter dict, see database.filters
+    cached_ids = Column(Text)               # JSON list of matching account IDs
+    cached_count = Column(Integer, default=0)
+    refreshed_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SavedView(name='{self.name}', count={self.cached_count})>"
+
@@ -0,0 +1,29 @@
+"""
+Tag model for grouping accounts (batch, supplier, purpose)
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Index
+from models.account import Base
+
+# Many-to-many link between accounts and tags
+account_tags = Table(
+    'account_tags',
+    Base.metadata,
+    Column('account_id', Integer, ForeignKey('accounts.id', ondelete='CASCADE'), primary_key=True),
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    # Primary key serves account -> tags, this one serves tag -> accounts
+    Index('ix_account_tags_tag_account', 'tag_id', 'account_id'),
+)
+
+class Tag(Base):
+    """Named label that can be attached to any number of accounts"""
+
+    __tablename__ = 'tags'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, unique=True)  # e.g. "batch-2024-05", "supplier:acme"
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Tag(name='{self.name}')>"
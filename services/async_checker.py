@@ -0,0 +1,233 @@
+"""
+Base class for HTTP API checkers
+Checks many accounts concurrently on one asyncio event loop
+"""
+
+import asyncio
+import contextlib
+import time
+from urllib.parse import urlencode
+from services.base_checker import BaseChecker, CheckError, OverloadError
+from services.coalescer import LeaderReleased
+from services.concurrency import OUTCOME_OK, OUTCOME_OVERLOAD
+from services.rate_limiter import retry_after_seconds
+
+# Try to import aiohttp
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    print("⚠️ aiohttp not installed. Install with: python -m pip install aiohttp")
+    print("   DigitalOcean and Linode accounts will not be checked")
+
+class AsyncChecker(BaseChecker):
+    """Runs check_account_async for all accounts over one keep-alive connection pool"""
+    
+    api_url = None
+    
+    # Retries of a request answered with 429, after waiting out Retry-After
+    throttle_retries = 2
+    
+    def __init__(self, db_manager=None, max_workers=64, batch_size=100, proxy_url=None,
+                 rate_limiter=None, api_url=None):
+        super().__init__(db_manager, max_workers, batch_size, proxy_url, rate_limiter)
+        self.api_url = (api_url or self.api_url).rstrip("/")
+        
+        # aiohttp only speaks HTTP(S) proxies
+        self.http_proxy = proxy_url if proxy_url and proxy_url.startswith("http") else None
+        # ResponseCache of ETag / Last-Modified validators, set by create_checker
+        self.responses = None
+    
+    async def check_account_async(self, session, account):
+        """Check one account, returns a dict of Account columns to update"""
+        raise NotImplementedError
+    
+    def check_account(self, account):
+        """Check a single account (blocking)"""
+        async def check_one():
+            async with aiohttp.ClientSession() as session:
+                return await self.check_account_async(session, account)
+        return asyncio.run(check_one())
+    
+    def check_accounts(self, accounts, on_result=None, force=False):
+        """Check accounts on a fresh event loop in the calling thread"""
+        if not AIOHTTP_AVAILABLE:
+            raise CheckError("aiohttp is not installed")
+        return asyncio.run(self.check_accounts_async(accounts, on_result, force))
+    
+    async def check_accounts_async(self, accounts, on_result=None, force=False):
+        """Check accounts over one keep-alive pool, max_workers requests in flight"""
+        results = []
+        pending = []
+        
+        # The connector limit caps in-flight requests, idle connections are reused
+        connector = aiohttp.TCPConnector(limit=self.max_workers, ttl_dns_cache=300,
+                                         keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=30, connect=10)
+        
+        # Rows sharing a credential are checked once
+        leaders, followers = self.dedupe(accounts)
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            tasks = [asyncio.create_task(self.run_check_async(session, account, force))
+                     for account in leaders]
+            for task in asyncio.as_completed(tasks):
+                for result in self.expand(await task, followers):
+                    results.append(result)
+                    pending.append(result)
+                    if on_result:
+                        on_result(result)
+                if len(pending) >= self.batch_size:
+                    # DB writes are blocking, keep them off the event loop
+                    await asyncio.to_thread(self.flush_results, pending)
+                    pending = []
+        
+        await asyncio.to_thread(self.flush_results, pending)
+        return results
+    
+    def endpoints(self, account):
+        """Checks only talk to the API host"""
+        return [self.api_url]
+    
+    async def run_check_async(self, session, account, force=False):
+        """Check one account and never raise"""
+        cached = self.cached_result(account, force)
+        if cached:
+            return cached
+        while True:
+            if self.check_run is not None and not await self.check_run.wait_async():
+                return self.cancelled_result(account)
+            if self.coalescer is None:
+                result = await self.check_now_async(session, account)
+                if result.get('held'):
+                    continue
+                return result
+            
+            # Join a check of the same credential running on this or another event loop
+            key = self.coalesce_key(account)
+            future, leader = self.coalescer.join(key)
+            if not leader:
+                try:
+                    return self.fan_out(await asyncio.wrap_future(future), account)
+                except LeaderReleased:
+                    continue
+            try:
+                result = await self.check_now_async(session, account)
+            except BaseException as e:
+                self.coalescer.finish(key, future, error=e)
+                raise
+            if result.get('held'):
+                # Never hand a paused or cancelled run's result to other callers
+                self.coalescer.release(key, future)
+                continue
+            self.coalescer.finish(key, future, result)
+            return result
+    
+    async def check_now_async(self, session, account):
+        """Run the check through the circuit breakers and the concurrency limiter"""
+        retry_at = self.circuit_retry_at(account)
+        if retry_at:
+            return self.deferred_result(account, retry_at)
+        
+        if self.concurrency:
+            await self.concurrency.acquire_async(self.lane)
+        
+        # The run may have been paused or cancelled while this check waited for a slot;
+        # give the slot back, run_check_async waits for the run outside the coalescer
+        if self.run_held():
+            if self.concurrency:
+                self.concurrency.cancel()
+            return self.held_result(account)
+        
+        # The circuit may have opened while this check waited for a slot
+        retry_at = self.circuit_retry_at(account, admit=True)
+        if retry_at:
+            if self.concurrency:
+                self.concurrency.cancel()
+            return self.deferred_result(account, retry_at)
+        
+        started = time.monotonic()
+        outcome = OUTCOME_OK
+        try:
+            result = await self.check_account_async(session, account)
+        except asyncio.TimeoutError:
+            outcome = OUTCOME_OVERLOAD
+            result = self.error_result(CheckError("Request timed out"))
+        except Exception as e:
+            outcome = self.classify(e)
+            result = self.error_result(e)
+        finally:
+            if self.concurrency:
+                self.concurrency.release(time.monotonic() - started, outcome)
+        return self.finish_result(account, result)
+    
+    async def throttle_async(self, credential=None):
+        """Wait until the rate limiter allows the next request"""
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async(self.provider, credential, self.proxy_url)
+    
+    async def get_json(self, session, path, headers, params=None, credential=None):
+        """GET an API path, raising CheckError on auth and HTTP errors
+        
+        credential is the account's own (the API token, not a per-check access
+        token) and keys its rate limit bucket. Responses with an ETag or
+        Last-Modified are revalidated on the next request of the same credential;
+        a 304 returns the payload parsed last time.
+        """
+        breaker = self.circuit(self.api_url)
+        url = f"{self.api_url}{path}"
+        cache_key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        if "X-Filter" in headers:
+            # Linode filters server-side on a header, not the query
+            cache_key = f"{cache_key} {headers['X-Filter']}"
+        # Without a credential responses of different accounts would share entries
+        responses = self.responses if credential else None
+        attempt = 0
+        while True:
+            await self.throttle_async(credential)
+            request_headers = headers
+            if responses is not None:
+                request_headers = dict(headers, **responses.conditional_headers(credential, cache_key))
+            async with self.track(breaker, session.get(
+                url, headers=request_headers, params=params, proxy=self.http_proxy
+            )) as response:
+                if response.status == 304 and responses is not None:
+                    payload = responses.not_modified(credential, cache_key)
+                    if payload is not None:
+                        return payload
+                    # Evicted meanwhile: a local miss, not a throttle, ask once more without validators
+                    responses = None
+                    continue
+                if response.status == 429 and attempt < self.throttle_retries:
+                    attempt += 1
+                    # Hold back every worker using this token, not just this one
+                    if self.rate_limiter:
+                        self.rate_limiter.backoff(self.provider, credential,
+                                                  retry_after_seconds(response.headers))
+                    else:
+                        await asyncio.sleep(retry_after_seconds(response.headers))
+                    continue
+                if response.status == 401:
+                    raise CheckError("Invalid API token")
+                if response.status == 429 or response.status >= 500:
+                    raise OverloadError(f"HTTP {response.status} from {path}")
+                if response.status != 200:
+                    raise CheckError(f"HTTP {response.status} from {path}")
+                payload = await response.json()
+                if self.responses is not None and credential:
+                    self.responses.put(credential, cache_key, response.headers, payload)
+                return payload
+    
+    @contextlib.asynccontextmanager
+    async def track(self, breaker, request):
+        """Send a request, recording connection errors, timeouts and 5xx in the breaker"""
+        try:
+            async with request as response:
+                if breaker:
+                    breaker.record(response.status >= 500)
+                yield response
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if breaker:
+                breaker.record(True)
+            raise
@@ -0,0 +1,366 @@
+"""
+AWS account checker
+Validates access keys and reads EC2 vCPU quota usage
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+from botocore.config import Config
+from botocore.exceptions import (
+    ClientError, BotoCoreError, ConnectTimeoutError, ReadTimeoutError
+)
+from services.base_checker import (
+    BaseChecker, CheckError, DEPTH_LIVENESS, DEPTH_FULL, RESULT_SUCCESS, RESULT_WARNING
+)
+from services.concurrency import OUTCOME_OVERLOAD
+from services.region_catalog import DEFAULT_CATALOG_FILE, DEFAULT_CATALOG_TTL, get_region_catalog
+
+# Region names shown in the add account dialog -> region codes
+AWS_REGIONS = {
+    "US East (Ohio)": "us-east-2",
+    "US East (N. Virginia)": "us-east-1",
+    "US West (N. California)": "us-west-1",
+    "US West (Oregon)": "us-west-2",
+    "Asia Pacific (Mumbai)": "ap-south-1",
+    "Asia Pacific (Osaka)": "ap-northeast-3",
+    "Asia Pacific (Seoul)": "ap-northeast-2",
+    "Asia Pacific (Singapore)": "ap-southeast-1",
+    "Asia Pacific (Sydney)": "ap-southeast-2",
+    "Asia Pacific (Tokyo)": "ap-northeast-1",
+    "Canada (Central)": "ca-central-1",
+    "Europe (Frankfurt)": "eu-central-1",
+    "Europe (Ireland)": "eu-west-1",
+    "Europe (London)": "eu-west-2",
+    "Europe (Paris)": "eu-west-3",
+    "Europe (Stockholm)": "eu-north-1",
+    "South America (São Paulo)": "sa-east-1",
+}
+DEFAULT_REGION = "us-east-1"
+
+# Service Quotas: "Running On-Demand Standard (A, C, D, H, I, M, R, T, Z) instances", in vCPUs
+EC2_VCPU_QUOTA_CODE = "L-1216C47A"
+
+# Instance families that quota counts, by first letter; families starting with one of
+# these letters but carrying a quota of their own are listed separately
+STANDARD_FAMILY_LETTERS = set("acdhimrtz")
+NON_STANDARD_FAMILIES = {"dl", "hpc", "inf", "mac", "trn"}
+INSTANCE_FAMILY_RE = re.compile(r"([a-z]+)\d")
+
+def is_standard_instance(instance_type):
+    """True for On-Demand Standard families (A, C, D, H, I, M, R, T, Z): m5.large
+    counts, g4dn, p3, x1e, inf1 or trn1 do not"""
+    match = INSTANCE_FAMILY_RE.match(instance_type or "")
+    if not match:
+        return False
+    family = match.group(1)
+    return family[0] in STANDARD_FAMILY_LETTERS and family not in NON_STANDARD_FAMILIES
+
+# Error codes meaning the keys themselves are bad
+INVALID_KEY_ERRORS = {
+    "InvalidClientTokenId", "SignatureDoesNotMatch", "AuthFailure",
+    "UnrecognizedClientException", "InvalidAccessKeyId", "ExpiredToken",
+}
+
+# Error codes meaning AWS is throttling us
+THROTTLING_ERRORS = {
+    "Throttling", "ThrottlingException", "RequestLimitExceeded",
+    "TooManyRequestsException", "RequestThrottled", "SlowDown",
+}
+
+def is_overload(error):
+    """Timeouts, throttling and 5xx (after botocore's own retries)"""
+    if isinstance(error, (ConnectTimeoutError, ReadTimeoutError)):
+        return True
+    if isinstance(error, ClientError):
+        response = error.response
+        return (response.get("Error", {}).get("Code") in THROTTLING_ERRORS
+                or response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0) >= 500)
+    return False
+
+# boto3 clients kept per process, the least recently used are dropped beyond this
+CLIENT_CACHE_SIZE = 2048
+
+class ClientCache:
+    """boto3 sessions and clients shared by every AWSChecker of the process
+    
+    A session costs about 200 ms of CPU to build, so clients outlive the check run
+    (and the checker) that created them.
+    """
+    
+    def __init__(self, size=CLIENT_CACHE_SIZE):
+        self.size = size
+        self._sessions = OrderedDict()  # (access_key, secret_key) -> [lock, boto3 Session or None]
+        self._clients = OrderedDict()   # (access_key, secret_key, region, service, ...) -> client
+        self._lock = threading.Lock()
+    
+    def get(self, key, create):
+        """Client of key, built by create(session) on a miss; key starts with the key pair"""
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+            credentials = key[:2]
+            entry = self._sessions.get(credentials)
+            if entry is None:
+                entry = self._sessions[credentials] = [threading.Lock(), None]
+            self._sessions.move_to_end(credentials)
+        
+        # boto3 sessions are not thread safe, clients are: builds take the key pair's
+        # lock, so other key pairs are not held up by them
+        with entry[0]:
+            with self._lock:
+                client = self._clients.get(key)
+            if client is None:
+                if entry[1] is None:
+                    entry[1] = boto3.session.Session(aws_access_key_id=credentials[0],
+                                                     aws_secret_access_key=credentials[1])
+                client = create(entry[1])
+        
+        with self._lock:
+            client = self._clients.setdefault(key, client)
+            self._clients.move_to_end(key)
+            for cache in (self._clients, self._sessions):
+                while len(cache) > self.size:
+                    cache.popitem(last=False)
+            return client
+
+_shared_clients = None
+_shared_sweep_pool = None
+_shared_lock = threading.Lock()
+
+def get_client_cache():
+    """Process-wide boto3 client cache"""
+    global _shared_clients
+    with _shared_lock:
+        if _shared_clients is None:
+            _shared_clients = ClientCache()
+        return _shared_clients
+
+def get_sweep_pool(workers):
+    """Process-wide pool full checks read regions on, sized by the first caller"""
+    global _shared_sweep_pool
+    with _shared_lock:
+        if _shared_sweep_pool is None:
+            _shared_sweep_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="AWS-sweep")
+        return _shared_sweep_pool
+
+def region_code(region):
+    """Map a stored region (display name or code) to a region code"""
+    if not region:
+        return DEFAULT_REGION
+    return AWS_REGIONS.get(region, region)
+
+class AWSChecker(BaseChecker):
+    """Checker for AWS accounts"""
+    
+    provider = "AWS"
+    
+    def __init__(self, db_manager=None, max_workers=32, batch_size=100, proxy_url=None,
+                 rate_limiter=None, sweep_workers=64, region_catalog_ttl=DEFAULT_CATALOG_TTL,
+                 region_catalog_file=DEFAULT_CATALOG_FILE, endpoint_url=None):
+        super().__init__(db_manager, max_workers, batch_size, proxy_url, rate_limiter)
+        # One URL serving every AWS service instead of the regional hosts, e.g. a stand-in
+        self.endpoint_url = endpoint_url
+        self.clients = get_client_cache()
+        
+        # Full checks read all regions of an account at once on a process-wide pool,
+        # separate from the check pool so a sweep never waits on its own account's slot
+        self.sweep_workers = sweep_workers
+        self.regions = get_region_catalog(region_catalog_file, region_catalog_ttl)
+        
+        proxies = None
+        # botocore only speaks HTTP(S) proxies; SOCKS5 is applied at socket
+        # level by ProxyService.setup_socks_proxy
+        if proxy_url and proxy_url.startswith("http"):
+            proxies = {"http": proxy_url, "https": proxy_url}
+        
+        self.client_config = Config(
+            connect_timeout=10,
+            read_timeout=20,
+            retries={"max_attempts": 2, "mode": "standard"},
+            max_pool_connections=max_workers,
+            proxies=proxies
+        )
+    
+    def classify(self, error):
+        """Throttling and timeouts shrink the concurrency limit"""
+        if is_overload(error):
+            return OUTCOME_OVERLOAD
+        return super().classify(error)
+    
+    def get_client(self, service, access_key, secret_key, region):
+        """Get a client, reusing sessions and clients per (credential, region) process-wide"""
+        # Clients bake in the endpoint and proxy, checkers with other ones need their own
+        key = (access_key, secret_key, region, service, self.endpoint_url, self.proxy_url)
+        return self.clients.get(key, lambda session: self.create_client(session, service, access_key, region))
+    
+    def create_client(self, session, service, access_key, region):
+        """New client with rate limiting and circuit breaker hooks
+        
+        The hooks outlive this checker, so they hold the process-wide rate limiter and
+        breaker rather than the checker itself.
+        """
+        client = session.client(service, region_name=region, config=self.client_config,
+                                endpoint_url=self.endpoint_url)
+        rate_limiter, provider, proxy_url = self.rate_limiter, self.provider, self.proxy_url
+        if rate_limiter:
+            # Every HTTP attempt, including retries and paginator pages, takes a token
+            client.meta.events.register(
+                "before-send", lambda **kwargs: rate_limiter.acquire(provider, access_key, proxy_url)
+            )
+        breaker = self.circuit(f"{service}.{region}")
+        if breaker:
+            client.meta.events.register(
+                "response-received",
+                lambda exception=None, response_dict=None, **kwargs: breaker.record(
+                    exception is not None or response_dict["status_code"] >= 500
+                )
+            )
+        return client
+    
+    def credential_key(self, account):
+        """Key pair, plus the region whose quota a quick or full check reads"""
+        if not account.access_key or not account.secret_key:
+            return None
+        if self.depth == DEPTH_LIVENESS:
+            return (account.access_key, account.secret_key)
+        return (account.access_key, account.secret_key, region_code(account.region))
+    
+    def endpoints(self, account, region=None):
+        """Regional endpoints a check uses"""
+        region = region or region_code(account.region)
+        if self.depth == DEPTH_LIVENESS:
+            return [f"sts.{region}"]
+        return [f"{service}.{region}" for service in ("sts", "service-quotas", "ec2")]
+    
+    def check_account(self, account):
+        """Validate keys, then read vCPU quota usage for the account's region (quick)
+        or for every region (full)"""
+        if not account.access_key or not account.secret_key:
+            raise CheckError("Access key or secret key is missing")
+        
+        region = region_code(account.region)
+        credentials = (account.access_key, account.secret_key, region)
+        
+        try:
+            self.get_client("sts", *credentials).get_caller_identity()
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code", "")
+            if code in INVALID_KEY_ERRORS:
+                raise CheckError(f"Invalid credentials: {code}")
+            raise
+        
+        result = {'check_result': RESULT_SUCCESS}
+        if self.depth == DEPTH_LIVENESS:
+            return result
+        
+        try:
+            result['quota_limit'] = self.get_vcpu_limit(*credentials)
+            result['quota_used'] = self.get_vcpu_usage(*credentials)
+        except (ClientError, BotoCoreError) as e:
+            if is_overload(e):
+                raise
+            # Keys work but the user lacks quota/EC2 permissions
+            result['check_result'] = RESULT_WARNING
+            result['error'] = str(e)
+            return result
+        
+        if self.depth == DEPTH_FULL:
+            # The row keeps the account's own region, the sweep adds the other regions
+            result['regions'] = [{'region': region, 'quota_used': result['quota_used'],
+                                  'quota_limit': result['quota_limit']}]
+            result['regions'].extend(self.sweep_regions(account, region))
+            used = sum(row['quota_used'] for row in result['regions'])
+            limit = sum(row['quota_limit'] for row in result['regions'])
+            result['limits'] = f"{len(result['regions'])} regions: {used}/{limit} vCPUs"
+        return result
+    
+    def check_accounts(self, accounts, on_result=None, force=False):
+        """Check accounts, then persist region catalog changes"""
+        try:
+            return super().check_accounts(accounts, on_result, force)
+        finally:
+            self.regions.flush()
+    
+    def enabled_regions(self, account, home):
+        """Regions enabled for the account's key, from the region catalog"""
+        def fetch():
+            client = self.get_client("ec2", account.access_key, account.secret_key, home)
+            response = client.describe_regions(
+                Filters=[{"Name": "opt-in-status", "Values": ["opt-in-not-required", "opted-in"]}]
+            )
+            return sorted(region["RegionName"] for region in response.get("Regions", []))
+        
+        try:
+            return self.regions.get(account.access_key, fetch)
+        except (ClientError, BotoCoreError) as e:
+            if is_overload(e):
+                raise
+            # No ec2:DescribeRegions permission, sweep the regions we know of
+            return list(AWS_REGIONS.values())
+    
+    def sweep_regions(self, account, home):
+        """Quota rows of all other enabled regions, read in parallel"""
+        regions = []
+        for region in self.enabled_regions(account, home):
+            # A region behind an open circuit is left out rather than failing the check
+            if region == home or (self.circuits and self.circuits.retry_at(
+                self.provider, self.endpoints(account, region), self.proxy_url
+            )):
+                continue
+            regions.append(region)
+        
+        # Wall time is the slowest region, not the sum of all of them
+        pool = get_sweep_pool(self.sweep_workers)
+        futures = [pool.submit(self.region_quota, account, region) for region in regions]
+        rows = [future.result() for future in futures]
+        return [row for row in rows if row is not None]
+    
+    def region_quota(self, account, region):
+        """vCPU usage and limit in one region, None when the region cannot be read"""
+        credentials = (account.access_key, account.secret_key, region)
+        try:
+            return {'region': region, 'quota_limit': self.get_vcpu_limit(*credentials),
+                    'quota_used': self.get_vcpu_usage(*credentials)}
+        except (ClientError, BotoCoreError) as e:
+            if is_overload(e):
+                raise
+            # Region not opted into or unreachable
+            return None
+    
+    def get_vcpu_limit(self, access_key, secret_key, region):
+        """On-Demand standard instances vCPU limit"""
+        client = self.get_client("service-quotas", access_key, secret_key, region)
+        try:
+            response = client.get_service_quota(ServiceCode="ec2", QuotaCode=EC2_VCPU_QUOTA_CODE)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "NoSuchResourceException":
+                raise
+            # Account never had the quota applied, fall back to the AWS default
+            response = client.get_aws_default_service_quota(ServiceCode="ec2", QuotaCode=EC2_VCPU_QUOTA_CODE)
+        return int(response["Quota"]["Value"])
+    
+    def get_vcpu_usage(self, access_key, secret_key, region):
+        """vCPUs of pending and running On-Demand standard instances, the ones the
+        EC2_VCPU_QUOTA_CODE quota limits"""
+        client = self.get_client("ec2", access_key, secret_key, region)
+        paginator = client.get_paginator("describe_instances")
+        vcpus = 0
+        for page in paginator.paginate(
+            Filters=[{"Name": "instance-state-name", "Values": ["pending", "running"]}],
+            PaginationConfig={"PageSize": 1000}
+        ):
+            for reservation in page.get("Reservations", []):
+                for instance in reservation.get("Instances", []):
+                    # Spot and other families are limited by quotas of their own
+                    if instance.get("InstanceLifecycle") == "spot":
+                        continue
+                    if not is_standard_instance(instance.get("InstanceType")):
+                        continue
+                    cpu = instance.get("CpuOptions", {})
+                    vcpus += cpu.get("CoreCount", 1) * cpu.get("ThreadsPerCore", 1)
+        return vcpus
@@ -0,0 +1,128 @@
+"""
+Azure account checker
+Signs in with the account's email and password and reads its subscriptions
+"""
+
+from services.async_checker import AsyncChecker
+from services.base_checker import (
+    CheckError, OverloadError, DEPTH_LIVENESS, RESULT_SUCCESS, RESULT_FAILED, RESULT_WARNING
+)
+
+AZURE_LOGIN_URL = "https://login.microsoftonline.com"
+AZURE_MANAGEMENT_URL = "https://management.azure.com"
+
+# Public client of the Azure CLI, allowed to use the password grant
+AZURE_CLI_CLIENT_ID = "04b07795-8ddb-461a-bbee-02f9e1bf7b46"
+MANAGEMENT_SCOPE = "https://management.azure.com/.default offline_access"
+SUBSCRIPTIONS_API_VERSION = "2020-01-01"
+
+# Sign-in error codes (AADSTS...) -> (check_result, message)
+SIGNIN_ERRORS = {
+    50126: (RESULT_FAILED, "Invalid email or password"),
+    50034: (RESULT_FAILED, "User does not exist"),
+    50053: (RESULT_FAILED, "Account is locked"),
+    50057: (RESULT_FAILED, "Account is disabled"),
+    50055: (RESULT_WARNING, "Password expired"),
+    # Password was accepted, the tenant wants a second factor
+    50076: (RESULT_WARNING, "Password valid, MFA required"),
+    50079: (RESULT_WARNING, "Password valid, MFA registration required"),
+    50158: (RESULT_WARNING, "Password valid, security challenge required"),
+}
+
+# Subscription state -> check_result
+STATE_RESULTS = {
+    "Enabled": RESULT_SUCCESS,
+    "Warned": RESULT_WARNING,
+    "PastDue": RESULT_WARNING,
+    "Disabled": RESULT_FAILED,
+    "Deleted": RESULT_FAILED,
+}
+
+# subscriptionPolicies.quotaId prefix -> Account.subscription
+QUOTA_SUBSCRIPTIONS = {
+    "FreeTrial": "Free Trial 200$",
+    "PayAsYouGo": "Pay as You Go",
+}
+
+class AzureChecker(AsyncChecker):
+    """Checker for Azure accounts"""
+    
+    provider = "Azure"
+    api_url = AZURE_MANAGEMENT_URL
+    
+    def __init__(self, db_manager=None, max_workers=32, batch_size=100, proxy_url=None,
+                 rate_limiter=None, api_url=None, login_url=AZURE_LOGIN_URL):
+        super().__init__(db_manager, max_workers, batch_size, proxy_url, rate_limiter, api_url)
+        self.login_url = login_url.rstrip("/")
+    
+    def credential_key(self, account):
+        """Sign-in name (case-insensitive) and password"""
+        if not account.email or not account.azure_password:
+            return None
+        return (account.email.lower(), account.azure_password)
+    
+    def endpoints(self, account):
+        """Sign-in and management hosts"""
+        if self.depth == DEPTH_LIVENESS:
+            return [self.login_url]
+        return [self.login_url, self.api_url]
+    
+    async def check_account_async(self, session, account):
+        """Sign in, then read the best subscription's state and offer"""
+        if not account.email or not account.azure_password:
+            raise CheckError("Email or password is missing")
+        
+        token, signin_error = await self.get_token(session, account.email, account.azure_password)
+        if token is None:
+            check_result, message = signin_error
+            return {'check_result': check_result, 'error': message}
+        if self.depth == DEPTH_LIVENESS:
+            return {'check_result': RESULT_SUCCESS}
+        
+        data = await self.get_json(
+            session, "/subscriptions", {"Authorization": f"Bearer {token}"},
+            params={"api-version": SUBSCRIPTIONS_API_VERSION}, credential=account.email.lower()
+        )
+        subscriptions = data.get("value", [])
+        if not subscriptions:
+            return {'check_result': RESULT_WARNING, 'error': "No subscriptions"}
+        
+        # An enabled subscription wins over warned or disabled ones
+        order = list(STATE_RESULTS)
+        best = min(subscriptions, key=lambda s: order.index(s.get("state"))
+                   if s.get("state") in order else len(order))
+        
+        result = {
+            'check_result': STATE_RESULTS.get(best.get("state"), RESULT_WARNING),
+            'limits': f"{len(subscriptions)} subscriptions, {best.get('state')}",
+        }
+        quota_id = best.get("subscriptionPolicies", {}).get("quotaId", "")
+        for prefix, subscription in QUOTA_SUBSCRIPTIONS.items():
+            if quota_id.startswith(prefix):
+                result['subscription'] = subscription
+        return result
+    
+    async def get_token(self, session, email, password):
+        """Password grant sign-in, returns (token, None) or (None, (check_result, message))"""
+        form = {
+            "grant_type": "password",
+            "client_id": AZURE_CLI_CLIENT_ID,
+            "scope": MANAGEMENT_SCOPE,
+            "username": email,
+            "password": password,
+        }
+        await self.throttle_async(email.lower())
+        async with self.track(self.circuit(self.login_url), session.post(
+            f"{self.login_url}/organizations/oauth2/v2.0/token", data=form, proxy=self.http_proxy
+        )) as response:
+            if response.status == 429 or response.status >= 500:
+                raise OverloadError(f"HTTP {response.status} from sign-in")
+            data = await response.json(content_type=None)
+            if response.status == 200:
+                return data["access_token"], None
+        
+        for code in data.get("error_codes", []):
+            if code in SIGNIN_ERRORS:
+                return None, SIGNIN_ERRORS[code]
+        description = data.get("error_description", f"HTTP {response.status}").split("\r\n")[0]
+        return None, (RESULT_FAILED, description)
@@ -0,0 +1,301 @@
+"""
+Base class for provider checkers
+Runs checks on a bounded thread pool and writes results back in batches
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from services.coalescer import LeaderReleased
+from services.concurrency import OUTCOME_OK, OUTCOME_ERROR, OUTCOME_OVERLOAD, LANE_INTERACTIVE
+
+# Values stored in Account.check_result
+RESULT_SUCCESS = "Success"
+RESULT_FAILED = "Failed"
+RESULT_WARNING = "Warning"
+
+# Check depths, cheapest first: liveness only proves the credentials work,
+# quick adds limits and usage, full adds a sweep over all regions
+DEPTH_LIVENESS = "liveness"
+DEPTH_QUICK = "quick"
+DEPTH_FULL = "full"
+DEPTHS = (DEPTH_LIVENESS, DEPTH_QUICK, DEPTH_FULL)
+
+def liveness_outcome(stored, found):
+    """check_result of an account after a liveness check that found found
+    
+    Liveness only proves the credential works, so it records failures and recoveries
+    from Failed; otherwise the stored result, e.g. a Warning from the last quick or
+    full check, stands.
+    """
+    if found == RESULT_FAILED or stored in (None, RESULT_FAILED):
+        return found
+    return stored
+
+class CheckError(Exception):
+    """Check could not be completed, message ends up in the result"""
+
+class OverloadError(CheckError):
+    """Provider is throttling or failing (429, 5xx), the concurrency limit backs off"""
+
+class BaseChecker:
+    """Common check loop shared by all provider checkers"""
+    
+    provider = None
+    
+    # How much a check does, one of DEPTHS, set by create_checker
+    depth = DEPTH_QUICK
+    
+    # Priority lane of the concurrency limiter, background for scheduled checks
+    lane = LANE_INTERACTIVE
+    
+    def __init__(self, db_manager=None, max_workers=16, batch_size=100, proxy_url=None,
+                 rate_limiter=None):
+        self.db = db_manager
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.proxy_url = proxy_url
+        self.rate_limiter = rate_limiter
+        # AdaptiveLimiter gating in-flight checks, CircuitBreakers, ResultCache and
+        # Coalescer, set by create_checker
+        self.concurrency = None
+        self.circuits = None
+        self.cache = None
+        self.coalescer = None
+        # CheckRun that can pause or cancel checks not started yet, set by its owner
+        self.check_run = None
+    
+    def throttle(self, credential=None):
+        """Block until the rate limiter allows the next request"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire(self.provider, credential, self.proxy_url)
+    
+    def circuit(self, endpoint):
+        """Circuit breaker of an endpoint, None when circuit breaking is off"""
+        if self.circuits is None:
+            return None
+        return self.circuits.get(self.provider, endpoint, self.proxy_url)
+    
+    def endpoints(self, account):
+        """Endpoints a check of this account sends requests to"""
+        return []
+    
+    def check_account(self, account):
+        """Check one account, returns a dict of Account columns to update"""
+        raise NotImplementedError
+    
+    def credential_key(self, account):
+        """Identity of the credentials a check uses, None when they are missing"""
+        return None
+    
+    def coalesce_key(self, account):
+        """Checks with the same key share one result: same credential, else same account"""
+        credential = self.credential_key(account)
+        if credential is None:
+            return (self.provider, self.depth, 'account', account.id)
+        return (self.provider, self.depth, credential)
+    
+    def dedupe(self, accounts):
+        """One account per coalesce key, plus {leader id: [accounts sharing its key]}"""
+        leaders = []
+        followers = {}
+        seen = {}
+        for account in accounts:
+            key = self.coalesce_key(account)
+            if key in seen:
+                followers.setdefault(seen[key], []).append(account)
+            else:
+                seen[key] = account.id
+                leaders.append(account)
+        return leaders, followers
+    
+    def fan_out(self, result, account):
+        """Copy of a shared result for another account with the same credential"""
+        result = dict(result, id=account.id, coalesced=True)
+        if 'liveness_result' in result:
+            # Rows sharing a credential may have stored different results
+            result['check_result'] = liveness_outcome(account.check_result, result['liveness_result'])
+        # Written to this row even when the leader's copy came from the cache
+        result.pop('cached', None)
+        return result
+    
+    def expand(self, result, followers):
+        """A leader's result followed by copies for the accounts sharing its credential"""
+        return [result] + [self.fan_out(result, account) for account in followers.get(result['id'], [])]
+    
+    def classify(self, error):
+        """Concurrency limiter outcome of a check that raised"""
+        if isinstance(error, OverloadError):
+            return OUTCOME_OVERLOAD
+        if isinstance(error, CheckError):
+            return OUTCOME_OK
+        return OUTCOME_ERROR
+    
+    def circuit_retry_at(self, account, admit=False):
+        """Epoch time to retry when a circuit the check needs is open, else None
+        
+        admit=True also lets the check through as the probe of a half-open circuit.
+        """
+        if self.circuits is None:
+            return None
+        if admit:
+            return self.circuits.allow(self.provider, self.endpoints(account), self.proxy_url)
+        return self.circuits.retry_at(self.provider, self.endpoints(account), self.proxy_url)
+    
+    def cached_result(self, account, force=False):
+        """Recent result of the account from the cache, None on a miss or forced refresh"""
+        if self.cache is None or force:
+            return None
+        # A deeper result answers a shallower check too
+        result = self.cache.get(account.id, DEPTHS[DEPTHS.index(self.depth):])
+        if result is not None:
+            result['cached'] = True
+        return result
+    
+    def deferred_result(self, account, retry_at):
+        """Result of a check skipped because of an open circuit, not written to the DB"""
+        return {'id': account.id, 'deferred': True, 'retry_at': retry_at}
+    
+    def cancelled_result(self, account):
+        """Result of a check skipped because its run was cancelled, not written to the DB"""
+        return {'id': account.id, 'cancelled': True}
+    
+    def held_result(self, account):
+        """Marker of a check given back because its run was paused or cancelled, run_check
+        waits for the run and tries again"""
+        return {'id': account.id, 'held': True}
+    
+    def run_held(self):
+        """True while the check run is paused or cancelled"""
+        return self.check_run is not None and (self.check_run.paused or self.check_run.cancelled)
+    
+    def run_check(self, account, force=False):
+        """Check one account and never raise, returns a result dict with 'id'"""
+        cached = self.cached_result(account, force)
+        if cached:
+            return cached
+        while True:
+            # Before joining: a check held by a paused run must not hold up other callers
+            if self.check_run is not None and not self.check_run.wait():
+                return self.cancelled_result(account)
+            if self.coalescer is None:
+                result = self.check_now(account)
+                if result.get('held'):
+                    continue
+                return result
+            
+            # Join a check of the same credential already running in another thread
+            key = self.coalesce_key(account)
+            future, leader = self.coalescer.join(key)
+            if not leader:
+                try:
+                    return self.fan_out(future.result(), account)
+                except LeaderReleased:
+                    continue
+            try:
+                result = self.check_now(account)
+            except BaseException as e:
+                self.coalescer.finish(key, future, error=e)
+                raise
+            if result.get('held'):
+                # Never hand a paused or cancelled run's result to other callers
+                self.coalescer.release(key, future)
+                continue
+            self.coalescer.finish(key, future, result)
+            return result
+    
+    def check_now(self, account):
+        """Run the check through the circuit breakers and the concurrency limiter"""
+        # Open circuit: hand the account back at once instead of taking a worker slot
+        retry_at = self.circuit_retry_at(account)
+        if retry_at:
+            return self.deferred_result(account, retry_at)
+        
+        if self.concurrency:
+            self.concurrency.acquire(self.lane)
+        
+        # The run may have been paused or cancelled while this check waited for a slot;
+        # give the slot back, run_check waits for the run outside the coalescer
+        if self.run_held():
+            if self.concurrency:
+                self.concurrency.cancel()
+            return self.held_result(account)
+        
+        # The circuit may have opened while this check waited for a slot
+        retry_at = self.circuit_retry_at(account, admit=True)
+        if retry_at:
+            if self.concurrency:
+                self.concurrency.cancel()
+            return self.deferred_result(account, retry_at)
+        
+        started = time.monotonic()
+        outcome = OUTCOME_OK
+        try:
+            result = self.check_account(account)
+        except Exception as e:
+            outcome = self.classify(e)
+            result = self.error_result(e)
+        finally:
+            if self.concurrency:
+                self.concurrency.release(time.monotonic() - started, outcome)
+        return self.finish_result(account, result)
+    
+    def error_result(self, error):
+        """Result for a check that raised"""
+        if isinstance(error, CheckError):
+            return {'check_result': RESULT_FAILED, 'error': str(error)}
+        return {'check_result': RESULT_FAILED, 'error': f"{type(error).__name__}: {error}"}
+    
+    def finish_result(self, account, result):
+        """Stamp a result with the account ID and check time; a liveness result keeps
+        the check_result it found in liveness_result"""
+        result['id'] = account.id
+        result['last_check'] = datetime.utcnow()
+        if self.depth == DEPTH_LIVENESS and 'check_result' in result:
+            result['liveness_result'] = result['check_result']
+            result['check_result'] = liveness_outcome(account.check_result, result['check_result'])
+        if self.depth == DEPTH_FULL:
+            result['last_full_check'] = result['last_check']
+        return result
+    
+    def check_accounts(self, accounts, on_result=None, force=False):
+        """Check many accounts concurrently, writing results every batch_size checks
+        
+        force=True skips the result cache.
+        """
+        results = []
+        pending = []
+        # Rows sharing a credential are checked once
+        leaders, followers = self.dedupe(accounts)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix=f"{self.provider}-check") as pool:
+            futures = [pool.submit(self.run_check, account, force) for account in leaders]
+            for future in as_completed(futures):
+                for result in self.expand(future.result(), followers):
+                    results.append(result)
+                    pending.append(result)
+                    if on_result:
+                        on_result(result)
+                if len(pending) >= self.batch_size:
+                    self.flush_results(pending)
+                    pending = []
+        
+        self.flush_results(pending)
+        return results
+    
+    def flush_results(self, results):
+        """Write a batch of fresh results through the DB layer and into the result cache"""
+        results = [r for r in results if not (r.get('deferred') or r.get('cached') or r.get('cancelled'))]
+        if self.db and results:
+            # A stored result a liveness check left standing is not written back, a
+            # quick check may have replaced it meanwhile
+            self.db.save_check_results([
+                {key: value for key, value in r.items() if key != 'check_result'}
+                if r.get('liveness_result') not in (None, r.get('check_result')) else r
+                for r in results
+            ])
+        # After the write, so its change event does not invalidate these entries
+        if self.cache:
+            for result in results:
+                self.cache.put(result, self.depth, self.provider)
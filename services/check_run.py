@@ -0,0 +1,183 @@
+"""
+Check runs for Cloud Account Manager
+One user-started check of many accounts that can be paused, resumed and cancelled;
+progress and row results are handed out in batches at a bounded rate
+"""
+
+import asyncio
+import threading
+import time
+from services.base_checker import DEPTH_QUICK, RESULT_FAILED
+from services.checkers import create_checker
+
+# Seconds between two progress callbacks: 10 per second keeps a GUI event loop idle
+PROGRESS_INTERVAL = 0.1
+
+class CheckRun:
+    """Checks accounts by ID with the matching provider checker"""
+    
+    def __init__(self, db_manager, account_ids, proxy_url=None, force=False, depth=DEPTH_QUICK,
+                 engine=None, on_progress=None, on_results=None, interval=PROGRESS_INTERVAL):
+        self.db = db_manager
+        self.account_ids = list(account_ids)
+        self.proxy_url = proxy_url
+        self.force = force
+        self.depth = depth
+        # ProcessCheckEngine, None to check in this process
+        self.engine = engine
+        # Called with a progress dict and with a list of new results, from any thread
+        self.on_progress = on_progress
+        self.on_results = on_results
+        self.interval = interval
+        
+        self.total = len(self.account_ids)
+        self.counts = {'checked': 0, 'failed': 0, 'cached': 0, 'deferred': 0, 'cancelled': 0}
+        self.started_at = None
+        self.finished = False
+        self._pending = []          # Results not handed to on_results yet
+        self._emitted_at = 0.0
+        self._lock = threading.Lock()
+        self._emit_lock = threading.Lock()  # One emitter at a time keeps batches in order
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._cancelled = threading.Event()
+    
+    @property
+    def cancelled(self):
+        """cancel() was called"""
+        return self._cancelled.is_set()
+    
+    @property
+    def paused(self):
+        """pause() was called and resume() not yet"""
+        return not self._resumed.is_set()
+    
+    @property
+    def state(self):
+        """running, paused, cancelling, cancelled or finished"""
+        if self.cancelled:
+            return "cancelled" if self.finished else "cancelling"
+        if self.finished:
+            return "finished"
+        return "paused" if self.paused else "running"
+    
+    def cancel(self):
+        """Stop starting checks; running ones finish and are still reported"""
+        self.request_cancel()
+        self.flush(final=True)
+    
+    def request_cancel(self):
+        """cancel() without the progress flush, safe in a signal handler that may
+        interrupt a flush on the same thread; run() flushes when it returns"""
+        self._cancelled.set()
+        # Paused checks wake up to return as cancelled
+        self._resumed.set()
+    
+    def pause(self):
+        """Hold checks that have not started yet"""
+        if not self.cancelled:
+            self._resumed.clear()
+            self.flush(final=True)
+    
+    def resume(self):
+        """Let held checks start"""
+        self._resumed.set()
+        self.flush(final=True)
+    
+    def wait(self):
+        """Block while paused, False once the run is cancelled"""
+        self._resumed.wait()
+        return not self.cancelled
+    
+    async def wait_async(self):
+        """wait() for event loop checkers"""
+        while not self._resumed.is_set():
+            await asyncio.sleep(self.interval)
+        return not self.cancelled
+    
+    def run(self):
+        """Check every account, one provider after another; returns all results"""
+        self.started_at = time.monotonic()
+        by_provider = {}
+        for account in self.db.get_accounts_by_ids(self.account_ids):
+            by_provider.setdefault(account.provider, []).append(account)
+        # Accounts deleted since they were selected are not checked
+        self.total = sum(len(accounts) for accounts in by_provider.values())
+        
+        results = []
+        for provider, accounts in by_provider.items():
+            if self.cancelled:
+                break
+            try:
+                if self.engine is not None:
+                    results.extend(self.engine.check(
+                        provider, [account.id for account in accounts], self.depth, self.force,
+                        self.add_result, run=self
+                    ))
+                    continue
+                checker = create_checker(provider, self.db, self.proxy_url, self.depth)
+                if checker is None:
+                    print(f"⚠️ No checker for {provider}, skipped {len(accounts)} accounts")
+                    continue
+                checker.check_run = self
+                results.extend(checker.check_accounts(accounts, self.add_result, self.force))
+            except Exception as e:
+                print(f"❌ Error checking {provider} accounts: {e}")
+        
+        if self.cancelled:
+            # Accounts the run stopped before reaching end up cancelled too
+            with self._lock:
+                done = sum(self.counts[key] for key in ('checked', 'deferred', 'cancelled'))
+                self.counts['cancelled'] += max(0, self.total - done)
+        self.finished = True
+        self.flush(final=True)
+        return results
+    
+    def add_result(self, result):
+        """on_result callback of the checkers: count, buffer and maybe emit"""
+        with self._lock:
+            self._pending.append(result)
+            if result.get('cancelled'):
+                self.counts['cancelled'] += 1
+            elif result.get('deferred'):
+                self.counts['deferred'] += 1
+            else:
+                self.counts['checked'] += 1
+                if result.get('cached'):
+                    self.counts['cached'] += 1
+                if result.get('check_result') == RESULT_FAILED:
+                    self.counts['failed'] += 1
+            due = time.monotonic() - self._emitted_at >= self.interval
+        if due:
+            self.flush()
+    
+    def flush(self, final=False):
+        """Hand buffered results and progress to the callbacks, at most every interval
+        unless final"""
+        with self._emit_lock:
+            with self._lock:
+                now = time.monotonic()
+                if not final and now - self._emitted_at < self.interval:
+                    return
+                self._emitted_at = now
+                batch, self._pending = self._pending, []
+                progress = self._progress(now)
+            if batch and self.on_results:
+                self.on_results(batch)
+            if self.on_progress:
+                self.on_progress(progress)
+    
+    def get_progress(self):
+        """Totals so far"""
+        with self._lock:
+            return self._progress(time.monotonic())
+    
+    def _progress(self, now):
+        """get_progress body (call with lock held)"""
+        elapsed = now - self.started_at if self.started_at else 0.0
+        done = sum(self.counts[key] for key in ('checked', 'deferred', 'cancelled'))
+        return dict(
+            self.counts, total=self.total, done=done, remaining=max(0, self.total - done),
+            state=self.state,
+            elapsed=round(elapsed, 1), rate=round(self.counts['checked'] / elapsed, 1) if elapsed else 0.0,
+        )
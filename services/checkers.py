@@ -0,0 +1,64 @@
+"""
+Provider name -> checker class
+Imports are lazy so provider SDKs only load when that provider is checked
+"""
+
+from services.base_checker import DEPTH_QUICK
+from services.circuit_breaker import get_circuit_breakers
+from services.coalescer import get_coalescer
+from services.concurrency import LANE_INTERACTIVE, get_concurrency_limiter
+from services.rate_limiter import get_rate_limiter
+from services.response_cache import get_response_cache
+from services.result_cache import get_result_cache
+
+# Provider name -> section under cloud_providers in config.yaml
+CONFIG_KEYS = {
+    "AWS": "aws",
+    "DigitalOcean": "digitalocean",
+    "Linode": "linode",
+    "Azure": "azure",
+}
+
+def get_checker_class(provider):
+    """Get the checker class for a provider, None if it has no checker"""
+    if provider == "AWS":
+        from services.aws_checker import AWSChecker
+        return AWSChecker
+    if provider == "DigitalOcean":
+        from services.digitalocean_checker import DigitalOceanChecker
+        return DigitalOceanChecker
+    if provider == "Linode":
+        from services.linode_checker import LinodeChecker
+        return LinodeChecker
+    if provider == "Azure":
+        from services.azure_checker import AzureChecker
+        return AzureChecker
+    return None
+
+def create_checker(provider, db_manager, proxy_url=None, depth=DEPTH_QUICK, lane=LANE_INTERACTIVE):
+    """Create a checker with the provider's options from config.yaml, None if disabled"""
+    config = db_manager.config.get('cloud_providers', {}).get(CONFIG_KEYS.get(provider), {}) or {}
+    if not config.get('enabled', True):
+        return None
+    
+    checker_class = get_checker_class(provider)
+    if checker_class is None:
+        return None
+    
+    # Everything but 'enabled' is passed through, e.g. api_url, max_workers
+    options = {key: value for key, value in config.items() if key != 'enabled'}
+    rate_limiter = get_rate_limiter(db_manager.config.get('rate_limits'))
+    checker = checker_class(db_manager, proxy_url=proxy_url, rate_limiter=rate_limiter, **options)
+    checker.depth = depth
+    checker.lane = lane
+    
+    # max_workers stays the hard ceiling, the adaptive limit moves below it
+    checker.concurrency = get_concurrency_limiter(
+        provider, db_manager.config.get('concurrency'), ceiling=checker.max_workers
+    )
+    checker.circuits = get_circuit_breakers(db_manager.config.get('circuit_breaker'))
+    checker.cache = get_result_cache(db_manager)
+    checker.coalescer = get_coalescer()
+    if hasattr(checker, 'responses'):
+        checker.responses = get_response_cache(db_manager.config.get('response_cache'))
+    return checker
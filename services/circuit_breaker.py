@@ -0,0 +1,146 @@
+"""
+Circuit breakers per (provider, endpoint, proxy)
+Checks against a failing endpoint or proxy exit are deferred instead of timing out
+"""
+
+import threading
+import time
+from collections import deque
+
+# Defaults, overridable under circuit_breaker in config.yaml
+DEFAULT_CIRCUIT_SETTINGS = {
+    'window_seconds': 30,    # Rolling window of request outcomes
+    'min_requests': 10,      # Outcomes needed before the circuit can open
+    'failure_rate': 0.5,     # Failure share in the window that opens the circuit
+    'open_seconds': 30,      # How long an open circuit rejects checks before a probe
+}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Closed -> open on a high rolling failure rate, half-open lets one probe through"""
+    
+    def __init__(self, key, settings=None, clock=time.time):
+        self.key = key
+        self.clock = clock
+        self.settings = dict(DEFAULT_CIRCUIT_SETTINGS, **(settings or {}))
+        self.state = CLOSED
+        self.outcomes = deque()    # (time, failed)
+        self.opened_at = 0.0
+        self.probe_started = None
+        self.opened_count = 0
+        self._lock = threading.Lock()
+    
+    def retry_at(self):
+        """Epoch time checks may resume, None if they may run now"""
+        with self._lock:
+            return self._retry_at(self.clock())
+    
+    def _retry_at(self, now):
+        """retry_at body (call with lock held)"""
+        open_seconds = self.settings['open_seconds']
+        if self.state == OPEN and now < self.opened_at + open_seconds:
+            return self.opened_at + open_seconds
+        # A probe that never reported back (e.g. the check failed before any request) expires
+        if self.state == HALF_OPEN and self.probe_started and now < self.probe_started + open_seconds:
+            return self.probe_started + open_seconds
+        return None
+    
+    def allow(self):
+        """Admit a check, returns retry_at instead when it must be deferred"""
+        with self._lock:
+            now = self.clock()
+            retry_at = self._retry_at(now)
+            if retry_at:
+                return retry_at
+            if self.state != CLOSED:
+                # Open period is over: this check is the probe
+                self.state = HALF_OPEN
+                self.probe_started = now
+            return None
+    
+    def record(self, failed):
+        """Record a request outcome: connection errors, timeouts and 5xx are failures"""
+        with self._lock:
+            now = self.clock()
+            if self.state == HALF_OPEN:
+                if failed:
+                    self._open(now)
+                else:
+                    self.state = CLOSED
+                    self.outcomes.clear()
+                    self.probe_started = None
+                return
+            if self.state == OPEN:
+                return
+            
+            self.outcomes.append((now, failed))
+            while self.outcomes and self.outcomes[0][0] < now - self.settings['window_seconds']:
+                self.outcomes.popleft()
+            if len(self.outcomes) >= self.settings['min_requests']:
+                failures = sum(1 for _, f in self.outcomes if f)
+                if failures / len(self.outcomes) >= self.settings['failure_rate']:
+                    self._open(now)
+    
+    def _open(self, now):
+        """Switch to open (call with lock held)"""
+        self.state = OPEN
+        self.opened_at = now
+        self.probe_started = None
+        self.outcomes.clear()
+        self.opened_count += 1
+        print(f"⚡ Circuit open for {self.settings['open_seconds']}s: {' | '.join(map(str, self.key))}")
+
+class CircuitBreakers:
+    """Registry of breakers keyed by (provider, endpoint, proxy)"""
+    
+    def __init__(self, settings=None, clock=time.time):
+        self.settings = settings or {}
+        self.clock = clock
+        self._breakers = {}
+        self._lock = threading.Lock()
+    
+    def get(self, provider, endpoint, proxy_url=None):
+        """Get or create the breaker of an endpoint"""
+        key = (provider, endpoint, proxy_url or 'direct')
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(key, CircuitBreaker(key, self.settings, self.clock))
+        return breaker
+    
+    def retry_at(self, provider, endpoints, proxy_url=None):
+        """Epoch time a check using these endpoints may run, None if it may run now"""
+        retry_times = [self.get(provider, endpoint, proxy_url).retry_at() for endpoint in endpoints]
+        retry_times = [t for t in retry_times if t]
+        return max(retry_times) if retry_times else None
+    
+    def allow(self, provider, endpoints, proxy_url=None):
+        """Admit a check using these endpoints, returns retry_at when any circuit is open"""
+        # Look first so a deferred check does not take a half-open probe slot
+        retry_at = self.retry_at(provider, endpoints, proxy_url)
+        if retry_at:
+            return retry_at
+        
+        breakers = [self.get(provider, endpoint, proxy_url) for endpoint in endpoints]
+        retry_times = [t for t in (breaker.allow() for breaker in breakers) if t]
+        return max(retry_times) if retry_times else None
+    
+    def get_stats(self):
+        """State of every circuit that is not closed"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {' | '.join(map(str, b.key)): b.state for b in breakers if b.state != CLOSED}
+
+_shared_breakers = None
+_shared_lock = threading.Lock()
+
+def get_circuit_breakers(settings=None):
+    """Process-wide registry shared by every checker, built from the first settings given"""
+    global _shared_breakers
+    with _shared_lock:
+        if _shared_breakers is None:
+            _shared_breakers = CircuitBreakers(settings)
+        return _shared_breakers
@@ -0,0 +1,70 @@
+"""
+In-flight check coalescing for Cloud Account Manager
+Checks of the same credential share one future, so rows imported twice or
+checked from two places at once cost one set of API calls
+"""
+
+import threading
+from concurrent.futures import Future, InvalidStateError
+
+class LeaderReleased(Exception):
+    """The leading check was held back by its paused or cancelled run; joiners
+    retry and one of them leads instead"""
+
+class Coalescer:
+    """Credential key -> future of the check in flight for it"""
+    
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.led = 0
+        self.joined = 0
+    
+    def join(self, key):
+        """(future, True) when the caller must run the check, (future, False) to wait on it"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.joined += 1
+                return future, False
+            future = Future()
+            # Running futures cannot be cancelled, so a cancelled joiner's
+            # wrap_future leaves the check of everyone else alone
+            future.set_running_or_notify_cancel()
+            self._inflight[key] = future
+            self.led += 1
+            return future, True
+    
+    def finish(self, key, future, result=None, error=None):
+        """Publish the leader's result (or error) to everyone who joined"""
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            # Already finished, e.g. released before the leader's error came up
+            pass
+    
+    def release(self, key, future):
+        """Give up leading without a result, everyone who joined retries"""
+        self.finish(key, future, error=LeaderReleased())
+    
+    def get_stats(self):
+        """Checks run and checks that joined one in flight"""
+        with self._lock:
+            return {'in_flight': len(self._inflight), 'led': self.led, 'joined': self.joined}
+
+_shared_coalescer = None
+_shared_lock = threading.Lock()
+
+def get_coalescer():
+    """Process-wide coalescer shared by every checker"""
+    global _shared_coalescer
+    with _shared_lock:
+        if _shared_coalescer is None:
+            _shared_coalescer = Coalescer()
+        return _shared_coalescer
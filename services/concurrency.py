@@ -0,0 +1,233 @@
+"""
+Adaptive (AIMD) concurrency limits for checker workers
+Grows in-flight checks while providers stay fast, halves them on overload
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+
+# Defaults, overridable under concurrency in config.yaml
+DEFAULT_CONCURRENCY_SETTINGS = {
+    'initial_limit': 8,
+    'min_limit': 2,
+    'max_limit': 64,              # Also capped by the checker's max_workers
+    'increase': 1,                # Added after each healthy window
+    'decrease_factor': 0.5,       # Applied on timeouts, 429 and 5xx
+    'decrease_cooldown': 1.0,     # Seconds between two cuts, one burst cuts once
+    'window': 20,                 # Checks per increase decision
+    'target_p95_seconds': 5.0,
+    'max_error_rate': 0.1,
+    'interactive_reserve': 0.25,  # Share of the limit background checks leave free
+}
+
+# Check outcomes reported back to the limiter
+OUTCOME_OK = "ok"              # Provider answered (even if the account is bad)
+OUTCOME_ERROR = "error"        # Connection errors and other failures
+OUTCOME_OVERLOAD = "overload"  # Timeouts, 429 and 5xx
+
+# Priority lanes: checks a user asked for go before scheduled ones
+LANE_INTERACTIVE = "interactive"
+LANE_BACKGROUND = "background"
+
+class AdaptiveLimiter:
+    """AIMD limit on in-flight checks, usable from threads and event loops"""
+    
+    def __init__(self, name, settings=None, clock=time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.settings = dict(DEFAULT_CONCURRENCY_SETTINGS, **(settings or {}))
+        self.limit = float(min(max(self.settings['initial_limit'], self.settings['min_limit']),
+                               self.settings['max_limit']))
+        self.in_flight = 0
+        self.samples = []          # (latency, outcome) of the current window
+        self.last_p95 = 0.0
+        self.last_error_rate = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self.interactive_waiting = 0
+        self._cond = threading.Condition()
+        self._async_waiters = {LANE_INTERACTIVE: deque(), LANE_BACKGROUND: deque()}
+    
+    def capacity(self, lane):
+        """Slots a lane may fill, background checks leave the interactive reserve free"""
+        limit = int(self.limit)
+        if lane == LANE_INTERACTIVE:
+            return limit
+        return max(1, limit - math.ceil(limit * self.settings['interactive_reserve']))
+    
+    def _can_start(self, lane):
+        """Free slot for the lane and no interactive check queued ahead (call with lock held)"""
+        if self.in_flight >= self.capacity(lane):
+            return False
+        return lane == LANE_INTERACTIVE or self.interactive_waiting == 0
+    
+    def acquire(self, lane=LANE_INTERACTIVE):
+        """Block until a check may start"""
+        with self._cond:
+            if lane == LANE_INTERACTIVE:
+                self.interactive_waiting += 1
+            try:
+                while not self._can_start(lane):
+                    self._cond.wait()
+            finally:
+                if lane == LANE_INTERACTIVE:
+                    self.interactive_waiting -= 1
+            self.in_flight += 1
+            if lane == LANE_INTERACTIVE and not self.interactive_waiting:
+                # Background checks may have been held back by this one
+                self._wake()
+    
+    async def acquire_async(self, lane=LANE_INTERACTIVE):
+        """Wait on the event loop until a check may start"""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if lane == LANE_INTERACTIVE:
+                self.interactive_waiting += 1
+        try:
+            while True:
+                with self._cond:
+                    if self._can_start(lane):
+                        self.in_flight += 1
+                        return
+                    waiter = loop.create_future()
+                    self._async_waiters[lane].append((loop, waiter))
+                try:
+                    await waiter
+                except asyncio.CancelledError:
+                    with self._cond:
+                        try:
+                            self._async_waiters[lane].remove((loop, waiter))
+                        except ValueError:
+                            # Already woken for a free slot, pass the wake-up on
+                            self._wake()
+                    raise
+        finally:
+            if lane == LANE_INTERACTIVE:
+                with self._cond:
+                    self.interactive_waiting -= 1
+                    # Background checks may have been held back by this one
+                    self._wake()
+    
+    def release(self, latency, outcome):
+        """Finish a check and adapt the limit from its latency and outcome"""
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == OUTCOME_OVERLOAD:
+                self._decrease()
+            else:
+                self.samples.append((latency, outcome))
+                if len(self.samples) >= self.settings['window']:
+                    self._evaluate_window()
+            self._wake()
+    
+    def cancel(self):
+        """Give back a slot whose check never ran"""
+        with self._cond:
+            self.in_flight -= 1
+            self._wake()
+    
+    def _evaluate_window(self):
+        """Additive increase when the window was fast and clean (call with lock held)"""
+        latencies = sorted(latency for latency, _ in self.samples)
+        errors = sum(1 for _, outcome in self.samples if outcome == OUTCOME_ERROR)
+        self.last_p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        self.last_error_rate = errors / len(self.samples)
+        self.samples = []
+        
+        if self.last_error_rate > self.settings['max_error_rate']:
+            self._decrease()
+        elif self.last_p95 <= self.settings['target_p95_seconds']:
+            if self.limit < self.settings['max_limit']:
+                self.limit = min(self.settings['max_limit'], self.limit + self.settings['increase'])
+                self.increases += 1
+        # Slow but error free: hold the current limit
+    
+    def _decrease(self):
+        """Multiplicative decrease, at most once per cooldown (call with lock held)"""
+        now = self.clock()
+        if now - self._last_decrease < self.settings['decrease_cooldown']:
+            return
+        self._last_decrease = now
+        self.limit = max(self.settings['min_limit'], self.limit * self.settings['decrease_factor'])
+        self.samples = []
+        self.decreases += 1
+    
+    def _wake(self):
+        """Wake waiters for the free slots, interactive ones first (call with lock held)"""
+        free = int(self.limit) - self.in_flight
+        if free <= 0:
+            return
+        # Threads recheck their lane's condition themselves
+        self._cond.notify_all()
+        
+        waiters = self._async_waiters[LANE_INTERACTIVE]
+        while free > 0 and waiters:
+            if self._notify(*waiters.popleft()):
+                free -= 1
+        
+        free = min(free, self.capacity(LANE_BACKGROUND) - self.in_flight)
+        waiters = self._async_waiters[LANE_BACKGROUND]
+        while free > 0 and waiters and not self.interactive_waiting:
+            if self._notify(*waiters.popleft()):
+                free -= 1
+    
+    def _notify(self, loop, waiter):
+        """Schedule an async waiter's wake-up, False for one that is gone: cancelled, or
+        its event loop closed"""
+        if waiter.done() or loop.is_closed():
+            return False
+        try:
+            loop.call_soon_threadsafe(self._resolve, waiter)
+        except RuntimeError:
+            # The loop closed since the check above
+            return False
+        return True
+    
+    @staticmethod
+    def _resolve(waiter):
+        """Complete an async waiter on its own loop"""
+        if not waiter.done():
+            waiter.set_result(None)
+    
+    def get_stats(self):
+        """Current limit and the signals behind it"""
+        with self._cond:
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'interactive_waiting': self.interactive_waiting,
+                'p95_seconds': round(self.last_p95, 3),
+                'error_rate': round(self.last_error_rate, 3),
+                'increases': self.increases,
+                'decreases': self.decreases,
+            }
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_concurrency_limiter(provider, settings=None, ceiling=None):
+    """Process-wide limiter of a provider, built from the first settings given"""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            settings = settings or {}
+            provider_settings = dict(
+                {k: v for k, v in settings.items() if k != 'providers'},
+                **((settings.get('providers') or {}).get(provider) or {})
+            )
+            if ceiling:
+                provider_settings['max_limit'] = min(
+                    provider_settings.get('max_limit', DEFAULT_CONCURRENCY_SETTINGS['max_limit']), ceiling
+                )
+            limiter = _limiters[provider] = AdaptiveLimiter(provider, provider_settings)
+        return limiter
+
+def get_concurrency_stats():
+    """Metric: current concurrency limit and signals per provider"""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {provider: limiter.get_stats() for provider, limiter in limiters.items()}
@@ -0,0 +1,54 @@
+"""
+DigitalOcean account checker
+Reads account status and droplet usage with the account's API token
+"""
+
+import asyncio
+from services.async_checker import AsyncChecker
+from services.base_checker import (
+    CheckError, DEPTH_LIVENESS, RESULT_SUCCESS, RESULT_FAILED, RESULT_WARNING
+)
+
+DO_API_URL = "https://api.digitalocean.com"
+
+# Account status from /v2/account -> check_result
+STATUS_RESULTS = {
+    "active": RESULT_SUCCESS,
+    "warning": RESULT_WARNING,
+    "locked": RESULT_FAILED,
+}
+
+class DigitalOceanChecker(AsyncChecker):
+    """Checker for DigitalOcean accounts, uses the account's api_key as token"""
+    
+    provider = "DigitalOcean"
+    api_url = DO_API_URL
+    
+    def credential_key(self, account):
+        """The API token"""
+        return account.api_key or None
+    
+    async def check_account_async(self, session, account):
+        """Read account status, plus droplet usage unless this is a liveness check"""
+        if not account.api_key:
+            raise CheckError("API token is missing")
+        
+        headers = {"Authorization": f"Bearer {account.api_key}"}
+        if self.depth == DEPTH_LIVENESS:
+            account_data = await self.get_json(session, "/v2/account", headers, credential=account.api_key)
+            droplets_data = None
+        else:
+            account_data, droplets_data = await asyncio.gather(
+                self.get_json(session, "/v2/account", headers, credential=account.api_key),
+                self.get_json(session, "/v2/droplets", headers, params={"per_page": "1"},
+                              credential=account.api_key)
+            )
+        
+        info = account_data.get("account", {})
+        result = {'check_result': STATUS_RESULTS.get(info.get("status"), RESULT_WARNING)}
+        if droplets_data is not None:
+            droplets = droplets_data.get("meta", {}).get("total", 0)
+            result['limits'] = f"{droplets}/{info.get('droplet_limit', '?')} droplets"
+        if info.get("status_message"):
+            result['error'] = info["status_message"]
+        return result
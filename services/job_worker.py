@@ -0,0 +1,169 @@
+"""
+Headless check worker for Cloud Account Manager
+Claims jobs from the check_jobs queue in batches and runs them; start one per
+machine (or several) against a shared database:
+
+    python -m services.job_worker enqueue --depth full --provider AWS
+    python -m services.job_worker work --batch-size 100
+    python -m services.job_worker stats
+"""
+
+import argparse
+import random
+import signal
+import threading
+import time
+from datetime import datetime, timezone
+from database.database import DatabaseManager
+from database.job_queue import default_owner
+from services.base_checker import DEPTHS, DEPTH_QUICK
+from services.checkers import CONFIG_KEYS, create_checker
+from services.concurrency import LANE_BACKGROUND
+
+# Seconds between prune runs of finished jobs
+PRUNE_INTERVAL = 600
+
+class JobWorker:
+    """Claim, check, complete loop of one worker"""
+    
+    def __init__(self, db_manager, owner=None, batch_size=100, providers=None, proxy_url=None,
+                 idle_seconds=5):
+        self.db = db_manager
+        self.owner = owner or default_owner()
+        self.batch_size = batch_size
+        self.providers = providers
+        self.proxy_url = proxy_url
+        self.idle_seconds = idle_seconds
+        self._checkers = {}  # (provider, depth) -> checker
+        self._stop = threading.Event()
+        self._held = set()   # Claimed job IDs not settled yet, their leases are renewed
+        self._held_lock = threading.Lock()
+        self.stats = {'claimed': 0, 'done': 0, 'released': 0, 'failed': 0}
+    
+    def stop(self):
+        """Finish the current batch, then return from run()"""
+        self._stop.set()
+    
+    def run(self):
+        """Work until stopped"""
+        print(f"👷 Worker {self.owner} started")
+        pruned_at = 0.0
+        while not self._stop.is_set():
+            if time.monotonic() - pruned_at > PRUNE_INTERVAL:
+                self.db.jobs.prune()
+                pruned_at = time.monotonic()
+            
+            if not self.run_batch():
+                # Spread idle polls so workers do not hit the database in lockstep
+                self._stop.wait(self.idle_seconds * random.uniform(0.5, 1.5))
+        print(f"👷 Worker {self.owner} stopped: {self.stats}")
+    
+    def run_batch(self):
+        """Claim and run one batch, returns the number of jobs claimed"""
+        jobs = self.db.jobs.claim(self.owner, self.batch_size, self.providers)
+        self.stats['claimed'] += len(jobs)
+        if not jobs:
+            return 0
+        
+        # Groups run one after another, later ones would outlive their lease without renewal
+        with self._held_lock:
+            self._held = {job.id for job in jobs}
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self.heartbeat, args=(finished,),
+                                     name="job-lease-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            groups = {}
+            for job in jobs:
+                groups.setdefault((job.provider, job.depth), []).append(job)
+            for (provider, depth), group in groups.items():
+                try:
+                    self.run_group(provider, depth, group)
+                finally:
+                    with self._held_lock:
+                        self._held.difference_update(job.id for job in group)
+        finally:
+            finished.set()
+            heartbeat.join()
+        return len(jobs)
+    
+    def heartbeat(self, finished):
+        """Renew the leases of unsettled jobs every third of the lease until finished is set"""
+        interval = self.db.jobs.settings['lease_seconds'] / 3
+        while not finished.wait(interval):
+            with self._held_lock:
+                job_ids = list(self._held)
+            if not job_ids:
+                continue
+            try:
+                self.db.jobs.extend(self.owner, job_ids)
+            except Exception as e:
+                print(f"⚠️ Could not renew {len(job_ids)} job leases: {e}")
+    
+    def run_group(self, provider, depth, jobs):
+        """Check one provider/depth group of claimed jobs and settle them"""
+        job_ids = {job.account_id: job.id for job in jobs}
+        try:
+            checker = self.get_checker(provider, depth)
+            if checker is None:
+                raise RuntimeError(f"No checker for {provider}")
+            accounts = self.db.get_accounts_by_ids(list(job_ids))
+            results = checker.check_accounts(accounts, force=True)
+        except Exception as e:
+            print(f"❌ {provider} {depth} batch failed: {e}")
+            self.stats['failed'] += self.db.jobs.fail(self.owner, list(job_ids.values()), e)
+            return
+        
+        # Open circuit: back in the queue when the circuit allows a probe
+        retry_at = {
+            job_ids.pop(result['id']): datetime.fromtimestamp(result['retry_at'], timezone.utc)
+            .replace(tzinfo=None)
+            for result in results if result.get('deferred')
+        }
+        self.db.jobs.release(self.owner, retry_at)
+        self.stats['released'] += len(retry_at)
+        # Accounts deleted since they were queued have no result and are done too
+        self.stats['done'] += self.db.jobs.complete(self.owner, list(job_ids.values()))
+    
+    def get_checker(self, provider, depth):
+        """Checker per provider and depth, kept so HTTP pools stay warm"""
+        key = (provider, depth)
+        if key not in self._checkers:
+            self._checkers[key] = create_checker(provider, self.db, self.proxy_url, depth, LANE_BACKGROUND)
+        return self._checkers[key]
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Cloud Account Manager check job worker")
+    parser.add_argument("--config", default="config.yaml", help="Path to config.yaml")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    enqueue = commands.add_parser("enqueue", help="Queue a check of every live account")
+    enqueue.add_argument("--depth", choices=DEPTHS, default=DEPTH_QUICK)
+    enqueue.add_argument("--provider", choices=list(CONFIG_KEYS))
+    
+    work = commands.add_parser("work", help="Claim and run jobs until stopped")
+    work.add_argument("--batch-size", type=int, default=100)
+    work.add_argument("--provider", action="append", choices=list(CONFIG_KEYS),
+                      help="Only claim jobs of this provider (repeatable)")
+    work.add_argument("--owner", help="Lease owner name (default host:pid)")
+    work.add_argument("--proxy", help="Proxy URL for checker requests (http:// or https://)")
+    
+    commands.add_parser("stats", help="Job counts by status")
+    args = parser.parse_args()
+    
+    db = DatabaseManager(args.config)
+    if args.command == "enqueue":
+        print(f"📥 Queued {db.jobs.enqueue(args.depth, args.provider)} {args.depth} checks")
+    elif args.command == "stats":
+        for status, count in db.jobs.get_stats().items():
+            print(f"{status:>8}: {count}")
+    else:
+        worker = JobWorker(db, args.owner, args.batch_size, args.provider, args.proxy)
+        # SIGTERM/Ctrl+C finish the batch in hand; unfinished leases would expire anyway
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+        signal.signal(signal.SIGINT, lambda *_: worker.stop())
+        worker.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Linode account checker
+Reads profile, account balance and running instances with the account's API token
+"""
+
+import asyncio
+import json
+from services.async_checker import AsyncChecker
+from services.base_checker import CheckError, DEPTH_LIVENESS, RESULT_SUCCESS, RESULT_WARNING
+
+LINODE_API_URL = "https://api.linode.com"
+
+# Largest page the API allows, one page covers almost every account
+MAX_PAGE_SIZE = 500
+
+# Server-side filter so only instances that count against usage are returned
+RUNNING_FILTER = json.dumps({"status": "running"})
+
+class LinodeChecker(AsyncChecker):
+    """Checker for Linode accounts"""
+    
+    provider = "Linode"
+    api_url = LINODE_API_URL
+    
+    def credential_key(self, account):
+        """The API token"""
+        return account.api_key or None
+    
+    async def check_account_async(self, session, account):
+        """Fetch profile, account and the first instances page in one round trip"""
+        if not account.api_key:
+            raise CheckError("API token is missing")
+        
+        headers = {"Authorization": f"Bearer {account.api_key}"}
+        if self.depth == DEPTH_LIVENESS:
+            # The token works if its profile can be read
+            profile = await self.get_json(session, "/v4/profile", headers, credential=account.api_key)
+            return self.profile_result(profile, {'check_result': RESULT_SUCCESS})
+        
+        profile, info, instances = await asyncio.gather(
+            self.get_json(session, "/v4/profile", headers, credential=account.api_key),
+            self.get_json(session, "/v4/account", headers, credential=account.api_key),
+            self.get_instances_page(session, account.api_key, headers, 1)
+        )
+        
+        # Only accounts with more than MAX_PAGE_SIZE running instances need more pages
+        pages = await asyncio.gather(*[
+            self.get_instances_page(session, account.api_key, headers, page)
+            for page in range(2, instances.get("pages", 1) + 1)
+        ])
+        
+        running = list(instances.get("data", []))
+        for page in pages:
+            running.extend(page.get("data", []))
+        vcpus = sum(instance.get("specs", {}).get("vcpus", 0) for instance in running)
+        
+        result = {
+            'check_result': RESULT_SUCCESS,
+            'quota_used': vcpus,
+            'limits': f"{len(running)} running linodes, {vcpus} vCPUs",
+        }
+        if info.get("balance", 0) > 0:
+            result['check_result'] = RESULT_WARNING
+            result['error'] = f"Outstanding balance ${info['balance']}"
+        return self.profile_result(profile, result)
+    
+    def profile_result(self, profile, result):
+        """Downgrade a result to Warning when the token belongs to a restricted user"""
+        if profile.get("restricted"):
+            result['check_result'] = RESULT_WARNING
+            result['error'] = "Token belongs to a restricted user"
+        return result
+    
+    async def get_instances_page(self, session, token, headers, page):
+        """One page of running instances"""
+        return await self.get_json(
+            session, "/v4/linode/instances",
+            dict(headers, **{"X-Filter": RUNNING_FILTER}),
+            params={"page": str(page), "page_size": str(MAX_PAGE_SIZE)}, credential=token
+        )
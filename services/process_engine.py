@@ -0,0 +1,354 @@
+"""
+Process-pool check engine for Cloud Account Manager
+Runs provider checkers in worker processes, so HTTP, TLS and JSON work never
+competes with the GUI for the GIL; results stream back over a queue
+"""
+
+import contextlib
+import itertools
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+from collections import deque
+from database.change_feed import UPDATED
+from services.base_checker import DEPTH_QUICK
+from services.concurrency import LANE_INTERACTIVE, LANE_BACKGROUND
+
+# Defaults, overridable under check_engine in config.yaml
+DEFAULT_ENGINE_SETTINGS = {
+    'mode': 'thread',        # 'process' runs checks in worker processes
+    'processes': 0,          # 0: one per CPU core, leaving one core for the GUI
+    'chunk_size': 250,       # Accounts handed to a worker at once
+    'shutdown_seconds': 10,  # Grace period for running chunks on stop
+    'interactive_workers': 1,  # Workers background chunks leave free for Check Selected
+    'provider_weights': {},  # Share of workers per provider when all are busy, default 1
+}
+
+# Worker -> parent messages: (kind, worker slot, job id, payload)
+MSG_START = "start"     # payload: None
+MSG_RESULT = "result"   # payload: result dict
+MSG_DONE = "done"       # payload: account IDs of the chunk
+MSG_ERROR = "error"     # payload: message
+
+def _worker_main(slot, config_path, proxy_url, processes, tasks, results):
+    """Worker process body: own DB connection and checkers, one chunk at a time"""
+    # Ctrl+C is handled by the parent, which stops workers through the task queue
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    from database.database import DatabaseManager
+    from services.checkers import create_checker
+    from services.rate_limiter import get_rate_limiter
+    
+    if proxy_url and proxy_url.startswith("socks"):
+        from services.proxy_settings import load_proxy_settings, setup_socks_proxy
+        setup_socks_proxy(load_proxy_settings())
+    
+    db = DatabaseManager(config_path)
+    # Every worker gets an equal share of the provider and proxy request rates
+    get_rate_limiter(db.config.get('rate_limits')).scale(1.0 / processes)
+    
+    checkers = {}  # (provider, depth) -> checker, keeps HTTP pools warm between chunks
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id, provider, depth, account_ids, force = task
+        results.put((MSG_START, slot, job_id, None))
+        try:
+            if (provider, depth) not in checkers:
+                checkers[(provider, depth)] = create_checker(provider, db, proxy_url, depth)
+            checker = checkers[(provider, depth)]
+            if checker is None:
+                results.put((MSG_ERROR, slot, job_id, f"No checker for {provider}"))
+            else:
+                checker.check_accounts(
+                    db.get_accounts_by_ids(account_ids),
+                    lambda result: results.put((MSG_RESULT, slot, job_id, result)), force
+                )
+        except Exception as e:
+            results.put((MSG_ERROR, slot, job_id, f"{provider}: {type(e).__name__}: {e}"))
+        results.put((MSG_DONE, slot, job_id, account_ids))
+    
+    db.engine.dispose()
+
+@contextlib.contextmanager
+def _main_script_hidden():
+    """Spawned processes re-run the __main__ script unless it is hidden, and main.py
+    would start a second GUI"""
+    main_module = sys.modules['__main__']
+    main_path = getattr(main_module, '__file__', None)
+    if main_path is not None:
+        del main_module.__file__
+    try:
+        yield
+    finally:
+        if main_path is not None:
+            main_module.__file__ = main_path
+
+class ProcessCheckEngine:
+    """Pool of checker processes; chunks wait in per-lane, per-provider queues in this
+    process and go to a worker only once one is idle"""
+    
+    def __init__(self, db_manager, config_path='config.yaml', proxy_url=None, settings=None):
+        self.db = db_manager
+        self.config_path = os.path.abspath(config_path)
+        self.proxy_url = proxy_url
+        
+        if settings is None:
+            settings = db_manager.config.get('check_engine') or {}
+        self.settings = dict(DEFAULT_ENGINE_SETTINGS, **settings)
+        self.processes = self.settings['processes'] or max(1, (os.cpu_count() or 2) - 1)
+        # A single worker cannot be reserved, it still finishes one chunk at a time
+        self.background_workers = max(1, self.processes - self.settings['interactive_workers'])
+        
+        # spawn, never fork: the GUI process has Qt and DB threads running
+        self._context = multiprocessing.get_context("spawn")
+        self._tasks = None
+        self._results = None
+        self._workers = []
+        self._running = {}        # worker slot -> job id of the chunk it works on
+        self._jobs = {}           # job id -> queue.Queue of (kind, payload)
+        self._job_lanes = {}      # job id -> lane
+        self._backlog = {LANE_INTERACTIVE: {}, LANE_BACKGROUND: {}}  # lane -> provider -> deque of tasks
+        self._served = {}         # (lane, provider) -> chunks dispatched / weight
+        self._dispatched = {LANE_INTERACTIVE: 0, LANE_BACKGROUND: 0}  # Chunks on workers per lane
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._collector = None
+        self._stopping = threading.Event()
+    
+    def start(self):
+        """Start the worker processes and the result collector thread"""
+        if self._workers:
+            return
+        
+        self._stopping.clear()
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        self._workers = [None] * self.processes
+        for slot in range(self.processes):
+            self._start_worker(slot)
+        
+        self._collector = threading.Thread(target=self._collect_loop, name="check-engine-collector",
+                                           daemon=True)
+        self._collector.start()
+        print(f"⚙️ Check engine started with {self.processes} worker processes")
+    
+    def _start_worker(self, slot):
+        """(Re)start the worker process of a slot"""
+        process = self._context.Process(
+            target=_worker_main, name=f"check-worker-{slot}", daemon=True,
+            args=(slot, self.config_path, self.proxy_url, self.processes, self._tasks, self._results)
+        )
+        with _main_script_hidden():
+            process.start()
+        self._workers[slot] = process
+    
+    def stop(self):
+        """Let running chunks finish, then stop the workers; queued chunks are dropped"""
+        if not self._workers:
+            return
+        
+        self._stopping.set()
+        # Drop queued chunks so every worker reaches its stop sentinel quickly
+        with self._lock:
+            for providers in self._backlog.values():
+                providers.clear()
+        try:
+            while True:
+                self._tasks.get_nowait()
+        except queue.Empty:
+            pass
+        for _ in self._workers:
+            self._tasks.put(None)
+        
+        for process in self._workers:
+            process.join(timeout=self.settings['shutdown_seconds'])
+        for process in self._workers:
+            if process.is_alive():
+                print(f"⚠️ {process.name} did not stop in time, terminating")
+                process.terminate()
+                process.join(timeout=5)
+        
+        if self._collector:
+            self._collector.join(timeout=5)
+        # Callers still waiting get whatever was collected
+        with self._lock:
+            for job in self._jobs.values():
+                job.put((MSG_ERROR, "Check engine stopped"))
+                job.put(("stopped", None))
+        
+        self._tasks.close()
+        self._results.close()
+        self._workers = []
+        self._running = {}
+        self._dispatched = {LANE_INTERACTIVE: 0, LANE_BACKGROUND: 0}
+        print("⚙️ Check engine stopped")
+    
+    def check(self, provider, account_ids, depth=DEPTH_QUICK, force=False, on_result=None,
+              lane=LANE_INTERACTIVE, run=None):
+        """Check accounts in the worker processes, blocks until every result is back
+        
+        A CheckRun passed as run holds back chunks not yet started while it is paused
+        and drops them once it is cancelled; chunks on a worker always finish.
+        """
+        if not self._workers:
+            raise RuntimeError("Check engine is not running")
+        
+        account_ids = list(account_ids)
+        chunk_size = self.settings['chunk_size']
+        chunks = [account_ids[i:i + chunk_size] for i in range(0, len(account_ids), chunk_size)]
+        
+        job_id = next(self._job_ids)
+        job = queue.Queue()
+        with self._lock:
+            self._jobs[job_id] = job
+            self._job_lanes[job_id] = lane
+            backlog = self._backlog[lane].get(provider)
+            if not backlog:
+                # A provider coming back starts level with the busiest one, no saved-up credit
+                active = [self._served[(lane, p)] for p, tasks in self._backlog[lane].items() if tasks]
+                served = self._served.get((lane, provider), 0.0)
+                self._served[(lane, provider)] = max([served] + active) if active else served
+                backlog = self._backlog[lane][provider] = deque()
+            backlog.extend((job_id, provider, depth, chunk, force) for chunk in chunks)
+            self._dispatch()
+        try:
+            results = []
+            remaining = len(chunks)
+            held = []  # Chunks taken back from the backlog while the run is paused
+            while remaining:
+                if run is not None:
+                    if run.cancelled:
+                        remaining -= len(held) + len(self._withdraw(lane, provider, job_id))
+                        held = []
+                        if not remaining:
+                            break
+                    elif run.paused:
+                        held.extend(self._withdraw(lane, provider, job_id))
+                    elif held:
+                        self._requeue(lane, provider, held)
+                        held = []
+                try:
+                    kind, payload = job.get(timeout=run.interval if run is not None else None)
+                except queue.Empty:
+                    continue
+                
+                if kind == MSG_RESULT:
+                    results.append(payload)
+                    if on_result:
+                        on_result(payload)
+                elif kind == MSG_DONE:
+                    remaining -= 1
+                elif kind == MSG_ERROR:
+                    print(f"❌ Check engine: {payload}")
+                else:
+                    break
+            return results
+        finally:
+            # Chunks never dispatched, e.g. on_result raised
+            self._withdraw(lane, provider, job_id)
+            with self._lock:
+                self._jobs.pop(job_id, None)
+                self._job_lanes.pop(job_id, None)
+    
+    def _withdraw(self, lane, provider, job_id):
+        """Take a job's chunks that are not on a worker yet out of the backlog"""
+        with self._lock:
+            backlog = self._backlog[lane].get(provider)
+            if not backlog:
+                return []
+            taken = [task for task in backlog if task[0] == job_id]
+            if taken:
+                self._backlog[lane][provider] = deque(task for task in backlog if task[0] != job_id)
+            return taken
+    
+    def _requeue(self, lane, provider, tasks):
+        """Put withdrawn chunks back at the front of their backlog"""
+        with self._lock:
+            self._backlog[lane].setdefault(provider, deque()).extendleft(reversed(tasks))
+            self._dispatch()
+    
+    def _dispatch(self):
+        """Hand queued chunks to idle workers, interactive first and providers by weight
+        (call with lock held)"""
+        while sum(self._dispatched.values()) < self.processes and not self._stopping.is_set():
+            for lane in (LANE_INTERACTIVE, LANE_BACKGROUND):
+                if lane == LANE_BACKGROUND and self._dispatched[lane] >= self.background_workers:
+                    continue
+                waiting = [provider for provider, tasks in self._backlog[lane].items() if tasks]
+                if waiting:
+                    break
+            else:
+                return
+            
+            # Least served provider relative to its weight goes next
+            provider = min(waiting, key=lambda p: self._served[(lane, p)])
+            weight = self.settings['provider_weights'].get(provider, 1)
+            self._served[(lane, provider)] += 1.0 / weight
+            self._dispatched[lane] += 1
+            self._tasks.put(self._backlog[lane][provider].popleft())
+    
+    def _chunk_finished(self, job_id):
+        """Free the chunk's worker for the next queued chunk"""
+        with self._lock:
+            lane = self._job_lanes.get(job_id)
+            if lane is not None and self._dispatched[lane] > 0:
+                self._dispatched[lane] -= 1
+            self._dispatch()
+    
+    def _collect_loop(self):
+        """Collector body: route worker messages to the waiting jobs"""
+        while True:
+            try:
+                kind, slot, job_id, payload = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                self._replace_dead_workers()
+                continue
+            except (EOFError, OSError):
+                return
+            
+            if kind == MSG_START:
+                self._running[slot] = job_id
+                continue
+            if kind == MSG_DONE:
+                self._running.pop(slot, None)
+                self._chunk_finished(job_id)
+                # Workers wrote to the DB through their own connection, tell this process
+                self.db.changes.emit(UPDATED, payload)
+            
+            with self._lock:
+                job = self._jobs.get(job_id)
+            if job is not None:
+                job.put((kind, payload))
+    
+    def _replace_dead_workers(self):
+        """Restart crashed workers; the chunk a worker was on is reported as failed"""
+        for slot, process in enumerate(self._workers):
+            if process.is_alive() or self._stopping.is_set():
+                continue
+            job_id = self._running.pop(slot, None)
+            print(f"⚠️ {process.name} exited with code {process.exitcode}, restarting")
+            self._chunk_finished(job_id)
+            with self._lock:
+                job = self._jobs.get(job_id)
+            if job is not None:
+                job.put((MSG_ERROR, f"{process.name} exited with code {process.exitcode}"))
+                job.put((MSG_DONE, []))
+            self._start_worker(slot)
+    
+    def get_stats(self):
+        """Worker and job counts"""
+        return {
+            'processes': self.processes,
+            'alive': sum(1 for process in self._workers if process.is_alive()),
+            'busy': len(self._running),
+            'jobs': len(self._jobs),
+            'queued': {lane: sum(len(tasks) for tasks in providers.values())
+                       for lane, providers in self._backlog.items()},
+        }
@@ -6,12 +6,10 @@ Handles SOCKS5 proxy connections for cloud account checking
 import requests
 import time
 import json
-import os
-import socket
-import socks
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from PyQt6.QtCore import QObject, pyqtSignal
+from services import proxy_settings
 
 class ProxyService(QObject):
     """Service for managing proxy connections"""
@@ -20,34 +18,13 @@ class ProxyService(QObject):
     
     def __init__(self):
         super().__init__()
-        self.settings_file = os.path.join("config", "proxy_settings.json")
+        self.settings_file = proxy_settings.SETTINGS_FILE
         self.proxy_settings = self.load_settings()
         self.session = None
         
     def load_settings(self):
         """Load proxy settings from file"""
-        default_settings = {
-            'enabled': False,
-            'host': '74.81.81.81',
-            'port': '10000',
-            'username': '26a928403f27ed635073__cr.ar,au,at,bd,ba,bg;sessttl.5',
-            'password': '860de985d1795b42',
-            'change_ip_url': '',
-            'proxy_type': 'socks5'
-        }
-        
-        try:
-            # Create config directory if not exists
-            os.makedirs("config", exist_ok=True)
-            
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    loaded_settings = json.load(f)
-                    default_settings.update(loaded_settings)
-        except Exception as e:
-            print(f"Error loading proxy settings: {e}")
-        
-        return default_settings
+        return proxy_settings.load_proxy_settings(self.settings_file)
     
     def save_settings(self):
         """Save proxy settings to file"""
@@ -67,19 +44,10 @@ class ProxyService(QObject):
         
     def get_proxy_dict(self):
         """Get proxy dictionary for requests library"""
-        if not self.proxy_settings['enabled'] or not self.proxy_settings['host']:
+        proxy_url = self.get_proxy_for_boto3()
+        if not proxy_url:
             return None
         
-        proxy_type = self.proxy_settings.get('proxy_type', 'socks5').lower()
-        host = self.proxy_settings['host']
-        port = self.proxy_settings['port']
-        
-        # Construct proxy URL
-        if self.proxy_settings['username'] and self.proxy_settings['password']:
-            proxy_url = f"{proxy_type}://{self.proxy_settings['username']}:{self.proxy_settings['password']}@{host}:{port}"
-        else:
-            proxy_url = f"{proxy_type}://{host}:{port}"
-        
         return {
             'http': proxy_url,
             'https': proxy_url
@@ -87,17 +55,11 @@ class ProxyService(QObject):
     
     def get_proxy_for_boto3(self):
         """Get proxy URL for boto3 (AWS SDK)"""
-        if not self.proxy_settings['enabled'] or not self.proxy_settings['host']:
-            return None
-        
-        proxy_type = self.proxy_settings.get('proxy_type', 'socks5')
-        host = self.proxy_settings['host']
-        port = self.proxy_settings['port']
-        
-        if self.proxy_settings['username'] and self.proxy_settings['password']:
-            return f"{proxy_type}://{self.proxy_settings['username']}:{self.proxy_settings['password']}@{host}:{port}"
-        else:
-            return f"{proxy_type}://{host}:{port}"
+        return proxy_settings.proxy_url(self.proxy_settings)
+    
+    def get_checker_proxy_url(self):
+        """Get proxy URL for account checkers, SOCKS5 is also applied at socket level"""
+        return proxy_settings.get_checker_proxy_url(self.proxy_settings)
     
     def get_session(self):
         """Get or create requests session with proxy"""
@@ -135,19 +97,7 @@ class ProxyService(QObject):
     
     def setup_socks_proxy(self):
         """Setup SOCKS5 proxy at socket level"""
-        try:
-            socks.set_default_proxy(
-                socks.SOCKS5,
-                self.proxy_settings['host'],
-                int(self.proxy_settings['port']),
-                username=self.proxy_settings.get('username'),
-                password=self.proxy_settings.get('password')
-            )
-            socket.socket = socks.socksocket
-            return True
-        except Exception as e:
-            print(f"Error setting up SOCKS proxy: {e}")
-            return False
+        return proxy_settings.setup_socks_proxy(self.proxy_settings)
     
     def test_connection(self):
         """Test proxy connection"""
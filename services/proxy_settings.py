@@ -0,0 +1,76 @@
+"""
+Proxy settings for Cloud Account Manager
+Reads config/proxy_settings.json and builds checker proxy URLs without Qt,
+so headless tools and worker processes share the GUI's proxy setup
+"""
+
+import json
+import os
+import socket
+
+SETTINGS_FILE = os.path.join("config", "proxy_settings.json")
+
+DEFAULT_PROXY_SETTINGS = {
+    'enabled': False,
+    'host': '74.81.81.81',
+    'port': '10000',
+    'username': '26a928403f27ed635073__cr.ar,au,at,bd,ba,bg;sessttl.5',
+    'password': '860de985d1795b42',
+    'change_ip_url': '',
+    'proxy_type': 'socks5'
+}
+
+def load_proxy_settings(settings_file=SETTINGS_FILE):
+    """Load proxy settings from file over the defaults"""
+    settings = dict(DEFAULT_PROXY_SETTINGS)
+    try:
+        # Create config directory if not exists
+        os.makedirs(os.path.dirname(settings_file) or ".", exist_ok=True)
+        
+        if os.path.exists(settings_file):
+            with open(settings_file, 'r', encoding='utf-8') as f:
+                settings.update(json.load(f))
+    except Exception as e:
+        print(f"Error loading proxy settings: {e}")
+    
+    return settings
+
+def proxy_url(settings):
+    """Proxy URL of the settings, None when the proxy is off"""
+    if not settings['enabled'] or not settings['host']:
+        return None
+    
+    proxy_type = settings.get('proxy_type', 'socks5').lower()
+    host = settings['host']
+    port = settings['port']
+    
+    if settings['username'] and settings['password']:
+        return f"{proxy_type}://{settings['username']}:{settings['password']}@{host}:{port}"
+    return f"{proxy_type}://{host}:{port}"
+
+def setup_socks_proxy(settings):
+    """Setup SOCKS5 proxy at socket level"""
+    try:
+        # PySocks is only needed when a SOCKS proxy is used
+        import socks
+        socks.set_default_proxy(
+            socks.SOCKS5,
+            settings['host'],
+            int(settings['port']),
+            username=settings.get('username'),
+            password=settings.get('password')
+        )
+        socket.socket = socks.socksocket
+        return True
+    except Exception as e:
+        print(f"Error setting up SOCKS proxy: {e}")
+        return False
+
+def get_checker_proxy_url(settings=None):
+    """Get proxy URL for account checkers, SOCKS5 is also applied at socket level"""
+    if settings is None:
+        settings = load_proxy_settings()
+    url = proxy_url(settings)
+    if url and url.startswith('socks'):
+        setup_socks_proxy(settings)
+    return url
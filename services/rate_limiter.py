@@ -0,0 +1,178 @@
+"""
+Token bucket rate limiting shared by all checker workers
+Buckets exist per provider, per credential and per proxy exit
+"""
+
+import asyncio
+import threading
+import time
+
+# Requests per second and burst sizes, overridable under rate_limits in config.yaml
+DEFAULT_RATE_LIMITS = {
+    # Per proxy exit (or the direct connection), across all providers
+    'proxy': {'rate': 50, 'burst': 100},
+    'providers': {
+        'AWS': {'rate': 50, 'burst': 100, 'credential_rate': 10, 'credential_burst': 20},
+        # 5000 requests/hour per token
+        'DigitalOcean': {'rate': 50, 'burst': 100, 'credential_rate': 1.3, 'credential_burst': 20},
+        # 800 requests/minute per token
+        'Linode': {'rate': 50, 'burst': 100, 'credential_rate': 10, 'credential_burst': 20},
+        # ARM: 12000 reads/hour per principal
+        'Azure': {'rate': 20, 'burst': 40, 'credential_rate': 3, 'credential_burst': 10},
+    },
+}
+
+# Wait after a 429 without a usable Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+# Seconds between sweeps dropping credential buckets that have refilled
+IDLE_SWEEP_SECONDS = 60.0
+
+def retry_after_seconds(headers):
+    """Seconds to wait after a 429, from Retry-After or a RateLimit-Reset epoch"""
+    try:
+        if headers.get('Retry-After'):
+            return max(0.0, float(headers['Retry-After']))
+        if headers.get('RateLimit-Reset'):
+            return max(0.0, float(headers['RateLimit-Reset']) - time.time())
+    except ValueError:
+        pass
+    return DEFAULT_RETRY_AFTER
+
+class TokenBucket:
+    """Thread-safe token bucket, callers reserve tokens and wait out any debt"""
+    
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = self.burst
+        self.clock = clock
+        self.updated = clock()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        """Add tokens for the time since the last update (call with lock held)"""
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def reserve(self, tokens=1):
+        """Take tokens now, returns seconds to wait before using them"""
+        with self._lock:
+            self._refill()
+            self.tokens -= tokens
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+    
+    def idle(self, now):
+        """True once the bucket has refilled completely, dropping it then loses nothing"""
+        with self._lock:
+            return self.updated + (self.burst - self.tokens) / self.rate <= now
+    
+    def pause(self, seconds):
+        """Empty the bucket so the next token is only available after seconds"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+class RateLimiter:
+    """Provider, credential and proxy buckets; a request needs a token from each"""
+    
+    def __init__(self, settings=None, clock=time.monotonic):
+        settings = settings or {}
+        self.clock = clock
+        self.proxy_limits = dict(DEFAULT_RATE_LIMITS['proxy'], **(settings.get('proxy') or {}))
+        self.provider_limits = {}
+        providers = settings.get('providers') or {}
+        for provider in set(DEFAULT_RATE_LIMITS['providers']) | set(providers):
+            self.provider_limits[provider] = dict(DEFAULT_RATE_LIMITS['providers'].get(provider, {}),
+                                                  **(providers.get(provider) or {}))
+        
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._swept = clock()
+    
+    def scale(self, factor):
+        """Multiply the provider-wide and proxy rates and bursts, e.g. to split them between
+        worker processes; credential limits stay, a credential's requests come from the
+        worker checking its account
+        """
+        with self._lock:
+            for limits in [self.proxy_limits, *self.provider_limits.values()]:
+                for key in ('rate', 'burst'):
+                    if limits.get(key):
+                        # A bucket must still hold at least one whole token
+                        value = limits[key] * factor
+                        limits[key] = max(1.0, value) if key == 'burst' else value
+            self._buckets.clear()
+    
+    def _bucket(self, key, rate, burst):
+        """Get or create a bucket, None when the limit is disabled (rate 0 or missing)"""
+        if not rate:
+            return None
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                self._evict_idle()
+                bucket = self._buckets.setdefault(key, TokenBucket(rate, burst or rate, self.clock))
+        return bucket
+    
+    def _evict_idle(self):
+        """Drop full credential buckets every IDLE_SWEEP_SECONDS (call with lock held)"""
+        now = self.clock()
+        if now - self._swept < IDLE_SWEEP_SECONDS:
+            return
+        self._swept = now
+        for key in [key for key, bucket in self._buckets.items()
+                    if key[0] == 'credential' and bucket.idle(now)]:
+            del self._buckets[key]
+    
+    def _buckets_for(self, provider, credential, proxy_url):
+        """Buckets a request by this provider, credential and proxy draws from"""
+        limits = self.provider_limits.get(provider, {})
+        buckets = [
+            self._bucket(('provider', provider), limits.get('rate'), limits.get('burst')),
+            self._bucket(('proxy', proxy_url or 'direct'),
+                         self.proxy_limits.get('rate'), self.proxy_limits.get('burst')),
+        ]
+        if credential:
+            buckets.append(self._bucket(('credential', provider, credential),
+                                        limits.get('credential_rate'), limits.get('credential_burst')))
+        return [bucket for bucket in buckets if bucket is not None]
+    
+    def reserve(self, provider, credential=None, proxy_url=None):
+        """Take a token from every bucket, returns seconds to wait"""
+        return max([bucket.reserve() for bucket in self._buckets_for(provider, credential, proxy_url)] or [0.0])
+    
+    def acquire(self, provider, credential=None, proxy_url=None):
+        """Block until a request may be sent"""
+        wait = self.reserve(provider, credential, proxy_url)
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self, provider, credential=None, proxy_url=None):
+        """Wait on the event loop until a request may be sent"""
+        wait = self.reserve(provider, credential, proxy_url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def backoff(self, provider, credential=None, seconds=DEFAULT_RETRY_AFTER):
+        """Hold back a credential (or the whole provider) after a 429"""
+        limits = self.provider_limits.get(provider, {})
+        if credential:
+            bucket = self._bucket(('credential', provider, credential),
+                                  limits.get('credential_rate'), limits.get('credential_burst'))
+        else:
+            bucket = self._bucket(('provider', provider), limits.get('rate'), limits.get('burst'))
+        if bucket is not None:
+            bucket.pause(seconds)
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+def get_rate_limiter(settings=None):
+    """Process-wide limiter shared by every checker, built from the first settings given"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(settings)
+        return _shared_limiter
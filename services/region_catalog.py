@@ -0,0 +1,84 @@
+"""
+AWS region catalog for Cloud Account Manager
+Remembers the regions enabled for each access key in a JSON file, so full checks
+only call DescribeRegions once per TTL
+"""
+
+import json
+import os
+import threading
+import time
+
+# Under the project root like the database file, whatever the working directory
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CATALOG_FILE = os.path.join(PROJECT_ROOT, "config", "aws_regions.json")
+DEFAULT_CATALOG_TTL = 86400
+
+# Writes are batched, at most one file rewrite per this many seconds
+SAVE_INTERVAL = 5
+
+class RegionCatalog:
+    """access key -> enabled region codes, expiring after ttl seconds"""
+    
+    def __init__(self, path=DEFAULT_CATALOG_FILE, ttl=DEFAULT_CATALOG_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = self.load()   # access_key -> {'fetched_at': epoch, 'regions': [...]}
+        self._dirty = False
+        self._saved_at = 0.0
+    
+    def load(self):
+        """Read the catalog file, empty when missing or unreadable"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Error loading region catalog: {e}")
+        return {}
+    
+    def get(self, access_key, fetch):
+        """Regions of an access key, calling fetch() when unknown or older than the TTL"""
+        with self._lock:
+            entry = self._entries.get(access_key)
+        if entry and time.time() - entry['fetched_at'] < self.ttl:
+            return entry['regions']
+        
+        regions = fetch()
+        with self._lock:
+            self._entries[access_key] = {'fetched_at': time.time(), 'regions': regions}
+            self._dirty = True
+            if time.time() - self._saved_at >= SAVE_INTERVAL:
+                self._save()
+        return regions
+    
+    def flush(self):
+        """Write pending changes to disk"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+    
+    def _save(self):
+        """Atomically rewrite the catalog file (call with lock held)"""
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(temp_path, self.path)
+            self._dirty = False
+            self._saved_at = time.time()
+        except Exception as e:
+            print(f"⚠️ Error saving region catalog: {e}")
+
+_shared_catalog = None
+_shared_lock = threading.Lock()
+
+def get_region_catalog(path=DEFAULT_CATALOG_FILE, ttl=DEFAULT_CATALOG_TTL):
+    """Process-wide catalog, the first caller's path and TTL win"""
+    global _shared_catalog
+    with _shared_lock:
+        if _shared_catalog is None:
+            _shared_catalog = RegionCatalog(path, ttl)
+        return _shared_catalog
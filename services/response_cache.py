@@ -0,0 +1,91 @@
+"""
+Validators of provider API responses
+Repeat requests carry If-None-Match / If-Modified-Since; a 304 reuses the payload
+parsed the last time instead of downloading and decoding it again
+"""
+
+import threading
+from collections import OrderedDict
+
+# Defaults, overridable under response_cache in config.yaml
+DEFAULT_RESPONSE_CACHE_SETTINGS = {
+    'enabled': True,
+    'max_entries': 20000,
+}
+
+class ResponseCache:
+    """Parsed payloads keyed by (credential, URL), kept with their ETag and Last-Modified
+    
+    Payloads are shared between checks, callers must not modify them.
+    """
+    
+    def __init__(self, settings=None):
+        self.settings = dict(DEFAULT_RESPONSE_CACHE_SETTINGS, **(settings or {}))
+        self._entries = OrderedDict()   # (credential, url) -> (etag, last_modified, payload)
+        self._lock = threading.Lock()
+        self.revalidated = 0
+        self.downloaded = 0
+    
+    def conditional_headers(self, credential, url):
+        """If-None-Match / If-Modified-Since for a request, empty when nothing is cached"""
+        with self._lock:
+            entry = self._entries.get((credential, url))
+        if entry is None:
+            return {}
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+    
+    def not_modified(self, credential, url):
+        """Payload of a 304 answer, None when it was evicted since the request went out"""
+        with self._lock:
+            key = (credential, url)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.revalidated += 1
+            return entry[2]
+    
+    def put(self, credential, url, response_headers, payload):
+        """Keep a 200 payload if the response has a validator to revalidate it with"""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        with self._lock:
+            self.downloaded += 1
+            key = (credential, url)
+            if not etag and not last_modified:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = (etag, last_modified, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.settings['max_entries']:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self):
+        """Counters since start"""
+        with self._lock:
+            return {'entries': len(self._entries), 'revalidated': self.revalidated,
+                    'downloaded': self.downloaded}
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_response_cache(settings=None):
+    """Process-wide cache shared by every checker, None when disabled in settings"""
+    global _shared_cache
+    if not (settings or {}).get('enabled', True):
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(settings)
+        return _shared_cache
@@ -0,0 +1,101 @@
+"""
+Short-lived cache of check results
+Repeated checks of the same account within the TTL are answered without network I/O
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from database.change_feed import UPDATED, DELETED, RESTORED, PURGED
+
+# Defaults, overridable under result_cache in config.yaml
+DEFAULT_RESULT_CACHE_SETTINGS = {
+    'enabled': True,
+    'default_ttl_seconds': 300,
+    'ttl_seconds': {         # Per provider
+        'AWS': 300,
+        'DigitalOcean': 300,
+        'Linode': 300,
+        'Azure': 600,
+    },
+    'max_entries': 50000,
+}
+
+class ResultCache:
+    """Check results keyed by (account id, check depth), expiring after a per-provider TTL"""
+    
+    def __init__(self, settings=None):
+        settings = settings or {}
+        self.settings = dict(DEFAULT_RESULT_CACHE_SETTINGS, **settings)
+        self.settings['ttl_seconds'] = dict(DEFAULT_RESULT_CACHE_SETTINGS['ttl_seconds'],
+                                            **(settings.get('ttl_seconds') or {}))
+        self._entries = OrderedDict()   # (account_id, depth) -> (expires, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def ttl(self, provider):
+        """TTL in seconds for a provider's results"""
+        return self.settings['ttl_seconds'].get(provider, self.settings['default_ttl_seconds'])
+    
+    def get(self, account_id, depths):
+        """Copy of a fresh cached result at any of depths, None on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            for depth in depths:
+                key = (account_id, depth)
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] < now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            self.misses += 1
+            return None
+    
+    def put(self, result, depth, provider):
+        """Cache a result until the provider's TTL runs out"""
+        ttl = self.ttl(provider)
+        if not self.settings['enabled'] or ttl <= 0:
+            return
+        with self._lock:
+            key = (result['id'], depth)
+            self._entries[key] = (time.monotonic() + ttl, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.settings['max_entries']:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, account_ids=None):
+        """Drop entries of accounts (all entries when account_ids is None)"""
+        with self._lock:
+            if account_ids is None:
+                self._entries.clear()
+                return
+            account_ids = set(account_ids)
+            for key in [key for key in self._entries if key[0] in account_ids]:
+                del self._entries[key]
+    
+    def on_change(self, kind, account_ids):
+        """Edited, deleted and restored accounts must be checked again"""
+        if kind in (UPDATED, DELETED, RESTORED, PURGED):
+            self.invalidate(account_ids)
+    
+    def get_stats(self):
+        """Counters since start"""
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_result_cache(db_manager):
+    """Process-wide cache, subscribed to the database's change feed"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResultCache(db_manager.config.get('result_cache'))
+            db_manager.changes.subscribe(_shared_cache.on_change)
+        return _shared_cache
@@ -0,0 +1,313 @@
+"""
+Background check scheduler for Cloud Account Manager
+Keeps every account in a per-provider min-heap keyed by its next due time
+Healthy accounts get frequent one-call liveness checks and a rare full check
+"""
+
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from sqlalchemy import select
+from models.account import Account
+from database.change_feed import CREATED, UPDATED, DELETED, RESTORED, PURGED
+from services.base_checker import DEPTH_LIVENESS, DEPTH_FULL
+from services.checkers import CONFIG_KEYS, create_checker
+from services.circuit_breaker import get_circuit_breakers
+from services.concurrency import LANE_BACKGROUND, get_concurrency_stats
+from services.response_cache import get_response_cache
+from utils.batching import chunked
+
+# Defaults, overridable under scheduler in config.yaml
+DEFAULT_SCHEDULER_SETTINGS = {
+    'enabled': False,
+    'batch_size': 50,        # Due accounts handed to a provider's checker at once
+    'max_batches': 4,        # Batches of a provider in flight, refilled as each one finishes
+    'batch_timeout': 300,    # Seconds before a batch's accounts are rescheduled without it
+    'idle_seconds': 5,       # Longest sleep while nothing is due
+    'jitter': 0.1,           # Due times are spread by +-10% of the interval
+    'intervals': {           # Seconds between liveness checks of a healthy account
+        'AWS': 3600,
+        'DigitalOcean': 3600,
+        'Linode': 3600,
+        'Azure': 21600,
+    },
+    'full_intervals': {      # Seconds between full checks (limits, all regions)
+        'AWS': 86400,
+        'DigitalOcean': 86400,
+        'Linode': 86400,
+        'Azure': 86400,
+    },
+}
+
+# check_result -> interval multiplier: warnings are rechecked sooner,
+# failed (usually dead) accounts less often
+RESULT_INTERVAL_FACTORS = {
+    'Success': 1.0,
+    'Warning': 0.5,
+    'Failed': 4.0,
+}
+
+def _timestamp(value):
+    """Naive UTC datetime (as stored in the DB) -> epoch seconds"""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+class CheckScheduler:
+    """Feeds due accounts to the provider checkers continuously"""
+    
+    def __init__(self, db_manager, proxy_url=None, settings=None, engine=None):
+        self.db = db_manager
+        self.proxy_url = proxy_url
+        # ProcessCheckEngine running the checks, None to check on this process's threads
+        self.engine = engine
+        
+        if settings is None:
+            settings = db_manager.config.get('scheduler') or {}
+        self.settings = dict(DEFAULT_SCHEDULER_SETTINGS)
+        self.settings.update(settings)
+        for key in ('intervals', 'full_intervals'):
+            self.settings[key] = dict(DEFAULT_SCHEDULER_SETTINGS[key], **(settings.get(key) or {}))
+        
+        self._heaps = {}      # provider -> [(due, account_id, depth)]
+        self._due = {}        # account_id -> due of its live heap entry, None while being checked
+        self._last_full = {}  # account_id -> last_full_check
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self.stats = {'dispatched': 0, 'checked': 0, 'full_checks': 0, 'deferred': 0, 'timed_out': 0}
+    
+    def start(self):
+        """Load all accounts and start one dispatcher thread per enabled provider"""
+        if self._threads:
+            return
+        
+        self._stop.clear()
+        self.load_accounts()
+        self.db.changes.subscribe(self.on_change)
+        
+        for provider in CONFIG_KEYS:
+            # Scheduled checks yield to ones a user is waiting for
+            checkers = {depth: create_checker(provider, self.db, self.proxy_url, depth, LANE_BACKGROUND)
+                        for depth in (DEPTH_LIVENESS, DEPTH_FULL)}
+            if None in checkers.values():
+                continue
+            thread = threading.Thread(target=self._dispatch_loop, args=(provider, checkers),
+                                      name=f"scheduler-{provider}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"⏱️ Check scheduler started for {len(self._threads)} providers")
+    
+    def stop(self):
+        """Stop dispatching, checks already running finish their batch"""
+        self._stop.set()
+        self.db.changes.unsubscribe(self.on_change)
+        for thread in self._threads:
+            thread.join(timeout=30)
+        self._threads = []
+    
+    def next_due(self, provider, last_check, check_result, last_full_check=None):
+        """(epoch time, depth) of an account's next check"""
+        interval = self.settings['intervals'].get(provider, 3600)
+        interval *= RESULT_INTERVAL_FACTORS.get(check_result, 1.0)
+        liveness_due = self._due_after(last_check, interval)
+        
+        # Limits of a dead account are not worth reading
+        if check_result == 'Failed':
+            return liveness_due, DEPTH_LIVENESS
+        
+        full_due = self._due_after(last_full_check, self.settings['full_intervals'].get(provider, 86400))
+        if full_due <= liveness_due:
+            return full_due, DEPTH_FULL
+        return liveness_due, DEPTH_LIVENESS
+    
+    def _due_after(self, last, interval):
+        """Epoch time interval after last, with jitter"""
+        jitter = self.settings['jitter']
+        if last is None:
+            # Never done: due now, spread so a fresh import does not burst
+            return time.time() + random.uniform(0, jitter * interval)
+        return _timestamp(last) + interval * random.uniform(1 - jitter, 1 + jitter)
+    
+    def load_accounts(self, account_ids=None):
+        """(Re)schedule accounts from the DB, all live accounts when account_ids is None"""
+        columns = select(Account.id, Account.provider, Account.last_check, Account.check_result,
+                         Account.last_full_check)
+        with self.db.engine.connect() as conn:
+            if account_ids is None:
+                rows = conn.execute(columns.where(Account.deleted_at.is_(None))).all()
+            else:
+                rows = []
+                for chunk in chunked(account_ids):
+                    rows.extend(conn.execute(columns.where(
+                        Account.id.in_(chunk), Account.deleted_at.is_(None)
+                    )).all())
+        
+        with self._lock:
+            for account_id, provider, last_check, check_result, last_full_check in rows:
+                # Accounts being checked are rescheduled when their result comes back
+                if account_id in self._due and self._due[account_id] is None:
+                    continue
+                self._last_full[account_id] = last_full_check
+                self._push(account_id, provider,
+                           *self.next_due(provider, last_check, check_result, last_full_check))
+    
+    def on_change(self, kind, account_ids):
+        """Keep the heaps in step with account writes"""
+        if kind in (DELETED, PURGED):
+            with self._lock:
+                for account_id in account_ids or []:
+                    self._due.pop(account_id, None)
+                    self._last_full.pop(account_id, None)
+        elif kind in (CREATED, UPDATED, RESTORED):
+            if account_ids is not None:
+                with self._lock:
+                    account_ids = [i for i in account_ids if self._due.get(i, 0) is not None]
+                if not account_ids:
+                    return
+            self.load_accounts(account_ids)
+    
+    def _push(self, account_id, provider, due, depth):
+        """Add a heap entry, older entries of the account become stale (call with lock held)"""
+        self._due[account_id] = due
+        heapq.heappush(self._heaps.setdefault(provider, []), (due, account_id, depth))
+    
+    def _pop_due(self, provider, limit):
+        """Pop up to limit due accounts, returns ({depth: [ids]}, due time of the next entry)"""
+        now = time.time()
+        batch = {}
+        popped = 0
+        with self._lock:
+            heap = self._heaps.get(provider, [])
+            while heap and popped < limit:
+                due, account_id, depth = heap[0]
+                if self._due.get(account_id) != due:
+                    heapq.heappop(heap)  # Stale: rescheduled or deleted since
+                    continue
+                if due > now:
+                    return batch, due
+                heapq.heappop(heap)
+                self._due[account_id] = None
+                batch.setdefault(depth, []).append(account_id)
+                popped += 1
+        return batch, None
+    
+    def _dispatch_loop(self, provider, checkers):
+        """Dispatcher body: keep up to max_batches batches of due accounts in flight until stopped
+        
+        A batch that outlives batch_timeout no longer holds a slot; its accounts are
+        rescheduled and the thread running it is left to finish on its own.
+        """
+        max_batches = self.settings['max_batches']
+        timeout = self.settings['batch_timeout']
+        # Spare threads for batches given up on, so they do not queue new ones
+        pool = ThreadPoolExecutor(max_workers=max_batches * 2, thread_name_prefix=f"scheduler-{provider}")
+        running = {}  # future -> (depth, account_ids, deadline)
+        try:
+            while not self._stop.is_set():
+                next_due = None
+                while len(running) < max_batches:
+                    batch, next_due = self._pop_due(provider, self.settings['batch_size'])
+                    if not batch:
+                        break
+                    for depth, account_ids in batch.items():
+                        self.stats['dispatched'] += len(account_ids)
+                        future = pool.submit(self._check_batch, provider, checkers, depth, account_ids)
+                        running[future] = (depth, account_ids, time.monotonic() + timeout)
+                
+                # Sleep until a batch finishes, one times out or the next account is due
+                wait_for = self.settings['idle_seconds']
+                if next_due is not None:
+                    wait_for = min(wait_for, max(0.0, next_due - time.time()))
+                if running:
+                    deadline = min(deadline for _, _, deadline in running.values())
+                    wait_for = min(wait_for, max(0.0, deadline - time.monotonic()))
+                    done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+                else:
+                    done = ()
+                    self._stop.wait(wait_for)
+                
+                for future in done:
+                    depth, account_ids, _ = running.pop(future)
+                    self._finish_batch(provider, depth, account_ids, future.result())
+                self._expire_batches(provider, running)
+            
+            # Batches already running finish, within their timeout
+            if running:
+                wait(running, timeout=max(0.0, max(d for _, _, d in running.values()) - time.monotonic()))
+                for future in [future for future in running if future.done()]:
+                    depth, account_ids, _ = running.pop(future)
+                    self._finish_batch(provider, depth, account_ids, future.result())
+        finally:
+            pool.shutdown(wait=False)
+    
+    def _check_batch(self, provider, checkers, depth, account_ids):
+        """Check one batch on a pool thread, returns {account_id: result}"""
+        try:
+            # Due accounts always get a fresh check
+            if self.engine is not None:
+                results = self.engine.check(provider, account_ids, depth, force=True,
+                                            lane=LANE_BACKGROUND)
+            else:
+                accounts = self.db.get_accounts_by_ids(account_ids)
+                results = checkers[depth].check_accounts(accounts, force=True)
+            return {result['id']: result for result in results}
+        except Exception as e:
+            print(f"❌ Scheduled {provider} {depth} check failed: {e}")
+            return {}
+    
+    def _finish_batch(self, provider, depth, account_ids, results):
+        """Count a finished batch and reschedule its accounts"""
+        deferred = sum(1 for result in results.values() if result.get('deferred'))
+        self.stats['checked'] += len(results) - deferred
+        self.stats['deferred'] += deferred
+        if depth == DEPTH_FULL:
+            self.stats['full_checks'] += len(results) - deferred
+        self._reschedule(provider, account_ids, results, depth)
+    
+    def _expire_batches(self, provider, running):
+        """Give up on batches past their deadline, their accounts are retried a timeout later"""
+        now = time.monotonic()
+        for future, (depth, account_ids, deadline) in list(running.items()):
+            if deadline > now:
+                continue
+            del running[future]
+            print(f"⚠️ Scheduled {provider} {depth} check of {len(account_ids)} accounts timed out")
+            self.stats['timed_out'] += len(account_ids)
+            retry_at = time.time() + self.settings['batch_timeout']
+            self._reschedule(provider, account_ids,
+                             {i: {'deferred': True, 'retry_at': retry_at} for i in account_ids}, depth)
+    
+    def _reschedule(self, provider, account_ids, results, depth):
+        """Push checked accounts back, keyed by the time of this check"""
+        now = datetime.utcnow()
+        with self._lock:
+            for account_id in account_ids:
+                # Deleted while being checked
+                if account_id not in self._due:
+                    continue
+                result = results.get(account_id, {})
+                if result.get('deferred'):
+                    # Open circuit: retry when it allows a probe, spread a little
+                    due = result['retry_at'] + random.uniform(0, self.settings['jitter'] * 60)
+                    self._push(account_id, provider, due, depth)
+                    continue
+                
+                if 'last_full_check' in result:
+                    self._last_full[account_id] = result['last_full_check']
+                self._push(account_id, provider, *self.next_due(
+                    provider, result.get('last_check', now), result.get('check_result'),
+                    self._last_full.get(account_id)
+                ))
+    
+    def get_stats(self):
+        """Queue sizes and counters"""
+        with self._lock:
+            in_flight = sum(1 for due in self._due.values() if due is None)
+            queued = len(self._due) - in_flight
+        responses = get_response_cache(self.db.config.get('response_cache'))
+        return dict(self.stats, queued=queued, in_flight=in_flight,
+                    concurrency=get_concurrency_stats(),
+                    open_circuits=get_circuit_breakers().get_stats(),
+                    responses=responses.get_stats() if responses else None)
@@ -0,0 +1,63 @@
+"""
+Shared fixtures: a fake clock and the provider stand-ins from mock_providers
+
+Tests marked load only run when selected: python -m pytest -m load
+"""
+
+import importlib
+import pytest
+
+# Per-credential and overall requests/s the stand-ins answer before sending 429s
+STAND_IN_KEY_RATE = 5
+STAND_IN_SERVER_RATE = 250
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "load: slow end-to-end load test, run with -m load")
+
+def pytest_collection_modifyitems(config, items):
+    if "load" in (config.getoption("markexpr") or ""):
+        return
+    skip = pytest.mark.skip(reason="load test, run with -m load")
+    for item in items:
+        if "load" in item.keywords:
+            item.add_marker(skip)
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when a test advances it"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def stand_in(name, *args):
+    """BackgroundServer running mock_providers.<name>, stopped at the end of the session"""
+    pytest.importorskip("aiohttp")
+    from mock_providers.server import BackgroundServer
+    app = importlib.import_module(f"mock_providers.{name}").create_app(*args)
+    with BackgroundServer(app) as server:
+        yield server
+
+@pytest.fixture(scope="session")
+def aws_stand_in():
+    yield from stand_in("aws", STAND_IN_KEY_RATE, STAND_IN_KEY_RATE * 2, STAND_IN_SERVER_RATE)
+
+@pytest.fixture(scope="session")
+def digitalocean_stand_in():
+    yield from stand_in("digitalocean", STAND_IN_KEY_RATE, STAND_IN_KEY_RATE * 2, STAND_IN_SERVER_RATE)
+
+@pytest.fixture(scope="session")
+def linode_stand_in():
+    yield from stand_in("linode", STAND_IN_KEY_RATE, STAND_IN_KEY_RATE * 2, STAND_IN_SERVER_RATE)
+
+@pytest.fixture(scope="session")
+def azure_stand_in():
+    yield from stand_in("azure")
@@ -0,0 +1,48 @@
+"""
+AzureChecker against the local Azure stand-in from mock_providers.azure
+"""
+
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from services.azure_checker import AzureChecker
+from services.base_checker import RESULT_FAILED, RESULT_SUCCESS, RESULT_WARNING
+
+@pytest.fixture(scope="module")
+def checker(azure_stand_in):
+    return AzureChecker(api_url=azure_stand_in.url, login_url=azure_stand_in.url)
+
+def check(checker, email, password="Passw0rd!"):
+    """Result of checking one account through the full check path"""
+    account = SimpleNamespace(id=1, provider="Azure", email=email, azure_password=password,
+                              check_result=None)
+    [result] = checker.check_accounts([account])
+    return result
+
+def test_pay_as_you_go(checker):
+    result = check(checker, "payg@example.com")
+    assert result['check_result'] == RESULT_SUCCESS
+    assert result['subscription'] == "Pay as You Go"
+
+def test_enabled_trial_wins_over_disabled_subscription(checker):
+    result = check(checker, "trial@example.com")
+    assert result['check_result'] == RESULT_SUCCESS
+    assert result['subscription'] == "Free Trial 200$"
+    assert result['limits'] == "2 subscriptions, Enabled"
+
+def test_mfa_required(checker):
+    result = check(checker, "mfa@example.com")
+    assert result['check_result'] == RESULT_WARNING
+    assert result['error'] == "Password valid, MFA required"
+
+def test_locked(checker):
+    result = check(checker, "locked@example.com")
+    assert result['check_result'] == RESULT_FAILED
+    assert result['error'] == "Account is locked"
+
+def test_bad_password(checker):
+    result = check(checker, "payg@example.com", "wrong")
+    assert result['check_result'] == RESULT_FAILED
+    assert result['error'] == "Invalid email or password"
@@ -0,0 +1,29 @@
+"""
+CheckRun progress against an in-memory database
+"""
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from database.database import DatabaseManager
+from services.check_run import CheckRun
+
+@pytest.fixture
+def db(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("database:\n  url: 'sqlite:///:memory:'\n  echo: false\n")
+    manager = DatabaseManager(str(config))
+    yield manager
+    manager.close()
+
+def test_cancel_counts_accounts_never_reached(db):
+    account_ids = db.save_accounts([{'provider': provider, 'email': f"{i}@example.com"}
+                                    for i, provider in enumerate(["DigitalOcean", "Linode"] * 3)])
+    progress = []
+    run = CheckRun(db, account_ids, on_progress=progress.append)
+    run.request_cancel()
+    assert run.run() == []
+
+    assert progress[-1]['state'] == "cancelled"
+    assert (progress[-1]['cancelled'], progress[-1]['remaining']) == (6, 0)
@@ -0,0 +1,77 @@
+"""
+CircuitBreaker state changes on an injected clock
+"""
+
+import pytest
+
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers
+
+SETTINGS = {'window_seconds': 30, 'min_requests': 4, 'failure_rate': 0.5, 'open_seconds': 30}
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(("Test", "api", "direct"), SETTINGS, clock=clock)
+
+def trip(breaker):
+    for _ in range(4):
+        breaker.record(failed=True)
+
+def test_opens_on_failure_rate_after_min_requests(breaker):
+    for failed in (True, True, True):
+        breaker.record(failed)
+    assert breaker.state == CLOSED
+    breaker.record(failed=False)
+    assert breaker.state == OPEN and breaker.opened_count == 1
+
+def test_old_outcomes_leave_the_window(breaker, clock):
+    breaker.record(failed=True)
+    breaker.record(failed=True)
+    clock.advance(31)
+    for failed in (True, False, False, False):
+        breaker.record(failed)
+    assert breaker.state == CLOSED
+
+def test_open_defers_until_probe_time(breaker, clock):
+    trip(breaker)
+    retry_at = clock() + 30
+    assert breaker.allow() == retry_at
+    clock.advance(29)
+    assert breaker.retry_at() == retry_at
+
+    clock.advance(1)
+    assert breaker.allow() is None
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert breaker.allow() == clock() + 30
+
+def test_successful_probe_closes(breaker, clock):
+    trip(breaker)
+    clock.advance(30)
+    breaker.allow()
+    breaker.record(failed=False)
+    assert breaker.state == CLOSED
+    assert breaker.allow() is None
+
+def test_failed_probe_reopens(breaker, clock):
+    trip(breaker)
+    clock.advance(30)
+    breaker.allow()
+    breaker.record(failed=True)
+    assert breaker.state == OPEN and breaker.opened_count == 2
+    assert breaker.allow() == clock() + 30
+
+def test_probe_that_never_reports_expires(breaker, clock):
+    trip(breaker)
+    clock.advance(30)
+    breaker.allow()
+    clock.advance(30)
+    assert breaker.allow() is None and breaker.state == HALF_OPEN
+
+def test_registry_defers_on_any_open_endpoint(clock):
+    breakers = CircuitBreakers(SETTINGS, clock=clock)
+    trip(breakers.get("Test", "login"))
+    assert breakers.allow("Test", ["api"]) is None
+    assert breakers.allow("Test", ["api", "login"]) == clock() + 30
+    # A proxy exit has circuits of its own
+    assert breakers.allow("Test", ["login"], "http://proxy:8080") is None
+    assert breakers.get_stats() == {"Test | login | direct": OPEN}
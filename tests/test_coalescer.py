@@ -0,0 +1,106 @@
+"""
+Coalescer futures and credential coalescing in BaseChecker.run_check
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+
+from services.base_checker import BaseChecker, RESULT_SUCCESS
+from services.coalescer import Coalescer, LeaderReleased
+
+def test_joiners_share_the_leaders_future():
+    coalescer = Coalescer()
+    future, leader = coalescer.join("key")
+    joined = [coalescer.join("key") for _ in range(3)]
+    assert leader and not any(is_leader for _, is_leader in joined)
+    assert all(other is future for other, _ in joined)
+
+    coalescer.finish("key", future, {'check_result': RESULT_SUCCESS})
+    assert [other.result(0) for other, _ in joined] == [{'check_result': RESULT_SUCCESS}] * 3
+    assert coalescer.get_stats() == {'in_flight': 0, 'led': 1, 'joined': 3}
+    # Finished keys start over with a new leader
+    assert coalescer.join("key")[1]
+
+def test_leaders_error_reaches_every_joiner():
+    coalescer = Coalescer()
+    future, _ = coalescer.join("key")
+    joined, _ = coalescer.join("key")
+    coalescer.finish("key", future, error=ValueError("boom"))
+    with pytest.raises(ValueError, match="boom"):
+        joined.result(0)
+
+def test_release_makes_joiners_retry():
+    coalescer = Coalescer()
+    future, _ = coalescer.join("key")
+    joined, _ = coalescer.join("key")
+    coalescer.release("key", future)
+    with pytest.raises(LeaderReleased):
+        joined.result(0)
+    # A late finish of the released leader is ignored
+    coalescer.finish("key", future, {'check_result': RESULT_SUCCESS})
+    assert coalescer.join("key")[1]
+
+def test_cancelled_async_joiner_leaves_the_check_alone():
+    coalescer = Coalescer()
+    future, _ = coalescer.join("key")
+
+    async def scenario():
+        waiter = asyncio.wrap_future(coalescer.join("key")[0])
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert not future.cancelled()
+    coalescer.finish("key", future, {'check_result': RESULT_SUCCESS})
+    assert future.result(0) == {'check_result': RESULT_SUCCESS}
+
+class SlowChecker(BaseChecker):
+    """Checks block until released, counting the calls that reach the provider"""
+
+    provider = "Test"
+
+    def __init__(self):
+        super().__init__()
+        self.coalescer = Coalescer()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def credential_key(self, account):
+        return account.token
+
+    def check_account(self, account):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return {'check_result': RESULT_SUCCESS}
+
+def test_rows_sharing_a_credential_are_checked_once():
+    checker = SlowChecker()
+    accounts = [SimpleNamespace(id=i, token="same", check_result=None) for i in (1, 2)]
+    results = {}
+
+    def run(account):
+        results[account.id] = checker.run_check(account)
+
+    leader = threading.Thread(target=run, args=(accounts[0],))
+    leader.start()
+    assert checker.started.wait(5)
+    follower = threading.Thread(target=run, args=(accounts[1],))
+    follower.start()
+    # Let the leader finish only once the follower waits on it
+    deadline = time.monotonic() + 5
+    while not checker.coalescer.get_stats()['joined'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    checker.release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert checker.calls == 1
+    assert results[1]['id'] == 1 and not results[1].get('coalesced')
+    assert results[2]['id'] == 2 and results[2]['coalesced']
+    assert results[2]['check_result'] == RESULT_SUCCESS
@@ -0,0 +1,110 @@
+"""
+AdaptiveLimiter AIMD steps and priority lanes on an injected clock
+"""
+
+import asyncio
+import threading
+import pytest
+
+from services.concurrency import (AdaptiveLimiter, LANE_BACKGROUND, LANE_INTERACTIVE, OUTCOME_ERROR,
+                                  OUTCOME_OK, OUTCOME_OVERLOAD)
+
+SETTINGS = {'initial_limit': 8, 'min_limit': 2, 'max_limit': 10, 'window': 4,
+            'target_p95_seconds': 1.0, 'max_error_rate': 0.25, 'decrease_cooldown': 1.0}
+
+@pytest.fixture
+def limiter(clock):
+    return AdaptiveLimiter("Test", SETTINGS, clock=clock)
+
+def run_window(limiter, latency=0.1, outcomes=(OUTCOME_OK,) * 4):
+    for outcome in outcomes:
+        limiter.acquire()
+        limiter.release(latency, outcome)
+
+def start(limiter, lane):
+    """Acquire on a thread, returns it once it had time to get a slot"""
+    thread = threading.Thread(target=limiter.acquire, args=(lane,), daemon=True)
+    thread.start()
+    thread.join(0.2)
+    return thread
+
+def test_fast_clean_window_adds_one(limiter):
+    run_window(limiter)
+    assert limiter.limit == 9
+    run_window(limiter)
+    run_window(limiter)
+    assert limiter.limit == 10
+
+def test_slow_window_holds(limiter):
+    run_window(limiter, latency=2.0)
+    assert limiter.limit == 8
+    assert limiter.get_stats()['p95_seconds'] == 2.0
+
+def test_error_window_halves(limiter):
+    run_window(limiter, outcomes=(OUTCOME_OK, OUTCOME_OK, OUTCOME_ERROR, OUTCOME_ERROR))
+    assert limiter.limit == 4
+
+def test_overload_halves_once_per_cooldown(limiter, clock):
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(0.1, OUTCOME_OVERLOAD)
+    assert limiter.limit == 4 and limiter.decreases == 1
+
+    clock.advance(1.0)
+    limiter.acquire()
+    limiter.release(0.1, OUTCOME_OVERLOAD)
+    assert limiter.limit == 2
+
+    clock.advance(1.0)
+    limiter.acquire()
+    limiter.release(0.1, OUTCOME_OVERLOAD)
+    assert limiter.limit == 2
+
+def test_background_leaves_interactive_reserve(limiter):
+    assert limiter.capacity(LANE_BACKGROUND) == 6
+    for _ in range(6):
+        limiter.acquire(LANE_BACKGROUND)
+
+    blocked = start(limiter, LANE_BACKGROUND)
+    assert blocked.is_alive()
+    assert not start(limiter, LANE_INTERACTIVE).is_alive()
+    assert limiter.in_flight == 7
+
+    # A freed slot goes to the waiting background check only below its capacity
+    limiter.release(0.1, OUTCOME_OK)
+    blocked.join(0.2)
+    assert blocked.is_alive()
+    limiter.release(0.1, OUTCOME_OK)
+    blocked.join(1)
+    assert not blocked.is_alive()
+
+def test_waiting_interactive_check_goes_first(limiter):
+    for _ in range(8):
+        limiter.acquire(LANE_INTERACTIVE)
+    background = start(limiter, LANE_BACKGROUND)
+    interactive = start(limiter, LANE_INTERACTIVE)
+
+    for _ in range(3):
+        limiter.release(0.1, OUTCOME_OK)
+    interactive.join(1)
+    assert not interactive.is_alive()
+    assert background.is_alive()
+    limiter.release(0.1, OUTCOME_OK)
+    background.join(1)
+    assert not background.is_alive()
+
+def test_cancelled_async_waiter_gives_slot_on():
+    limiter = AdaptiveLimiter("Test", dict(SETTINGS, initial_limit=2, min_limit=1))
+
+    async def scenario():
+        await limiter.acquire_async()
+        await limiter.acquire_async()
+        cancelled = asyncio.ensure_future(limiter.acquire_async())
+        waiting = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        limiter.release(0.1, OUTCOME_OK)
+        await asyncio.wait_for(waiting, 1)
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 2
@@ -0,0 +1,161 @@
+"""
+JobQueue leases and JobWorker heartbeats against an in-memory database
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import select, update
+from database.database import DatabaseManager
+from models.check_job import CheckJob, JOB_PENDING, JOB_LEASED, JOB_DONE, JOB_DEAD
+from services.job_worker import JobWorker
+
+@pytest.fixture
+def db(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("database:\n  url: 'sqlite:///:memory:'\n  echo: false\n"
+                      "job_queue:\n  max_attempts: 2\n  retry_seconds: 60\n")
+    manager = DatabaseManager(str(config))
+    yield manager
+    manager.close()
+
+def add_jobs(db, provider, count, depth="quick"):
+    """Seed count accounts of provider and queue a check of each"""
+    account_ids = db.save_accounts([{'provider': provider, 'email': f"{provider}{i}@example.com"}
+                                    for i in range(count)])
+    db.jobs.enqueue(depth, provider, account_ids)
+    return account_ids
+
+def set_jobs(db, **values):
+    """Overwrite columns of every job, e.g. to move a lease into the past"""
+    with db.engine.begin() as conn:
+        conn.execute(update(CheckJob).values(**values))
+
+def job_rows(db):
+    with db.engine.connect() as conn:
+        return {row.id: row for row in conn.execute(select(CheckJob)).all()}
+
+def past():
+    return datetime.utcnow() - timedelta(seconds=1)
+
+def test_enqueue_skips_accounts_with_an_open_job(db):
+    account_ids = add_jobs(db, "AWS", 3)
+    assert db.jobs.enqueue("quick", "AWS", account_ids) == 0
+    assert db.jobs.enqueue("full", "AWS", account_ids) == 3
+
+def test_interleaved_claims_never_share_a_job(db):
+    add_jobs(db, "AWS", 10)
+    first = db.jobs.claim("a", 4)
+    second = db.jobs.claim("b", 4)
+    third = db.jobs.claim("c", 4)
+    ids = [job.id for job in first + second + third]
+    assert (len(first), len(second), len(third)) == (4, 4, 2)
+    assert len(set(ids)) == 10
+    assert db.jobs.claim("d", 4) == []
+
+def test_providers_take_turns_in_a_claim(db):
+    add_jobs(db, "AWS", 5)
+    add_jobs(db, "DigitalOcean", 5)
+    providers = [job.provider for job in db.jobs.claim("a", 4)]
+    assert sorted(providers) == ["AWS", "AWS", "DigitalOcean", "DigitalOcean"]
+    assert {job.provider for job in db.jobs.claim("b", 10, providers=["AWS"])} == {"AWS"}
+
+def test_expired_lease_is_reclaimed_by_another_worker(db):
+    add_jobs(db, "AWS", 1)
+    [job] = db.jobs.claim("a", 10)
+    assert db.jobs.claim("b", 10) == []
+
+    set_jobs(db, lease_expires=past())
+    [reclaimed] = db.jobs.claim("b", 10)
+    assert reclaimed.id == job.id and reclaimed.attempts == 2
+    # The first worker lost the job with its lease
+    assert db.jobs.complete("a", [job.id]) == 0
+    assert db.jobs.extend("a", [job.id]) == 0
+    assert db.jobs.complete("b", [job.id]) == 1
+
+def test_extend_renews_only_the_owners_lease(db):
+    add_jobs(db, "AWS", 1)
+    [job] = db.jobs.claim("a", 10)
+    set_jobs(db, lease_expires=datetime.utcnow() + timedelta(seconds=1))
+
+    assert db.jobs.extend("b", [job.id]) == 0
+    assert db.jobs.extend("a", [job.id]) == 1
+    assert job_rows(db)[job.id].lease_expires > datetime.utcnow() + timedelta(seconds=200)
+
+def test_worker_heartbeat_keeps_held_jobs_leased(db):
+    db.jobs.settings['lease_seconds'] = 0.3
+    add_jobs(db, "AWS", 1)
+    worker = JobWorker(db, owner="a")
+    [job] = db.jobs.claim("a", 10)
+    worker._held = {job.id}
+
+    finished = threading.Event()
+    heartbeat = threading.Thread(target=worker.heartbeat, args=(finished,))
+    heartbeat.start()
+    try:
+        time.sleep(0.6)
+        assert db.jobs.claim("b", 10) == []
+    finally:
+        finished.set()
+        heartbeat.join()
+
+    time.sleep(0.4)
+    assert [reclaimed.id for reclaimed in db.jobs.claim("b", 10)] == [job.id]
+
+def test_failed_job_backs_off_then_dead_letters(db):
+    add_jobs(db, "AWS", 1)
+    [job] = db.jobs.claim("a", 10)
+    assert db.jobs.fail("a", [job.id], "boom") == 1
+    row = job_rows(db)[job.id]
+    assert row.status == JOB_PENDING and row.last_error == "boom"
+    assert row.available_at > datetime.utcnow() + timedelta(seconds=50)
+    assert db.jobs.claim("a", 10) == []
+
+    set_jobs(db, available_at=past())
+    db.jobs.claim("a", 10)
+    db.jobs.fail("a", [job.id], "boom again")
+    row = job_rows(db)[job.id]
+    assert row.status == JOB_DEAD and row.finished_at is not None
+    set_jobs(db, available_at=past())
+    assert db.jobs.claim("a", 10) == []
+
+def test_lease_expiring_on_the_last_attempt_dead_letters(db):
+    add_jobs(db, "AWS", 1)
+    for owner in ("a", "b"):
+        set_jobs(db, lease_expires=past())
+        assert len(db.jobs.claim(owner, 10)) == 1
+
+    set_jobs(db, lease_expires=past())
+    assert db.jobs.claim("c", 10) == []
+    row = next(iter(job_rows(db).values()))
+    assert row.status == JOB_DEAD and row.last_error == "Lease expired"
+
+def test_release_does_not_use_up_an_attempt(db):
+    add_jobs(db, "AWS", 1)
+    [job] = db.jobs.claim("a", 10)
+    retry_at = datetime.utcnow() + timedelta(minutes=5)
+    db.jobs.release("b", {job.id: retry_at})
+    assert job_rows(db)[job.id].status == JOB_LEASED
+
+    db.jobs.release("a", {job.id: retry_at})
+    row = job_rows(db)[job.id]
+    assert (row.status, row.attempts, row.available_at) == (JOB_PENDING, 0, retry_at)
+
+def test_prune_deletes_old_done_jobs_only(db):
+    add_jobs(db, "AWS", 2)
+    done, dead = db.jobs.claim("a", 10)
+    db.jobs.complete("a", [done.id])
+    assert db.jobs.prune() == 0
+
+    with db.engine.begin() as conn:
+        conn.execute(update(CheckJob).where(CheckJob.id == dead.id)
+                     .values(status=JOB_DEAD, finished_at=past() - timedelta(days=2)))
+        conn.execute(update(CheckJob).where(CheckJob.id == done.id)
+                     .values(finished_at=past() - timedelta(days=2)))
+    assert db.jobs.prune() == 1
+    assert list(job_rows(db)) == [dead.id]
+    assert db.jobs.get_stats()[JOB_DONE] == 0
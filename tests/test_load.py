@@ -0,0 +1,31 @@
+"""
+End-to-end load test: every seeded account's result reaches the database
+
+Opt-in, takes a minute or two: python -m pytest -m load
+"""
+
+from types import SimpleNamespace
+import pytest
+
+pytestmark = pytest.mark.load
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("sqlalchemy")
+
+from benchmarks.bench_load import run_load
+
+def test_every_account_reaches_the_database(tmp_path, aws_stand_in, digitalocean_stand_in,
+                                            linode_stand_in):
+    urls = {'aws': aws_stand_in.url, 'digitalocean': digitalocean_stand_in.url,
+            'linode': linode_stand_in.url}
+    args = SimpleNamespace(accounts=900, engine="thread", processes=0, batch_size=200,
+                           client_rate=300, full_share=0.02, timeout=300)
+    db, stats, _, written = run_load(str(tmp_path), urls, args)
+    try:
+        assert written == args.accounts
+        assert stats['timed_out'] == 0
+        # The stand-ins' 429s were absorbed, not written as failures
+        failed = sum(results.get("Failed", 0) for results in db.get_check_stats().values())
+        assert failed < args.accounts * 0.05
+    finally:
+        db.close()
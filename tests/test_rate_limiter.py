@@ -0,0 +1,78 @@
+"""
+Token buckets and RateLimiter on an injected clock
+"""
+
+import pytest
+
+from services.rate_limiter import IDLE_SWEEP_SECONDS, RateLimiter, TokenBucket, retry_after_seconds
+
+SETTINGS = {
+    'proxy': {'rate': 100, 'burst': 100},
+    'providers': {'Test': {'rate': 10, 'burst': 5, 'credential_rate': 2, 'credential_burst': 2}},
+}
+
+def test_burst_is_free_then_requests_wait_for_refill(clock):
+    bucket = TokenBucket(rate=10, burst=5, clock=clock)
+    assert [bucket.reserve() for _ in range(5)] == [0.0] * 5
+    assert bucket.reserve() == pytest.approx(0.1)
+    # Reservations queue up behind each other
+    assert bucket.reserve() == pytest.approx(0.2)
+
+def test_refill_is_capped_at_burst(clock):
+    bucket = TokenBucket(rate=10, burst=5, clock=clock)
+    for _ in range(5):
+        bucket.reserve()
+    clock.advance(0.3)
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.0] * 3)
+    assert bucket.reserve() > 0
+
+    clock.advance(60)
+    assert [bucket.reserve() for _ in range(5)] == [0.0] * 5
+    assert bucket.reserve() == pytest.approx(0.1)
+
+def test_pause_holds_tokens_back(clock):
+    bucket = TokenBucket(rate=10, burst=5, clock=clock)
+    bucket.pause(2)
+    assert bucket.reserve() == pytest.approx(2.1)
+    clock.advance(2.1)
+    assert bucket.reserve() == pytest.approx(0.1)
+
+def test_idle_once_refilled(clock):
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    bucket.reserve()
+    assert not bucket.idle(clock())
+    assert bucket.idle(clock() + 0.5)
+
+def test_credential_bucket_limits_one_token_only(clock):
+    limiter = RateLimiter(SETTINGS, clock=clock)
+    assert limiter.reserve("Test", "a") == 0.0
+    assert limiter.reserve("Test", "a") == 0.0
+    assert limiter.reserve("Test", "a") == pytest.approx(0.5)
+    # Another credential only shares the provider bucket
+    assert limiter.reserve("Test", "b") == 0.0
+
+def test_backoff_pauses_credential(clock):
+    limiter = RateLimiter(SETTINGS, clock=clock)
+    limiter.backoff("Test", "a", seconds=3)
+    assert limiter.reserve("Test", "a") == pytest.approx(3.5)
+    assert limiter.reserve("Test", "b") == 0.0
+
+def test_idle_credential_buckets_are_swept(clock):
+    limiter = RateLimiter(SETTINGS, clock=clock)
+    limiter.reserve("Test", "a")
+    clock.advance(IDLE_SWEEP_SECONDS + 1)
+    limiter.reserve("Test", "b")
+    keys = set(limiter._buckets)
+    assert ('credential', "Test", "a") not in keys
+    assert ('credential', "Test", "b") in keys and ('provider', "Test") in keys
+
+def test_scale_splits_provider_and_proxy_limits_only(clock):
+    limiter = RateLimiter(SETTINGS, clock=clock)
+    limiter.scale(0.5)
+    assert limiter.provider_limits["Test"] == {'rate': 5, 'burst': 2.5, 'credential_rate': 2,
+                                               'credential_burst': 2}
+    assert limiter.proxy_limits == {'rate': 50, 'burst': 50}
+
+def test_retry_after_header():
+    assert retry_after_seconds({'Retry-After': "7"}) == 7.0
+    assert retry_after_seconds({'Retry-After': "soon"}) == 1.0
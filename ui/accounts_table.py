@@ -5,7 +5,7 @@ Accounts table widget with filtering capabilities
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
     QHeaderView, QPushButton, QMenu, QMessageBox, QComboBox, QLabel,
-    QLineEdit, QDateEdit, QCheckBox, QFrame, QGroupBox
+    QLineEdit, QDateEdit, QCheckBox, QFrame, QGroupBox, QInputDialog
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QDate
 from PyQt6.QtGui import QAction, QFont
@@ -16,14 +16,21 @@ class AccountsTable(QWidget):
     
     account_selected = pyqtSignal(int)  # Emit account ID when selected
     refresh_requested = pyqtSignal()    # Request data refresh
+    views_changed = pyqtSignal()        # Saved view counts changed (any thread)
     
     def __init__(self, db_manager, parent=None):
         super().__init__(parent)
         self.db = db_manager
         self.current_provider = "AWS"
         self.current_filter = {'provider': 'AWS'}
+        self.active_view = None
         self.init_ui()
         self.load_accounts()
+        
+        # Change feed callbacks may run in worker threads, the signal hops to the GUI thread
+        self.views_changed.connect(self.update_view_combo)
+        self.db.changes.subscribe(self.on_db_changed)
+        self.destroyed.connect(lambda: self.db.changes.unsubscribe(self.on_db_changed))
     
     def init_ui(self):
         """Initialize UI"""
@@ -41,8 +48,39 @@ class AccountsTable(QWidget):
         self.provider_combo.setCurrentText(self.current_provider)
         self.provider_combo.currentTextChanged.connect(self.on_provider_changed)
         
+        # Tag filter - works across all providers
+        tag_label = QLabel("Tag:")
+        tag_label.setFixedWidth(40)
+        self.tag_combo = QComboBox()
+        self.tag_combo.setMinimumWidth(150)
+        self.update_tag_combo()
+        self.tag_combo.currentIndexChanged.connect(self.apply_filters)
+        
         provider_layout.addWidget(provider_label)
         provider_layout.addWidget(self.provider_combo)
+        # Saved views - cached result sets with live count badges
+        view_label = QLabel("View:")
+        view_label.setFixedWidth(40)
+        self.view_combo = QComboBox()
+        self.view_combo.setMinimumWidth(180)
+        self.update_view_combo()
+        self.view_combo.currentIndexChanged.connect(self.on_view_changed)
+        
+        save_view_btn = QPushButton("Save View")
+        save_view_btn.clicked.connect(self.save_current_view)
+        save_view_btn.setFixedWidth(90)
+        
+        delete_view_btn = QPushButton("Delete View")
+        delete_view_btn.clicked.connect(self.delete_current_view)
+        delete_view_btn.setFixedWidth(90)
+        
+        provider_layout.addWidget(tag_label)
+        provider_layout.addWidget(self.tag_combo)
+        provider_layout.addSpacing(20)
+        provider_layout.addWidget(view_label)
+        provider_layout.addWidget(self.view_combo)
+        provider_layout.addWidget(save_view_btn)
+        provider_layout.addWidget(delete_view_btn)
         provider_layout.addStretch()
         
         filter_layout.addLayout(provider_layout)
@@ -63,6 +101,7 @@ class AccountsTable(QWidget):
         self.table.setColumnCount(0)  # Will be set in load_accounts
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SelectionMode.ExtendedSelection)
         self.table.setAlternatingRowColors(True)
         self.table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
@@ -94,8 +133,9 @@ class AccountsTable(QWidget):
             if widget:
                 widget.deleteLater()
         
-        # Reset current filter but keep provider
+        # Reset current filter but keep provider and tag
         self.current_filter = {'provider': self.current_provider}
+        self.apply_tag_filter()
         
         if self.current_provider == "AWS":
             # AWS filters - регион, квота, страна регистрации, когда добавлен
@@ -277,8 +317,92 @@ class AccountsTable(QWidget):
         clear_btn.setFixedWidth(100)
         self.filter_layout.addWidget(clear_btn)
     
+    def update_tag_combo(self):
+        """Reload tag combo from database, keeping the current selection"""
+        current = self.tag_combo.currentData()
+        self.tag_combo.blockSignals(True)
+        self.tag_combo.clear()
+        self.tag_combo.addItem("All tags", "")
+        for name, count in self.db.get_tags():
+            self.tag_combo.addItem(f"{name} ({count})", name)
+        index = self.tag_combo.findData(current) if current else 0
+        self.tag_combo.setCurrentIndex(max(index, 0))
+        self.tag_combo.blockSignals(False)
+    
+    def apply_tag_filter(self):
+        """Add selected tag to current filter"""
+        tag = self.tag_combo.currentData()
+        if tag:
+            self.current_filter['tags'] = [tag]
+    
+    def on_db_changed(self, kind, account_ids):
+        """Change feed subscriber, view counts are already patched by the view cache"""
+        self.views_changed.emit()
+    
+    def update_view_combo(self):
+        """Reload saved view names and count badges, keeping the current selection"""
+        self.view_combo.blockSignals(True)
+        self.view_combo.clear()
+        self.view_combo.addItem("No view", "")
+        for name, count in self.db.get_views():
+            self.view_combo.addItem(f"{name} ({count})", name)
+        index = self.view_combo.findData(self.active_view) if self.active_view else 0
+        self.view_combo.setCurrentIndex(max(index, 0))
+        self.view_combo.blockSignals(False)
+    
+    def clear_active_view(self):
+        """Leave saved view mode when filters are changed by hand"""
+        if self.active_view:
+            self.active_view = None
+            self.view_combo.blockSignals(True)
+            self.view_combo.setCurrentIndex(0)
+            self.view_combo.blockSignals(False)
+    
+    def on_view_changed(self, index):
+        """Open the selected saved view from its cached ID list"""
+        name = self.view_combo.currentData()
+        if not name:
+            self.active_view = None
+            self.apply_filters()
+            return
+        
+        filters = self.db.get_view_filters(name) or {}
+        provider = filters.get('provider') or self.current_provider
+        if provider != self.current_provider:
+            self.provider_combo.blockSignals(True)
+            self.provider_combo.setCurrentText(provider)
+            self.provider_combo.blockSignals(False)
+            self.current_provider = provider
+            self.update_filters()
+        
+        self.active_view = name
+        self.current_filter = filters
+        self.load_accounts()
+    
+    def save_current_view(self):
+        """Save current filters as a named view"""
+        name, ok = QInputDialog.getText(self, "Save View", "View name:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        
+        self.db.save_view(name, self.current_filter)
+        self.active_view = name
+        self.update_view_combo()
+    
+    def delete_current_view(self):
+        """Delete the selected saved view"""
+        name = self.view_combo.currentData()
+        if not name:
+            return
+        
+        self.db.delete_view(name)
+        self.active_view = None
+        self.update_view_combo()
+    
     def on_provider_changed(self, provider):
         """Handle provider change"""
+        self.clear_active_view()
         self.current_provider = provider
         self.current_filter = {'provider': provider}
         self.update_filters()
@@ -286,7 +410,9 @@ class AccountsTable(QWidget):
     
     def apply_filters(self):
         """Apply current filters"""
+        self.clear_active_view()
         self.current_filter = {'provider': self.current_provider}
+        self.apply_tag_filter()
         
         if self.current_provider == "AWS":
             region = self.region_combo.currentData()
@@ -344,6 +470,7 @@ class AccountsTable(QWidget):
     
     def clear_filters(self):
         """Clear all filters"""
+        self.clear_active_view()
         if self.current_provider == "AWS":
             self.region_combo.setCurrentIndex(0)
             self.quota_combo.setCurrentIndex(0)
@@ -361,6 +488,10 @@ class AccountsTable(QWidget):
             self.azure_country_combo.setCurrentIndex(0)
             self.azure_sub_combo.setCurrentIndex(0)
         
+        self.tag_combo.blockSignals(True)
+        self.tag_combo.setCurrentIndex(0)
+        self.tag_combo.blockSignals(False)
+        
         self.current_filter = {'provider': self.current_provider}
         self.load_accounts()
     
@@ -368,7 +499,9 @@ class AccountsTable(QWidget):
         """Load accounts from database with current filters"""
         try:
             # Get accounts from database
-            if self.current_filter and len(self.current_filter) > 1:  # Has filters beyond provider
+            if self.active_view:
+                accounts = self.db.open_view(self.active_view)
+            elif self.current_filter and len(self.current_filter) > 1:  # Has filters beyond provider
                 accounts = self.db.get_accounts_by_filter(self.current_filter)
             else:
                 accounts = self.db.get_all_accounts(self.current_provider)
@@ -563,16 +696,26 @@ class AccountsTable(QWidget):
         delete_action = QAction("Delete Account", self)
         check_action = QAction("Check Now", self)
         view_details = QAction("View Details", self)
+        tag_action = QAction("Add Tags to Selected...", self)
+        untag_action = QAction("Remove Tags from Selected...", self)
+        bulk_edit_action = QAction("Bulk Edit Selected...", self)
         
         edit_action.triggered.connect(self.edit_account)
         delete_action.triggered.connect(self.delete_account)
         check_action.triggered.connect(self.check_account)
         view_details.triggered.connect(self.view_account_details)
+        tag_action.triggered.connect(self.tag_selected)
+        untag_action.triggered.connect(self.untag_selected)
+        bulk_edit_action.triggered.connect(self.bulk_edit_selected)
         
         menu.addAction(view_details)
         menu.addAction(edit_action)
         menu.addAction(check_action)
         menu.addSeparator()
+        menu.addAction(tag_action)
+        menu.addAction(untag_action)
+        menu.addAction(bulk_edit_action)
+        menu.addSeparator()
         menu.addAction(delete_action)
         
         menu.exec(self.table.viewport().mapToGlobal(position))
@@ -612,6 +755,61 @@ class AccountsTable(QWidget):
             # TODO: Implement account checking logic
             QMessageBox.information(self, 'Info', f'Checking account {account_id}...')
     
+    def get_selected_account_ids(self):
+        """Get IDs of all selected rows"""
+        rows = {index.row() for index in self.table.selectionModel().selectedRows()}
+        return [int(self.table.item(row, 0).text()) for row in sorted(rows)]
+    
+    def ask_tag_names(self, title):
+        """Ask for a comma separated list of tags"""
+        text, ok = QInputDialog.getText(self, title, "Tags (comma separated):")
+        if not ok:
+            return []
+        return [name.strip() for name in text.split(',') if name.strip()]
+    
+    def tag_selected(self):
+        """Attach tags to all selected accounts"""
+        account_ids = self.get_selected_account_ids()
+        if not account_ids:
+            return
+        
+        tag_names = self.ask_tag_names(f"Tag {len(account_ids)} accounts")
+        if tag_names:
+            self.db.tag_accounts(account_ids, tag_names)
+            self.update_tag_combo()
+            self.status_label.setText(f"Tagged {len(account_ids)} accounts")
+    
+    def untag_selected(self):
+        """Detach tags from all selected accounts"""
+        account_ids = self.get_selected_account_ids()
+        if not account_ids:
+            return
+        
+        tag_names = self.ask_tag_names(f"Untag {len(account_ids)} accounts")
+        if tag_names:
+            self.db.untag_accounts(account_ids, tag_names)
+            self.update_tag_combo()
+            self.load_accounts()
+    
+    def bulk_edit_selected(self):
+        """Edit region, payment, subscription, comment or status of all selected accounts"""
+        account_ids = self.get_selected_account_ids()
+        if not account_ids:
+            QMessageBox.warning(self, 'Warning', 'Please select at least one account!')
+            return
+        
+        from ui.bulk_edit_dialog import BulkEditDialog
+        dialog = BulkEditDialog(len(account_ids), self.db.get_unique_regions(self.current_provider), self)
+        if not dialog.exec():
+            return
+        
+        try:
+            updated = self.db.update_accounts(account_ids, dialog.get_fields())
+            self.load_accounts()
+            self.status_label.setText(f"Updated {updated} accounts")
+        except Exception as e:
+            QMessageBox.critical(self, 'Error', f'Bulk edit failed: {str(e)}')
+    
     def view_account_details(self):
         """View detailed account information"""
         selected = self.table.currentRow()
@@ -628,6 +826,7 @@ class AccountsTable(QWidget):
                 <b>Comment:</b> {account.comment or 'None'}<br>
                 <b>Status:</b> {account.check_result or 'Not checked'}<br>
                 <b>Last Check:</b> {account.last_check.strftime('%Y-%m-%d %H:%M') if account.last_check else 'Never'}<br>
+                <b>Tags:</b> {', '.join(self.db.get_account_tags(account_id)) or 'None'}<br>
                 """
                 
                 # Add provider-specific details
@@ -668,6 +867,7 @@ class AccountsTable(QWidget):
     def refresh_data(self):
         """Refresh table data and filters"""
         # Refresh filter dropdowns from database
+        self.update_tag_combo()
         self.update_filters()
         # Reload accounts
         self.load_accounts()
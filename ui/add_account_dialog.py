@@ -483,6 +483,18 @@ class AddAccountDialog(QDialog):
         do_2fa_layout.addWidget(self.do_2fa_input)
         layout.addLayout(do_2fa_layout)
         
+        # API Token
+        do_api_layout = QHBoxLayout()
+        do_api_label = QLabel("API TOKEN (optional):")
+        do_api_label.setFixedWidth(120)
+        do_api_label.setStyleSheet("font-weight: bold; color: #cccccc;")
+        self.do_api_input = QLineEdit()
+        self.do_api_input.setPlaceholderText("Personal access token, used for checking")
+        self.do_api_input.setEchoMode(QLineEdit.EchoMode.Normal)
+        do_api_layout.addWidget(do_api_label)
+        do_api_layout.addWidget(self.do_api_input)
+        layout.addLayout(do_api_layout)
+        
         # Limits
         limits_layout = QHBoxLayout()
         limits_label = QLabel("Limits:")
@@ -1191,6 +1203,7 @@ class AddAccountDialog(QDialog):
                 "email_password": self.do_email_pass_input.text().strip(),
                 "do_password": self.do_pass_input.text().strip(),
                 "2fa_secret": self.do_2fa_input.text().strip(),
+                "api_key": self.do_api_input.text().strip(),
                 "limits": self.limits_input.text().strip(),
                 "country": self.do_country_input.text().strip()
             })
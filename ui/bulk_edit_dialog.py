@@ -0,0 +1,104 @@
+"""
+Bulk Edit Dialog for Cloud Account Manager
+Sets the same field values on many selected accounts at once
+"""
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QCheckBox,
+    QComboBox, QLineEdit, QPushButton, QLabel, QMessageBox
+)
+from utils.validators import PAYMENT_METHODS, SUBSCRIPTIONS, validate_bulk_fields
+
+class BulkEditDialog(QDialog):
+    """Dialog for editing a field set on many accounts"""
+    
+    def __init__(self, account_count, regions=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Bulk Edit {account_count} Accounts")
+        self.setModal(True)
+        self.regions = regions or []
+        self.init_ui(account_count)
+        self.resize(420, 260)
+    
+    def init_ui(self, account_count):
+        """Initialize UI"""
+        main_layout = QVBoxLayout(self)
+        
+        info_label = QLabel(f"Tick the fields to change on {account_count} selected accounts:")
+        main_layout.addWidget(info_label)
+        
+        grid = QGridLayout()
+        grid.setSpacing(8)
+        
+        self.region_input = QComboBox()
+        self.region_input.setEditable(True)
+        self.region_input.addItems(self.regions)
+        
+        self.payment_input = QComboBox()
+        self.payment_input.addItems(PAYMENT_METHODS)
+        
+        self.subscription_input = QComboBox()
+        self.subscription_input.addItems(SUBSCRIPTIONS)
+        
+        self.comment_input = QLineEdit()
+        self.comment_input.setPlaceholderText("New comment")
+        
+        self.active_input = QComboBox()
+        self.active_input.addItem("Active", True)
+        self.active_input.addItem("Inactive", False)
+        
+        # field -> (checkbox, editor)
+        self.fields = {}
+        rows = [
+            ("region", "Region:", self.region_input),
+            ("payment_method", "Payment:", self.payment_input),
+            ("subscription", "Subscription:", self.subscription_input),
+            ("comment", "Comment:", self.comment_input),
+            ("is_active", "Status:", self.active_input),
+        ]
+        for row, (field, label, editor) in enumerate(rows):
+            checkbox = QCheckBox(label)
+            editor.setEnabled(False)
+            checkbox.toggled.connect(editor.setEnabled)
+            grid.addWidget(checkbox, row, 0)
+            grid.addWidget(editor, row, 1)
+            self.fields[field] = (checkbox, editor)
+        
+        main_layout.addLayout(grid)
+        main_layout.addStretch()
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        apply_btn = QPushButton("Apply")
+        apply_btn.setDefault(True)
+        apply_btn.clicked.connect(self.apply)
+        
+        button_layout.addWidget(cancel_btn)
+        button_layout.addWidget(apply_btn)
+        main_layout.addLayout(button_layout)
+    
+    def get_fields(self):
+        """Get ticked fields and their new values"""
+        values = {}
+        for field, (checkbox, editor) in self.fields.items():
+            if not checkbox.isChecked():
+                continue
+            if field == "is_active":
+                values[field] = editor.currentData()
+            elif field == "comment":
+                values[field] = editor.text().strip()
+            else:
+                values[field] = editor.currentText().strip()
+        return values
+    
+    def apply(self):
+        """Validate and close"""
+        is_valid, error_msg = validate_bulk_fields(self.get_fields())
+        if not is_valid:
+            QMessageBox.warning(self, "Error", error_msg)
+            return
+        self.accept()
@@ -0,0 +1,39 @@
+"""
+Background account checking for Cloud Account Manager
+Runs a CheckRun off the GUI thread; progress and results reach the GUI in
+batches at most PROGRESS_INTERVAL apart, never one signal per account
+"""
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from services.base_checker import DEPTH_QUICK
+from services.check_run import CheckRun
+
+class CheckWorker(QThread):
+    """Checks accounts by ID with the matching provider checker"""
+    
+    progress = pyqtSignal(dict)          # CheckRun progress totals
+    results_ready = pyqtSignal(list)     # Result dicts that arrived since the last batch
+    check_finished = pyqtSignal(list)    # All results
+    
+    def __init__(self, db_manager, account_ids, proxy_url=None, force=False, depth=DEPTH_QUICK,
+                 engine=None, parent=None):
+        super().__init__(parent)
+        # Signals emitted from checker threads are queued to the GUI thread
+        self.check_run = CheckRun(db_manager, account_ids, proxy_url, force, depth, engine,
+                                  on_progress=self.progress.emit, on_results=self.results_ready.emit)
+    
+    def cancel(self):
+        """Stop starting checks, the run finishes with what is already running"""
+        self.check_run.cancel()
+    
+    def pause(self):
+        """Hold checks that have not started yet"""
+        self.check_run.pause()
+    
+    def resume(self):
+        """Let held checks start"""
+        self.check_run.resume()
+    
+    def run(self):
+        """Run the check run in this thread"""
+        self.check_finished.emit(self.check_run.run())
@@ -136,7 +136,7 @@ class MainWindow(QMainWindow):
             # Here we would add to database
             pass
             
-    def check_selected(self):
+    def check_selected(self, force=False):
         """Check selected accounts"""
         selected_rows = self.get_selected_rows()
         
@@ -144,8 +144,21 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please select at least one account!")
             return
             
-        # Silent checking
+        # Rows here are sample data, database checks live in main.py
         
+    def force_check_selected(self):
+        """Full check of selected accounts, ignoring recent cached results"""
+        self.check_selected(force=True)
+    
+    def pause_check(self):
+        """Pause or resume the running check"""
+        # Checks run against the database in main.py
+        pass
+    
+    def cancel_check(self):
+        """Cancel the running check"""
+        pass
+    
     def delete_selected(self):
         """Delete selected accounts from table"""
         selected_rows = self.get_selected_rows()
@@ -173,7 +186,12 @@ class MainWindow(QMainWindow):
             self.refresh_region_filter()
             # бновляем статус бар
             self.update_status_bar()
-            
+    
+    def undo_delete(self):
+        """Restore accounts removed by the last delete"""
+        # Rows are only removed from the model here, database undo lives in main.py
+        pass
+    
     def refresh_region_filter(self):
         """Refresh region filter from current table data"""
         regions = set()
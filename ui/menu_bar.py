@@ -21,6 +21,26 @@ def create_menu_bar(window):
     copy_action.triggered.connect(window.copy_selected)
     file_menu.addAction(copy_action)
     
+    recheck_action = QAction("Force &Recheck Selected", window)
+    recheck_action.setShortcut("Ctrl+Shift+R")
+    recheck_action.triggered.connect(window.force_check_selected)
+    file_menu.addAction(recheck_action)
+    
+    pause_check_action = QAction("&Pause/Resume Check", window)
+    pause_check_action.setShortcut("Ctrl+P")
+    pause_check_action.triggered.connect(window.pause_check)
+    file_menu.addAction(pause_check_action)
+    
+    cancel_check_action = QAction("Cance&l Check", window)
+    cancel_check_action.setShortcut("Ctrl+Shift+X")
+    cancel_check_action.triggered.connect(window.cancel_check)
+    file_menu.addAction(cancel_check_action)
+    
+    undo_delete_action = QAction("&Undo Delete", window)
+    undo_delete_action.setShortcut("Ctrl+Z")
+    undo_delete_action.triggered.connect(window.undo_delete)
+    file_menu.addAction(undo_delete_action)
+    
     file_menu.addSeparator()
     
     exit_action = QAction("&Exit", window)
@@ -0,0 +1,12 @@
+"""
+Helpers for splitting bulk operations into batches
+"""
+
+# Keep IN (...) lists well below SQLite's bound parameter limit
+ID_CHUNK_SIZE = 500
+
+def chunked(items, size=ID_CHUNK_SIZE):
+    """Split items into consecutive lists of at most size elements"""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
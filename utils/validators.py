@@ -0,0 +1,33 @@
+"""
+Validators for account data
+"""
+
+# Values offered by the add account dialog
+PAYMENT_METHODS = ["Card", "PayPal"]
+SUBSCRIPTIONS = ["Pay as You Go", "Free Trial 200$"]
+
+# Fields that can be changed for many accounts at once
+BULK_EDITABLE_FIELDS = ["region", "payment_method", "subscription", "comment", "is_active"]
+
+def validate_bulk_fields(fields):
+    """Validate a field set for a bulk update, returns (is_valid, error_msg)"""
+    if not fields:
+        return False, "No fields to update"
+    
+    for field, value in fields.items():
+        if field not in BULK_EDITABLE_FIELDS:
+            return False, f"Field '{field}' cannot be bulk edited"
+        
+        if field == "is_active":
+            if not isinstance(value, bool):
+                return False, "Field 'is_active' must be True or False"
+        elif not isinstance(value, str):
+            return False, f"Field '{field}' must be text"
+        elif field == "region" and (not value.strip() or len(value) > 100):
+            return False, "Field 'region' must be 1-100 characters"
+        elif field == "payment_method" and value not in PAYMENT_METHODS:
+            return False, f"Payment method must be one of: {', '.join(PAYMENT_METHODS)}"
+        elif field == "subscription" and value not in SUBSCRIPTIONS:
+            return False, f"Subscription must be one of: {', '.join(SUBSCRIPTIONS)}"
+    
+    return True, ""